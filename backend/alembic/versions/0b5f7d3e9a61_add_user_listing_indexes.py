@@ -0,0 +1,43 @@
+"""add_user_listing_indexes
+
+Indexes for the admin user listing: (created_at, id) for keyset pagination,
+and, where the pg_trgm extension is available, trigram GIN indexes so
+substring searches on email and full_name don't scan the table.
+
+Revision ID: 0b5f7d3e9a61
+Revises: 61c8e5a0d4f2
+Create Date: 2026-10-20 13:05:27.390418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5f7d3e9a61'
+down_revision: Union[str, None] = '61c8e5a0d4f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('ix_users_email_trgm', 'email'),
+    ('ix_users_full_name_trgm', 'full_name'),
+]
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+    available = op.get_bind().execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"))
+    if available.first() is not None:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, column in TRIGRAM_INDEXES:
+            op.create_index(name, 'users', [column], postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    for name, _ in TRIGRAM_INDEXES:
+        op.drop_index(name, table_name='users', if_exists=True)
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,38 @@
+"""add_plan_attribute_indexes
+
+Indexes for filtering plans by attributes kept in plan_data: a GIN
+(jsonb_path_ops) index over the document without its weeks (when it is an
+object), for goal race, surface and phase containment, and an expression
+index on the race date.
+
+Revision ID: 4e6a2c9f1b37
+Revises: 9d4f0b7e2c13
+Create Date: 2026-10-20 10:12:40.518263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e6a2c9f1b37'
+down_revision: Union[str, None] = '9d4f0b7e2c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_training_plans_plan_attributes',
+        'training_plans',
+        [sa.text("(CASE WHEN jsonb_typeof(plan_data) = 'object' THEN plan_data - 'weeks' END) jsonb_path_ops")],
+        postgresql_using='gin',
+    )
+    op.create_index('ix_training_plans_race_date', 'training_plans', [sa.text("(plan_data ->> 'race_date')")])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_training_plans_race_date', table_name='training_plans')
+    op.drop_index('ix_training_plans_plan_attributes', table_name='training_plans')
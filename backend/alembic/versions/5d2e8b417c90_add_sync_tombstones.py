@@ -0,0 +1,45 @@
+"""add_sync_tombstones
+
+Tombstones for deleted training plans, prescribed workouts and activities,
+and (user_id, updated_at) indexes so /sync can range-scan each user's
+changes since a watermark.
+
+Revision ID: 5d2e8b417c90
+Revises: af3fb2a9276e
+Create Date: 2026-10-19 18:12:44.913205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8b417c90'
+down_revision: Union[str, None] = 'af3fb2a9276e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_TABLES = ('training_plans', 'prescribed_workouts', 'training_activities')
+
+
+def upgrade() -> None:
+    op.create_table('sync_tombstones',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('entity_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_user_id_deleted_at', 'sync_tombstones', ['user_id', 'deleted_at'])
+    for table in SYNCED_TABLES:
+        op.create_index(f'ix_{table}_user_id_updated_at', table, ['user_id', 'updated_at'])
+
+
+def downgrade() -> None:
+    for table in SYNCED_TABLES:
+        op.drop_index(f'ix_{table}_user_id_updated_at', table_name=table)
+    op.drop_index('ix_sync_tombstones_user_id_deleted_at', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
@@ -0,0 +1,73 @@
+"""add_search_vectors
+
+Generated tsvector columns with GIN indexes for full-text search over
+prescribed workouts (type, description) and activities (name, type).
+Adding a stored generated column rewrites the table.
+
+Where the pg_trgm extension is available it is installed, and trigram
+indexes on the description and name serve fuzzy matches when full-text
+search finds nothing; the search endpoint checks for the extension.
+
+Revision ID: 61c8e5a0d4f2
+Revises: 4e6a2c9f1b37
+Create Date: 2026-10-20 11:38:02.774105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '61c8e5a0d4f2'
+down_revision: Union[str, None] = '4e6a2c9f1b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+WORKOUT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(workout_type, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(workout_description, '')), 'B')"
+)
+ACTIVITY_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(activity_type, '')), 'B')"
+)
+TRIGRAM_INDEXES = [
+    ('ix_prescribed_workouts_description_trgm', 'prescribed_workouts', 'workout_description'),
+    ('ix_training_activities_name_trgm', 'training_activities', 'name'),
+]
+
+
+def upgrade() -> None:
+    op.add_column(
+        'prescribed_workouts',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(WORKOUT_SEARCH_VECTOR, persisted=True)),
+    )
+    op.add_column(
+        'training_activities',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(ACTIVITY_SEARCH_VECTOR, persisted=True)),
+    )
+    op.create_index(
+        'ix_prescribed_workouts_search_vector', 'prescribed_workouts', ['search_vector'], postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_training_activities_search_vector', 'training_activities', ['search_vector'], postgresql_using='gin'
+    )
+
+    available = op.get_bind().execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"))
+    if available.first() is not None:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(name, table, [column], postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    # the extension stays: other objects in the database may use it
+    for name, table, _ in TRIGRAM_INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
+    op.drop_index('ix_training_activities_search_vector', table_name='training_activities')
+    op.drop_index('ix_prescribed_workouts_search_vector', table_name='prescribed_workouts')
+    op.drop_column('training_activities', 'search_vector')
+    op.drop_column('prescribed_workouts', 'search_vector')
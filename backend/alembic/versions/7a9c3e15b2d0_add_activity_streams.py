@@ -0,0 +1,47 @@
+"""add_activity_streams
+
+One row per recorded channel of an activity, holding the whole series as a
+packed (and usually zlib-compressed) array. The data column is stored
+EXTERNAL so TOAST moves it out of line without compressing it a second time.
+
+Revision ID: 7a9c3e15b2d0
+Revises: e4b7d21c5a68
+Create Date: 2026-10-19 21:12:40.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a9c3e15b2d0'
+down_revision: Union[str, None] = 'e4b7d21c5a68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'activity_streams',
+        sa.Column('activity_id', sa.UUID(), nullable=False),
+        sa.Column('channel', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('dtype', sa.String(length=8), nullable=False),
+        sa.Column('length', sa.Integer(), nullable=False),
+        sa.Column('dims', sa.SmallInteger(), nullable=False),
+        sa.Column('compression', sa.String(length=8), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('scale', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['activity_id'], ['training_activities.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('activity_id', 'channel'),
+    )
+    op.execute('ALTER TABLE activity_streams ALTER COLUMN data SET STORAGE EXTERNAL')
+
+
+def downgrade() -> None:
+    op.drop_table('activity_streams')
@@ -0,0 +1,29 @@
+"""add_training_plan_replanned_week
+
+The last plan week adapted by replanning, so replanning twice in a week
+doesn't adapt to the same load twice.
+
+Revision ID: 8f3a61c0d7e5
+Revises: 0b5f7d3e9a61
+Create Date: 2026-10-19 21:12:44.803516
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a61c0d7e5'
+down_revision: Union[str, None] = '0b5f7d3e9a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('training_plans', sa.Column('replanned_week', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('training_plans', 'replanned_week')
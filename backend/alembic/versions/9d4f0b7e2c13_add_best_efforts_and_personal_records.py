@@ -0,0 +1,61 @@
+"""add_best_efforts_and_personal_records
+
+Each activity's best efforts (fastest 1 km ... marathon, highest 20-minute
+heart rate) and each user's personal records across them. Existing
+activities get theirs from `tenflow compute-metrics`, which recomputes all
+activities with metrics from before this revision.
+
+Revision ID: 9d4f0b7e2c13
+Revises: b3e81f6d0a27
+Create Date: 2026-10-19 22:48:55.102934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f0b7e2c13'
+down_revision: Union[str, None] = 'b3e81f6d0a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'activity_best_efforts',
+        sa.Column('activity_id', sa.UUID(), nullable=False),
+        sa.Column('effort', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('value', sa.REAL(), nullable=False),
+        sa.Column('start_offset', sa.Integer(), nullable=False),
+        sa.Column('end_offset', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['activity_id'], ['training_activities.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('activity_id', 'effort'),
+    )
+    op.create_index(
+        'ix_activity_best_efforts_user_id_effort_value', 'activity_best_efforts', ['user_id', 'effort', 'value']
+    )
+    op.create_table(
+        'personal_records',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('effort', sa.String(length=32), nullable=False),
+        sa.Column('activity_id', sa.UUID(), nullable=False),
+        sa.Column('value', sa.REAL(), nullable=False),
+        sa.Column('start_offset', sa.Integer(), nullable=False),
+        sa.Column('end_offset', sa.Integer(), nullable=False),
+        sa.Column('achieved_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['activity_id'], ['training_activities.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'effort'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('personal_records')
+    op.drop_index('ix_activity_best_efforts_user_id_effort_value', table_name='activity_best_efforts')
+    op.drop_table('activity_best_efforts')
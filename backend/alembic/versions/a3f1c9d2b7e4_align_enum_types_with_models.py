@@ -0,0 +1,44 @@
+"""align_enum_types_with_models
+
+The initial schema created the enums from the Python enum classes, which
+named them workouttimeofday/intensityzone with upper-case member names as
+labels. The models bind "WorkoutTimeOfDay"/"IntensityZone" with the lower-case
+values, so rename the types and labels to match.
+
+Revision ID: a3f1c9d2b7e4
+Revises: 2c7d628cffbf
+Create Date: 2026-10-19 15:40:12.118234
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2b7e4'
+down_revision: Union[str, None] = '2c7d628cffbf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+WORKOUT_TIMES = ['morning', 'afternoon']
+INTENSITY_ZONES = [f'z{i}' for i in range(1, 6)]
+
+
+def upgrade() -> None:
+    op.execute('ALTER TYPE workouttimeofday RENAME TO "WorkoutTimeOfDay"')
+    for value in WORKOUT_TIMES:
+        op.execute(f'ALTER TYPE "WorkoutTimeOfDay" RENAME VALUE \'{value.upper()}\' TO \'{value}\'')
+    op.execute('ALTER TYPE intensityzone RENAME TO "IntensityZone"')
+    for value in INTENSITY_ZONES:
+        op.execute(f'ALTER TYPE "IntensityZone" RENAME VALUE \'{value.upper()}\' TO \'{value}\'')
+
+
+def downgrade() -> None:
+    for value in INTENSITY_ZONES:
+        op.execute(f'ALTER TYPE "IntensityZone" RENAME VALUE \'{value}\' TO \'{value.upper()}\'')
+    op.execute('ALTER TYPE "IntensityZone" RENAME TO intensityzone')
+    for value in WORKOUT_TIMES:
+        op.execute(f'ALTER TYPE "WorkoutTimeOfDay" RENAME VALUE \'{value}\' TO \'{value.upper()}\'')
+    op.execute('ALTER TYPE "WorkoutTimeOfDay" RENAME TO workouttimeofday')
@@ -0,0 +1,43 @@
+"""add_training_plan_etag_indexes
+
+Covering indexes so conditional requests on training plans can be answered
+from index-only scans: one keyed by id for single plans, one by
+(user_id, created_at desc) that also serves the list query's ordering.
+
+Revision ID: af3fb2a9276e
+Revises: a3f1c9d2b7e4
+Create Date: 2026-10-19 17:05:31.402177
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'af3fb2a9276e'
+down_revision: Union[str, None] = 'a3f1c9d2b7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_training_plans_id_version',
+        'training_plans',
+        ['id'],
+        unique=True,
+        postgresql_include=['user_id', 'updated_at'],
+    )
+    op.create_index(
+        'ix_training_plans_user_id_created_at',
+        'training_plans',
+        ['user_id', sa.text('created_at DESC')],
+        postgresql_include=['id', 'updated_at', 'is_active'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_training_plans_user_id_created_at', table_name='training_plans')
+    op.drop_index('ix_training_plans_id_version', table_name='training_plans')
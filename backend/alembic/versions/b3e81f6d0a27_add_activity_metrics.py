@@ -0,0 +1,44 @@
+"""add_activity_metrics
+
+Columns for the metrics derived from activity streams (time in heart-rate
+zone, grade-adjusted and normalized pace, training stress) and the user
+thresholds they are measured against. Existing activities get theirs from
+`tenflow compute-metrics`.
+
+Revision ID: b3e81f6d0a27
+Revises: 7a9c3e15b2d0
+Create Date: 2026-10-19 22:03:17.640281
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e81f6d0a27'
+down_revision: Union[str, None] = '7a9c3e15b2d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('threshold_heartrate', sa.SmallInteger(), nullable=True))
+    op.add_column('users', sa.Column('threshold_pace', sa.SmallInteger(), nullable=True))
+    op.add_column('training_activities', sa.Column('zone_seconds', postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.add_column('training_activities', sa.Column('grade_adjusted_pace', sa.REAL(), nullable=True))
+    op.add_column('training_activities', sa.Column('normalized_pace', sa.REAL(), nullable=True))
+    op.add_column('training_activities', sa.Column('training_stress', sa.REAL(), nullable=True))
+    op.add_column('training_activities', sa.Column('metrics_version', sa.SmallInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('training_activities', 'metrics_version')
+    op.drop_column('training_activities', 'training_stress')
+    op.drop_column('training_activities', 'normalized_pace')
+    op.drop_column('training_activities', 'grade_adjusted_pace')
+    op.drop_column('training_activities', 'zone_seconds')
+    op.drop_column('users', 'threshold_pace')
+    op.drop_column('users', 'threshold_heartrate')
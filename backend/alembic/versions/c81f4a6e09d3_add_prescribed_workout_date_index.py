@@ -0,0 +1,29 @@
+"""add_prescribed_workout_date_index
+
+(user_id, workout_date) index for calendar range queries on prescribed workouts.
+
+Revision ID: c81f4a6e09d3
+Revises: 5d2e8b417c90
+Create Date: 2026-10-19 19:03:27.550418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4a6e09d3'
+down_revision: Union[str, None] = '5d2e8b417c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_prescribed_workouts_user_id_workout_date', 'prescribed_workouts', ['user_id', 'workout_date']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_prescribed_workouts_user_id_workout_date', table_name='prescribed_workouts')
@@ -0,0 +1,51 @@
+"""make_activity_prescription_optional
+
+Activities can exist without a prescription: prescribed_workout_id becomes
+nullable (NULL until matched) and is set to NULL when the workout is deleted.
+Adds the indexes the matcher reads through: (user_id, start_date) for a
+user's activities and prescribed_workout_id for "does this workout have an
+activity yet".
+
+Revision ID: e4b7d21c5a68
+Revises: c81f4a6e09d3
+Create Date: 2026-10-19 19:41:09.271835
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d21c5a68'
+down_revision: Union[str, None] = 'c81f4a6e09d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FOREIGN_KEY = 'training_activities_prescribed_workout_id_fkey'
+
+
+def upgrade() -> None:
+    op.alter_column('training_activities', 'prescribed_workout_id', existing_type=sa.UUID(), nullable=True)
+    op.drop_constraint(FOREIGN_KEY, 'training_activities', type_='foreignkey')
+    op.create_foreign_key(
+        FOREIGN_KEY,
+        'training_activities',
+        'prescribed_workouts',
+        ['prescribed_workout_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+    op.create_index('ix_training_activities_user_id_start_date', 'training_activities', ['user_id', 'start_date'])
+    op.create_index('ix_training_activities_prescribed_workout_id', 'training_activities', ['prescribed_workout_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_training_activities_prescribed_workout_id', table_name='training_activities')
+    op.drop_index('ix_training_activities_user_id_start_date', table_name='training_activities')
+    op.drop_constraint(FOREIGN_KEY, 'training_activities', type_='foreignkey')
+    op.create_foreign_key(FOREIGN_KEY, 'training_activities', 'prescribed_workouts', ['prescribed_workout_id'], ['id'])
+    # unmatched activities have nothing to point at
+    op.execute('DELETE FROM training_activities WHERE prescribed_workout_id IS NULL')
+    op.alter_column('training_activities', 'prescribed_workout_id', existing_type=sa.UUID(), nullable=False)
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+HTTP-level load benchmark for the Tenflow API.
+
+Creates a throwaway database, seeds it with realistic volumes, then drives
+concurrent load through the ASGI app (httpx + ASGITransport, so no server or
+network is involved) against login, /users/me and the training plan CRUD and
+list endpoints. Reports p50/p95/p99 latency and throughput per scenario and
+compares them against a stored baseline; the exit status is 1 when a
+scenario regresses beyond the tolerance.
+
+    uv run python benchmarks/api_benchmark.py
+    uv run python benchmarks/api_benchmark.py --users 1000 --concurrency 50
+    uv run python benchmarks/api_benchmark.py --update-baseline
+
+Requires PostgreSQL reachable with the POSTGRES_* settings (see config.py).
+Baselines are only meaningful on the machine that recorded them: a run on
+another Python version, architecture or CPU count is not compared (exit
+status 2); record a baseline there with --update-baseline.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200, help='users to seed')
+    parser.add_argument('--plans-per-user', type=int, default=5, help='training plans seeded per user')
+    parser.add_argument('--weeks', type=int, default=16, help='weeks of plan_data per seeded plan')
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per scenario')
+    parser.add_argument('--login-requests', type=int, default=50, help='measured requests for the login scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=20, help='concurrent in-flight requests')
+    parser.add_argument('--scenarios', nargs='*', help='subset of scenarios to run')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for data and request order')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression (0.25 = 25%%)')
+    parser.add_argument('--output', type=Path, help='write the results of this run as JSON')
+    parser.add_argument('--keep-db', action='store_true', help='do not drop the benchmark database')
+    parser.add_argument('--verbose', action='store_true', help='keep slow-query and N+1 warnings')
+    return parser.parse_args(argv)
+
+
+def plan_data_for(rng: random.Random, weeks: int) -> dict:
+    workout_types = ['easy', 'recovery', 'tempo', 'intervals', 'long', 'hills', 'rest']
+    return {
+        'weeks': [
+            {
+                'week': week,
+                'phase': 'base' if week < weeks // 3 else 'build' if week < weeks - 2 else 'taper',
+                'distance': round(rng.uniform(30, 90), 1),
+                'workouts': [
+                    {
+                        'day': day,
+                        'type': rng.choice(workout_types),
+                        'distance': round(rng.uniform(3, 30), 1),
+                        'intensity_zone': f'z{rng.randint(1, 5)}',
+                        'description': 'Warm up 15 minutes, main set, cool down 10 minutes',
+                    }
+                    for day in range(7)
+                ],
+            }
+            for week in range(1, weeks + 1)
+        ]
+    }
+
+
+def plan_payload(rng: random.Random, weeks: int) -> dict:
+    start = date.today() + timedelta(days=rng.randint(0, 60))
+    return {
+        'goal': rng.choice(['Marathon', 'Half Marathon', '10K', '50K Ultra']),
+        'plan_name': f'{weeks}-Week Plan {rng.randint(1, 9999)}',
+        'start_date': str(start),
+        'end_date': str(start + timedelta(weeks=weeks)),
+        'duration_weeks': weeks,
+        'fitness_level': rng.choice(['beginner', 'intermediate', 'advanced']),
+        'weekly_distance_base': str(round(rng.uniform(20, 60), 1)),
+        'weekly_distance_peak': str(round(rng.uniform(60, 120), 1)),
+        'training_days_per_week': rng.randint(3, 7),
+        'plan_data': plan_data_for(rng, weeks),
+        'is_active': True,
+    }
+
+
+@dataclass
+class SeededUser:
+    id: uuid.UUID
+    email: str
+    token: str
+    plan_ids: list[uuid.UUID] = field(default_factory=list)
+
+
+async def seed(args, rng: random.Random) -> list[SeededUser]:
+    from sqlalchemy import insert
+
+    from tenflow.core import security
+    from tenflow.database import session_context
+    from tenflow.models import TrainingPlan, User
+
+    # Hash once: every seeded user shares the password, and bcrypt would dominate seeding.
+    hashed_password = security.get_password_hash('benchmark-password')
+    # Core inserts skip the models' Python-side defaults
+    now = datetime.now(UTC)
+    timestamps = {'created_at': now, 'updated_at': now}
+    users = []
+    user_rows = []
+    plan_rows = []
+    for n in range(args.users):
+        user_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        token = security.create_access_token(subject=user_id, expires_delta=timedelta(hours=6))
+        user = SeededUser(id=user_id, email=f'bench-{n}@example.com', token=token)
+        user_rows.append(
+            {
+                'id': user_id,
+                'email': user.email,
+                'full_name': f'Bench User {n}',
+                'hashed_password': hashed_password,
+                'access_token': token,
+                'is_active': True,
+                'is_superuser': False,
+                **timestamps,
+            }
+        )
+        for _ in range(args.plans_per_user):
+            plan_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            payload = plan_payload(rng, args.weeks)
+            payload['start_date'] = date.fromisoformat(payload['start_date'])
+            payload['end_date'] = date.fromisoformat(payload['end_date'])
+            plan_rows.append({**payload, **timestamps, 'id': plan_id, 'user_id': user_id})
+            user.plan_ids.append(plan_id)
+        users.append(user)
+
+    async with session_context() as session:
+        for start in range(0, len(user_rows), 1000):
+            await session.execute(insert(User), user_rows[start : start + 1000])
+        for start in range(0, len(plan_rows), 1000):
+            await session.execute(insert(TrainingPlan), plan_rows[start : start + 1000])
+        await session.commit()
+    return users
+
+
+@dataclass
+class Scenario:
+    name: str
+    requests: int
+    make_request: object
+
+
+def build_scenarios(args, users: list[SeededUser], rng: random.Random) -> list[Scenario]:
+    created: list[tuple[SeededUser, str]] = []
+
+    def auth(user):
+        return {'Authorization': f'Bearer {user.token}'}
+
+    def pick_user(i):
+        return users[i % len(users)]
+
+    async def login(client, i):
+        user = pick_user(i)
+        return await client.post(
+            '/api/v1/auth/login', data={'username': user.email, 'password': 'benchmark-password'}
+        )
+
+    async def users_me(client, i):
+        return await client.get('/api/v1/users/me', headers=auth(pick_user(i)))
+
+    async def plans_list(client, i):
+        return await client.get('/api/v1/training-plans/?limit=20', headers=auth(pick_user(i)))
+
+    async def plan_get(client, i):
+        user = pick_user(i)
+        plan_id = user.plan_ids[i % len(user.plan_ids)]
+        return await client.get(f'/api/v1/training-plans/{plan_id}', headers=auth(user))
+
+    async def plan_create(client, i):
+        user = pick_user(i)
+        response = await client.post(
+            '/api/v1/training-plans/', json=plan_payload(random.Random(i), args.weeks), headers=auth(user)
+        )
+        if response.status_code == 200:
+            created.append((user, response.json()['id']))
+        return response
+
+    async def plan_update(client, i):
+        user, plan_id = created[i % len(created)]
+        return await client.put(
+            '/api/v1/training-plans/',
+            json={'id': plan_id, 'plan_name': f'Updated {i}', 'weekly_distance_peak': '95.0'},
+            headers=auth(user),
+        )
+
+    async def plan_delete(client, i):
+        user, plan_id = created.pop()
+        return await client.delete(f'/api/v1/training-plans/{plan_id}', headers=auth(user))
+
+    # create runs before update and delete so they operate on plans made by this run
+    scenarios = [
+        Scenario('login', args.login_requests, login),
+        Scenario('users_me', args.requests, users_me),
+        Scenario('plans_list', args.requests, plans_list),
+        Scenario('plan_get', args.requests, plan_get),
+        Scenario('plan_create', args.requests, plan_create),
+        Scenario('plan_update', args.requests, plan_update),
+        Scenario('plan_delete', args.requests, plan_delete),
+    ]
+    if args.scenarios:
+        scenarios = [s for s in scenarios if s.name in args.scenarios]
+    return scenarios
+
+
+async def drive(client, make_request, total: int, concurrency: int, offset: int = 0) -> dict:
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < total:
+            start = time.perf_counter()
+            try:
+                response = await make_request(client, offset + i)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, errors)
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int) -> dict:
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+        'p99_ms': round(p99 * 1000, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {previous["p95_ms"]}ms -> {current["p95_ms"]}ms')
+        if current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f'{name}: throughput {previous["rps"]} -> {current["rps"]} req/s')
+        if current['errors'] > previous['errors']:
+            regressions.append(f'{name}: errors {previous["errors"]} -> {current["errors"]}')
+    return regressions
+
+
+def current_environment() -> dict:
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def environment_mismatch(recorded: dict, current: dict) -> list[str]:
+    """How the environment a baseline was recorded in differs from this one (patch releases aside)."""
+    differences = []
+    for key in ('python', 'machine', 'cpus'):
+        before, now = recorded.get(key), current.get(key)
+        if key == 'python' and before and now:
+            before, now = before.rsplit('.', 1)[0], now.rsplit('.', 1)[0]
+        if before != now:
+            differences.append(f'{key} {recorded.get(key)} (baseline) vs {current.get(key)} (this run)')
+    return differences
+
+
+def print_report(results: dict, baseline: dict | None) -> None:
+    header = f'{"scenario":<14}{"reqs":>7}{"errs":>6}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>10}'
+    if baseline:
+        header += f'{"base p95":>10}{"base r/s":>10}'
+    print(header)
+    for name, r in results.items():
+        line = f'{name:<14}{r["requests"]:>7}{r["errors"]:>6}{r["p50_ms"]:>10}{r["p95_ms"]:>10}{r["p99_ms"]:>10}{r["rps"]:>10}'
+        previous = (baseline or {}).get('results', {}).get(name)
+        if previous:
+            line += f'{previous["p95_ms"]:>10}{previous["rps"]:>10}'
+        print(line)
+
+
+def run_config(args) -> dict:
+    return {
+        'users': args.users,
+        'plans_per_user': args.plans_per_user,
+        'weeks': args.weeks,
+        'requests': args.requests,
+        'login_requests': args.login_requests,
+        'concurrency': args.concurrency,
+        'seed': args.seed,
+    }
+
+
+async def main(args) -> int:
+    import alembic.config
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from tenflow.config import settings
+
+    database = settings.POSTGRES_DATABASE
+    root_engine = create_async_engine(settings.get_root_postgres_url(), isolation_level='AUTOCOMMIT')
+    async with root_engine.connect() as conn:
+        await conn.execute(text(f'CREATE DATABASE "{database}"'))
+    try:
+        alembic.config.main(argv=['-q', '--raiseerr', 'upgrade', 'head'])
+        rng = random.Random(args.seed)
+
+        started = time.perf_counter()
+        users = await seed(args, rng)
+        print(f'Seeded {len(users)} users / {len(users) * args.plans_per_user} plans '
+              f'in {time.perf_counter() - started:.1f}s into {database}')
+
+        from tenflow.main import app
+
+        if not args.verbose:
+            # Under saturation nearly every statement crosses the slow-query threshold
+            logging.getLogger('tenflow').setLevel(logging.ERROR)
+        results = {}
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://bench') as client:
+            for scenario in build_scenarios(args, users, rng):
+                if scenario.name != 'plan_delete':
+                    await drive(client, scenario.make_request, args.warmup, args.concurrency, offset=10**6)
+                results[scenario.name] = await drive(client, scenario.make_request, scenario.requests, args.concurrency)
+    finally:
+        import tenflow.database as db
+
+        for engine in (db.engine, db.read_only_engine):
+            if engine is not None:
+                await engine.dispose()
+        if not args.keep_db:
+            async with root_engine.connect() as conn:
+                await conn.execute(text(f'DROP DATABASE IF EXISTS "{database}" WITH (FORCE)'))
+        await root_engine.dispose()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    mismatch = environment_mismatch(baseline.get('environment', {}), current_environment()) if baseline else []
+    print_report(results, None if mismatch else baseline)
+
+    run = {
+        'config': run_config(args),
+        'environment': current_environment(),
+        'results': results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(run, indent=2) + '\n')
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(run, indent=2) + '\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+    if baseline is None:
+        print('No baseline found; run with --update-baseline to record one.')
+        return 0
+    if mismatch:
+        print(f'Not compared: the baseline was recorded elsewhere ({"; ".join(mismatch)}).')
+        return 2
+    if baseline.get('config') != run['config']:
+        print('Warning: baseline was recorded with a different configuration; comparison is approximate.')
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    os.chdir(BACKEND_DIR)
+    # Point the app at a throwaway database before anything imports tenflow.config
+    os.environ['POSTGRES_DATABASE'] = f'bench_{uuid.uuid4().hex[:8]}'
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+CPU versus bandwidth tradeoff of response compression on plan-heavy payloads.
+
+Renders training plan responses the way the API does (a single plan and list
+pages of plans with full ``plan_data``). It then compresses them with every
+available encoding at a range of levels, through the same encoders
+CompressionMiddleware uses. For each setting it reports compressed size and
+ratio, CPU time per response, and the time to send the response over a few
+link speeds (CPU time plus transfer time).
+
+    uv run python benchmarks/compression_benchmark.py
+    uv run python benchmarks/compression_benchmark.py --weeks 24 --plans 1 25 100 --repeat 20
+
+No database is needed.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+
+from api_benchmark import plan_payload
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+LEVELS = {
+    'gzip': [1, 5, 6, 9],
+    'br': [1, 4, 6, 9, 11],
+    'zstd': [1, 3, 6, 9, 15, 19],
+}
+LINKS_MBIT = {'3g': 1.5, '4g': 20, 'wifi': 100}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--weeks', type=int, default=16, help='weeks of plan_data per plan')
+    parser.add_argument('--plans', type=int, nargs='*', default=[1, 25, 100], help='plans per response')
+    parser.add_argument('--repeat', type=int, default=10, help='compressions timed per setting')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=Path, help='write the results as JSON')
+    return parser.parse_args(argv)
+
+
+def render_plans(rng: random.Random, count: int, weeks: int) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+
+    from tenflow.core.tracing import TracedJSONResponse
+    from tenflow.models import TrainingPlanRead
+
+    now = datetime.now(UTC)
+    plans = [
+        TrainingPlanRead(id=uuid.UUID(int=rng.getrandbits(128)), created_at=now, updated_at=now, **plan_payload(rng, weeks))
+        for _ in range(count)
+    ]
+    content = plans[0] if count == 1 else plans
+    return TracedJSONResponse(jsonable_encoder(content)).body
+
+
+def measure(encoding: str, level: int, body: bytes, repeat: int) -> dict:
+    from tenflow.core.compression import compress
+
+    compressed = compress(encoding, level, body)
+    started = time.process_time()
+    for _ in range(repeat):
+        compress(encoding, level, body)
+    cpu_ms = (time.process_time() - started) / repeat * 1000
+    return {'bytes': len(compressed), 'ratio': round(len(body) / len(compressed), 2), 'cpu_ms': round(cpu_ms, 3)}
+
+
+def transfer_ms(size: int, mbit: float) -> float:
+    return size * 8 / (mbit * 1_000_000) * 1000
+
+
+def main(args) -> int:
+    sys.path.insert(0, str(BACKEND_DIR / 'src'))
+    from tenflow.core.compression import ENCODERS
+
+    rng = random.Random(args.seed)
+    report = {}
+    for count in args.plans:
+        body = render_plans(rng, count, args.weeks)
+        rows = {'identity': {'bytes': len(body), 'ratio': 1.0, 'cpu_ms': 0.0}}
+        for encoding in ENCODERS:
+            for level in LEVELS[encoding]:
+                rows[f'{encoding}-{level}'] = measure(encoding, level, body, args.repeat)
+        report[f'{count} plan(s)'] = rows
+
+        links = ''.join(f'{name + " ms":>10}' for name in LINKS_MBIT)
+        print(f'\n{count} plan(s), {len(body):,} bytes uncompressed')
+        print(f'{"encoding":<10}{"bytes":>11}{"ratio":>8}{"cpu ms":>9}{links}')
+        for name, r in rows.items():
+            totals = ''.join(f'{r["cpu_ms"] + transfer_ms(r["bytes"], mbit):>10.1f}' for mbit in LINKS_MBIT.values())
+            print(f'{name:<10}{r["bytes"]:>11,}{r["ratio"]:>8}{r["cpu_ms"]:>9}{totals}')
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(parse_args()))
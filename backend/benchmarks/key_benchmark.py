@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Insert throughput with random (uuid4) versus time-ordered (uuid7) primary keys.
+
+For each kind of key, a throwaway table shaped like the hot columns of
+``training_activities`` is filled in batches (one transaction per batch, keys
+generated in Python as the models do). The benchmark reports rows per second
+overall and over the last tenth of the load, once the primary key index is
+large. It also reports WAL written per row and the final size of the primary
+key index. Random keys split pages all over the index, so they write more WAL
+(full page images after each checkpoint) and leave the index larger, its
+pages partly filled. Time-ordered keys only ever append to its right-hand edge.
+
+Differences grow with the table: use enough rows that the index outgrows
+shared_buffers to see the cache effects.
+
+    uv run python benchmarks/key_benchmark.py
+    uv run python benchmarks/key_benchmark.py --rows 2000000 --batch 5000 --output keys.json
+
+Requires PostgreSQL reachable with the POSTGRES_* settings (see config.py);
+the user must be allowed to create databases and run CHECKPOINT.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import timeit
+import uuid
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+KINDS = ('uuid4', 'uuid7')
+USERS = 1000
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500_000, help='rows inserted per kind of key')
+    parser.add_argument('--batch', type=int, default=1000, help='rows per insert (and transaction)')
+    parser.add_argument('--kinds', nargs='*', choices=KINDS, default=list(KINDS))
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the row contents')
+    parser.add_argument('--output', type=Path, help='write the results as JSON')
+    parser.add_argument('--keep-db', action='store_true', help='do not drop the benchmark database')
+    return parser.parse_args(argv)
+
+
+def generators() -> dict:
+    from tenflow.core.ids import uuid7
+
+    return {'uuid4': uuid.uuid4, 'uuid7': uuid7}
+
+
+def generation_ns(generate, number: int = 100_000) -> float:
+    return timeit.timeit(generate, number=number) / number * 1e9
+
+
+def batch_rows(rng: random.Random, user_ids: list[uuid.UUID], start: datetime, size: int) -> dict:
+    return {
+        'user_ids': [rng.choice(user_ids) for _ in range(size)],
+        'start_dates': [start + timedelta(minutes=rng.randrange(525_600)) for _ in range(size)],
+        'names': [f'Run {rng.randrange(10_000)}' for _ in range(size)],
+        'distances': [round(rng.uniform(3, 30), 2) for _ in range(size)],
+    }
+
+
+async def load(engine, kind: str, generate, args) -> dict:
+    from sqlalchemy import ARRAY, UUID, DateTime, Float, String, bindparam, text
+
+    table = f'bench_{kind}'
+    insert = text(
+        f'INSERT INTO {table} (id, user_id, start_date, name, distance) '
+        'SELECT * FROM unnest(:ids, :user_ids, :start_dates, :names, :distances)'
+    ).bindparams(
+        bindparam('ids', type_=ARRAY(UUID())),
+        bindparam('user_ids', type_=ARRAY(UUID())),
+        bindparam('start_dates', type_=ARRAY(DateTime(timezone=True))),
+        bindparam('names', type_=ARRAY(String())),
+        bindparam('distances', type_=ARRAY(Float())),
+    )
+    async with engine.connect() as conn:
+        await conn.execute(
+            text(
+                f'CREATE TABLE {table} (id uuid PRIMARY KEY, user_id uuid NOT NULL, '
+                'start_date timestamptz NOT NULL, name varchar NOT NULL, distance real NOT NULL)'
+            )
+        )
+        await conn.commit()
+        # every kind starts from a checkpoint, so each pays for its own full page images
+        await conn.execute(text('CHECKPOINT'))
+        wal_start = (await conn.execute(text('SELECT pg_current_wal_lsn()'))).scalar_one()
+
+        # the same row contents for every kind; only the keys differ
+        rng = random.Random(args.seed)
+        user_ids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(USERS)]
+        start = datetime(2025, 1, 1, tzinfo=UTC)
+        tail_from = args.rows - args.rows // 10
+        tail_rows, tail_seconds, elapsed = 0, 0.0, 0.0
+        for offset in range(0, args.rows, args.batch):
+            size = min(args.batch, args.rows - offset)
+            rows = batch_rows(rng, user_ids, start, size)
+            began = time.perf_counter()
+            # generated per row as the rows are written, as the models do
+            await conn.execute(insert, {'ids': [generate() for _ in range(size)], **rows})
+            await conn.commit()
+            seconds = time.perf_counter() - began
+            elapsed += seconds
+            if offset >= tail_from:
+                tail_rows += size
+                tail_seconds += seconds
+
+        stats = (
+            await conn.execute(
+                text(
+                    'SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :wal_start) AS wal, '
+                    f"pg_relation_size('{table}_pkey') AS index, pg_relation_size('{table}') AS heap"
+                ),
+                {'wal_start': wal_start},
+            )
+        ).one()
+        await conn.commit()
+
+    return {
+        'rows': args.rows,
+        'rows_per_s': round(args.rows / elapsed),
+        'tail_rows_per_s': round(tail_rows / tail_seconds) if tail_seconds else None,
+        'wal_bytes_per_row': round(float(stats.wal) / args.rows, 1),
+        'index_mb': round(stats.index / 2**20, 1),
+        'heap_mb': round(stats.heap / 2**20, 1),
+        'generate_ns': round(generation_ns(generate)),
+    }
+
+
+def print_report(results: dict) -> None:
+    print(f'{"key":<8}{"rows/s":>10}{"tail r/s":>10}{"WAL B/row":>11}{"index MB":>10}{"heap MB":>9}{"gen ns":>8}')
+    for kind, r in results.items():
+        print(
+            f'{kind:<8}{r["rows_per_s"]:>10}{r["tail_rows_per_s"]:>10}{r["wal_bytes_per_row"]:>11}'
+            f'{r["index_mb"]:>10}{r["heap_mb"]:>9}{r["generate_ns"]:>8}'
+        )
+
+
+async def main(args) -> int:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from tenflow.config import settings
+
+    database = settings.POSTGRES_DATABASE
+    root_engine = create_async_engine(settings.get_root_postgres_url(), isolation_level='AUTOCOMMIT')
+    async with root_engine.connect() as conn:
+        await conn.execute(text(f'CREATE DATABASE "{database}"'))
+    engine = create_async_engine(settings.get_postgres_url())
+    results = {}
+    try:
+        available = generators()
+        for kind in args.kinds:
+            results[kind] = await load(engine, kind, available[kind], args)
+            print(f'Loaded {args.rows:,} rows with {kind} keys', file=sys.stderr)
+    finally:
+        await engine.dispose()
+        if not args.keep_db:
+            async with root_engine.connect() as conn:
+                await conn.execute(text(f'DROP DATABASE IF EXISTS "{database}" WITH (FORCE)'))
+        await root_engine.dispose()
+
+    print_report(results)
+    if args.output:
+        config = {'rows': args.rows, 'batch': args.batch, 'seed': args.seed}
+        args.output.write_text(json.dumps({'config': config, 'results': results}, indent=2) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, str(BACKEND_DIR / 'src'))
+    # A throwaway database, chosen before anything imports tenflow.config
+    os.environ['POSTGRES_DATABASE'] = f'bench_{uuid.uuid4().hex[:8]}'
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare `tenflow serve` with the previous single-process uvicorn setup.
+
+Starts each server on a local port, drives keep-alive HTTP load at it over real
+sockets and reports p50/p95/p99 latency and throughput per server and path:
+
+- single: `uvicorn tenflow.main:app` (one process, uvicorn's defaults)
+- serve:  `tenflow serve` (one worker per CPU, uvloop + httptools)
+
+    uv run python benchmarks/server_benchmark.py
+    uv run python benchmarks/server_benchmark.py --workers 4 --concurrency 64 --paths /health /api/v1/openapi.json
+
+The load generator runs on the same machine and competes for CPU with the
+workers; run it on a host with spare cores for representative numbers. Paths
+that touch the database need PostgreSQL reachable with the POSTGRES_* settings.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from api_benchmark import drive
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paths', nargs='*', default=['/health', '/api/v1/openapi.json'])
+    parser.add_argument('--requests', type=int, default=2000, help='measured requests per path')
+    parser.add_argument('--warmup', type=int, default=100, help='unmeasured requests per path')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent keep-alive connections')
+    parser.add_argument('--workers', type=int, help='workers for tenflow serve (default: CPUs)')
+    parser.add_argument('--servers', nargs='*', default=['single', 'serve'], choices=['single', 'serve'])
+    parser.add_argument('--output', type=Path, help='write the results as JSON')
+    return parser.parse_args(argv)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(name: str, port: int, workers: int | None) -> list[str]:
+    if name == 'single':
+        return [sys.executable, '-m', 'uvicorn', 'tenflow.main:app', '--port', str(port), '--log-level', 'warning']
+    command = [sys.executable, '-m', 'tenflow.cli', 'serve', '--host', '127.0.0.1', '--port', str(port)]
+    if workers:
+        command += ['--workers', str(workers)]
+    return command
+
+
+async def wait_until_up(base_url: str, timeout: float = 30) -> None:
+    from httpx import AsyncClient, HTTPError
+
+    deadline = time.monotonic() + timeout
+    async with AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                if (await client.get('/health')).status_code == 200:
+                    return
+            except HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'server at {base_url} did not come up')
+            await asyncio.sleep(0.2)
+
+
+async def load(base_url: str, args) -> dict:
+    from httpx import AsyncClient, Limits
+
+    limits = Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with AsyncClient(base_url=base_url, limits=limits) as client:
+        for path in args.paths:
+
+            async def make_request(client, i, path=path):
+                return await client.get(path)
+
+            await drive(client, make_request, args.warmup, args.concurrency)
+            results[path] = await drive(client, make_request, args.requests, args.concurrency)
+    return results
+
+
+def run_server(name: str, args) -> dict:
+    port = free_port()
+    env = {**os.environ, 'PYTHONPATH': str(BACKEND_DIR / 'src'), 'TRACING_EXPORTER': ''}
+    process = subprocess.Popen(
+        server_command(name, port, args.workers),
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        asyncio.run(wait_until_up(base_url))
+        return asyncio.run(load(base_url, args))
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main(args) -> int:
+    report = {name: run_server(name, args) for name in args.servers}
+
+    print(f'{"server":<8}{"path":<24}{"reqs":>7}{"errs":>6}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>10}')
+    for name, results in report.items():
+        for path, r in results.items():
+            print(
+                f'{name:<8}{path:<24}{r["requests"]:>7}{r["errors"]:>6}'
+                f'{r["p50_ms"]:>10}{r["p95_ms"]:>10}{r["p99_ms"]:>10}{r["rps"]:>10}'
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(parse_args()))
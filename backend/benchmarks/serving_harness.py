@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Modal serving setup in modal_deploy.py.
+
+Measures, without calling Modal:
+
+- cold start: fresh interpreters that import the app and serve one request,
+  either straight away (no snapshot) or after `warm_up()` (what a container
+  restored from a memory snapshot still pays for its first request);
+- concurrency: one "container" whose ASGI app admits at most --max-inputs
+  requests at a time (as `@modal.concurrent` does), driven at increasing
+  offered load and compared with one input at a time.
+
+    uv run python benchmarks/serving_harness.py
+    uv run python benchmarks/serving_harness.py --max-inputs 32 --load 1 8 32 64
+    uv run python benchmarks/serving_harness.py --path /api/v1/users/me --header 'Authorization: Bearer ...'
+
+Paths other than the database-free defaults need PostgreSQL reachable with the
+POSTGRES_* settings.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from api_benchmark import drive
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+COLD_START_SCRIPT = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from httpx import ASGITransport, AsyncClient
+from tenflow.main import app, warm_up
+imported = time.perf_counter()
+if sys.argv[1] == 'snapshot':
+    warm_up(app)
+warmed = time.perf_counter()
+
+async def first_request():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://localhost') as client:
+        response = await client.get(sys.argv[2])
+    assert response.status_code < 500, response.text
+
+asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'warm_up_ms': (warmed - imported) * 1000,
+    'first_request_ms': (done - warmed) * 1000,
+    'total_ms': (done - started) * 1000,
+}))
+"""
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per cold-start mode')
+    parser.add_argument('--max-inputs', type=int, default=int(os.environ.get('MODAL_MAX_INPUTS', 32)))
+    parser.add_argument('--load', type=int, nargs='*', default=[1, 8, 32, 64], help='offered concurrency levels')
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per load level')
+    parser.add_argument('--path', default='/health', help='path to request')
+    parser.add_argument('--header', action='append', default=[], help="extra request header, 'Name: value'")
+    parser.add_argument('--skip-cold-start', action='store_true')
+    parser.add_argument('--output', type=Path, help='write the results as JSON')
+    return parser.parse_args(argv)
+
+
+def cold_start(mode: str, path: str, runs: int) -> dict:
+    env = {**os.environ, 'PYTHONPATH': str(BACKEND_DIR / 'src')}
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-c', COLD_START_SCRIPT, mode, path],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=BACKEND_DIR,
+            check=True,
+        )
+        samples.append(json.loads(completed.stdout.splitlines()[-1]))
+    return {key: round(statistics.median(s[key] for s in samples), 1) for key in samples[0]}
+
+
+class InputLimiter:
+    """ASGI wrapper admitting at most `max_inputs` concurrent HTTP requests, like a Modal container."""
+
+    def __init__(self, app, max_inputs: int):
+        self.app = app
+        self.semaphore = asyncio.Semaphore(max_inputs)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        async with self.semaphore:
+            await self.app(scope, receive, send)
+
+
+async def concurrency(args) -> dict:
+    from httpx import ASGITransport, AsyncClient
+
+    from tenflow.main import app, warm_up
+
+    warm_up(app)
+    headers = dict(h.split(':', 1) for h in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    results = {}
+    for max_inputs in sorted({1, args.max_inputs}):
+        transport = ASGITransport(app=InputLimiter(app, max_inputs))
+        async with AsyncClient(transport=transport, base_url='http://localhost', headers=headers) as client:
+
+            async def make_request(client, i):
+                return await client.get(args.path)
+
+            await drive(client, make_request, total=min(20, args.requests), concurrency=1)
+            for load in args.load:
+                results[f'inputs={max_inputs} load={load}'] = await drive(
+                    client, make_request, total=args.requests, concurrency=load
+                )
+    return results
+
+
+def main(args) -> int:
+    sys.path.insert(0, str(BACKEND_DIR / 'src'))
+    report = {}
+    if not args.skip_cold_start:
+        report['cold_start'] = {mode: cold_start(mode, args.path, args.runs) for mode in ('no_snapshot', 'snapshot')}
+        print(f'{"cold start":<14}{"import ms":>11}{"warm-up ms":>12}{"1st req ms":>12}{"total ms":>11}')
+        for mode, r in report['cold_start'].items():
+            print(f'{mode:<14}{r["import_ms"]:>11}{r["warm_up_ms"]:>12}{r["first_request_ms"]:>12}{r["total_ms"]:>11}')
+        print('(a snapshot-restored container pays roughly the snapshot "1st req ms" only)\n')
+
+    report['concurrency'] = asyncio.run(concurrency(args))
+    print(f'{"container":<24}{"reqs":>7}{"errs":>6}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>10}')
+    for name, r in report['concurrency'].items():
+        print(f'{name:<24}{r["requests"]:>7}{r["errors"]:>6}{r["p50_ms"]:>10}{r["p95_ms"]:>10}{r["p99_ms"]:>10}{r["rps"]:>10}')
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(parse_args()))
@@ -4,13 +4,30 @@ Modal deployment script for Tenflow FastAPI backend.
 This script sets up and deploys the Tenflow backend to Modal's serverless platform.
 """
 
+import os
+
 import modal
 
+from tenflow.cli import split_pool_budget
+
+# Serving capacity, read when the app is deployed.
+CPU = float(os.environ.get('MODAL_CPU', 1.0))
+MEMORY_MB = int(os.environ.get('MODAL_MEMORY_MB', 512))
+MIN_CONTAINERS = int(os.environ.get('MODAL_MIN_CONTAINERS', 0))
+MAX_CONTAINERS = int(os.environ.get('MODAL_MAX_CONTAINERS', 10))
+SCALEDOWN_WINDOW = int(os.environ.get('MODAL_SCALEDOWN_WINDOW', 300))
+MAX_INPUTS = int(os.environ.get('MODAL_MAX_INPUTS', 32))
+TARGET_INPUTS = int(os.environ.get('MODAL_TARGET_INPUTS', 24))
+# Connections shared by every container at full scale (both engines of each),
+# kept under PostgreSQL's max_connections.
+CONNECTION_BUDGET = int(os.environ.get('DATABASE_CONNECTION_BUDGET', 80))
+POOL_SIZE, MAX_OVERFLOW = split_pool_budget(CONNECTION_BUDGET, MAX_CONTAINERS)
+
 # Create Modal image with all required dependencies using uv sync
 image = (
     modal.Image.debian_slim(python_version='3.12')
     .apt_install('git')  # In case we need git for any dependencies
-    .uv_sync()  # Use uv to sync dependencies from pyproject.toml
+    .uv_sync(extras=['compression'])  # Use uv to sync dependencies from pyproject.toml
     .workdir('/root')
     .add_local_file('alembic.ini', remote_path='/root/alembic.ini')
     .add_local_dir('alembic', remote_path='/root/alembic')
@@ -30,33 +47,55 @@ app = modal.App(
 )
 
 
-@app.function(
-    # Configure resources as needed
-    cpu=1.0,
-    memory=512,
-    # Enable GPU if needed: gpu="any"
-    # Set timeout for long-running requests
+@app.cls(
+    cpu=CPU,
+    memory=MEMORY_MB,
     timeout=300,
-    # Allow concurrent requests
-    max_containers=10,
+    min_containers=MIN_CONTAINERS,
+    max_containers=MAX_CONTAINERS,
+    scaledown_window=SCALEDOWN_WINDOW,
+    # Capture the container after `load` so cold starts restore the imported,
+    # warmed app instead of re-importing it.
+    enable_memory_snapshot=True,
+    secrets=[
+        # Each container's share of the budget; inputs beyond it wait for a pooled connection.
+        modal.Secret.from_dict({'DATABASE_POOL_SIZE': str(POOL_SIZE), 'DATABASE_MAX_OVERFLOW': str(MAX_OVERFLOW)}),
+    ],
 )
-@modal.asgi_app()
-def fastapi_app():
+@modal.concurrent(max_inputs=MAX_INPUTS, target_inputs=TARGET_INPUTS)
+class FastAPIApp:
     """
     Main FastAPI application entry point for Modal deployment.
 
-    This function imports and returns the FastAPI app instance.
-    The import is done inside the function to ensure all dependencies
-    are available in the Modal environment.
+    The app is async, so each container serves many inputs at once. Migrations are
+    not run here; deploy with `make modal-deploy`, which runs them first.
     """
-    # Import the FastAPI app from your main module
-    from tenflow.main import app as fastapi_app
 
-    return fastapi_app
+    @modal.enter(snap=True)
+    def load(self):
+        # Runs once, before the snapshot is taken. Nothing here may open sockets
+        # (database connections are created lazily on the first request).
+        from tenflow.main import app, warm_up
+
+        warm_up(app)
+        self.app = app
+
+    @modal.enter(snap=False)
+    def reseed(self):
+        # Every container restored from the snapshot starts from the same
+        # `random` state; reseed it from the OS so they don't draw alike.
+        import random
+
+        random.seed()
+
+    @modal.asgi_app()
+    def fastapi_app(self):
+        return self.app
 
 
 @app.function()
 def run_migrations():
+    """Upgrade the database to head. A deploy prerequisite, never part of serving."""
     import alembic.config
 
     alembic_args = [
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic, production-like dataset.
+
+Creates N users, each with training plans, prescribed workouts, activities
+(with Strava-style ``activity_data``), weekly compliance scores and, for most
+users, a Strava connection. Rows are bulk-loaded with COPY; users are split
+into batches that are generated and loaded in parallel worker processes, one
+transaction per batch.
+
+Output is deterministic: every user draws from its own RNG seeded with
+``(--seed, user number)``, the password hash is salted from ``--seed`` and
+dates are anchored to ``--anchor-date``. The same arguments always produce the
+same rows regardless of worker count or batch size, and a dataset appended
+with ``--user-offset`` never repeats the users before it.
+
+    uv run python scripts/generate_dataset.py --users 50
+    uv run python scripts/generate_dataset.py --users 100000 --workers 8 --truncate
+
+The schema must already be migrated (``alembic upgrade head``).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+import asyncpg
+
+from tenflow.config import settings
+from tenflow.core.security import get_pwd_context
+
+TABLES = {
+    'users': [
+        'id', 'email', 'full_name', 'hashed_password', 'is_active', 'is_superuser', 'access_token',
+        'created_at', 'updated_at',
+    ],
+    'strava_connections': [
+        'id', 'user_id', 'strava_user_id', 'access_token', 'refresh_token', 'expires_at', 'athlete_data',
+        'connected_at', 'last_sync', 'created_at', 'updated_at',
+    ],
+    'training_plans': [
+        'id', 'user_id', 'goal', 'plan_name', 'start_date', 'end_date', 'duration_weeks', 'fitness_level',
+        'weekly_distance_base', 'weekly_distance_peak', 'training_days_per_week', 'plan_data', 'is_active',
+        'created_at', 'updated_at',
+    ],
+    'prescribed_workouts': [
+        'id', 'training_plan_id', 'user_id', 'workout_date', 'workout_time', 'workout_type', 'distance',
+        'duration_minutes', 'intensity_zone', 'rpe_target', 'workout_description', 'workout_data',
+        'is_completed', 'created_at', 'updated_at',
+    ],
+    'training_activities': [
+        'id', 'user_id', 'prescribed_workout_id', 'name', 'activity_type', 'actual_workout', 'activity_data',
+        'start_date', 'strava_activity_id', 'distance', 'compliance_score', 'moving_time', 'elapsed_time',
+        'total_elevation_gain', 'average_heartrate', 'max_heartrate', 'rpe_prescribed', 'rpe_actual',
+        'created_at', 'updated_at',
+    ],
+    'compliance_scores': [
+        'id', 'user_id', 'week_start', 'workout_compliance', 'intensity_compliance', 'recovery_compliance',
+        'overall_compliance', 'activities_prescribed', 'activities_completed', 'created_at', 'updated_at',
+    ],
+}
+
+GOALS = [
+    ('Marathon', 16, 20),
+    ('Half Marathon', 10, 14),
+    ('10K', 8, 10),
+    ('5K', 6, 8),
+    ('50K Ultra', 16, 24),
+    ('100 Mile Ultra', 24, 40),
+]
+FITNESS_LEVELS = ['beginner', 'intermediate', 'advanced']
+SURFACES = ['road', 'trail', 'track', 'mixed']
+# (workout type, intensity zone, share of a week's distance, pace in min/km for z1..z5)
+WORKOUTS = {
+    'easy': ('z2', 0.15, 'Easy aerobic run at conversational pace'),
+    'recovery': ('z1', 0.08, 'Very easy recovery jog, keep heart rate low'),
+    'tempo': ('z3', 0.15, 'Warm up 15 min, 20-30 min at tempo effort, cool down'),
+    'intervals': ('z4', 0.12, 'Track session: 6 x 800m at 5K pace with 400m jog recovery'),
+    'hills': ('z4', 0.12, 'Hill repeats: 8 x 90s uphill hard, jog back down'),
+    'long': ('z2', 0.30, 'Long run, steady effort, practice race nutrition'),
+    'race_pace': ('z3', 0.18, 'Long run with the final third at goal race pace'),
+    'vo2max': ('z5', 0.10, '5 x 3 min at VO2max effort with equal recovery'),
+}
+PACE_BY_ZONE = {'z1': 7.0, 'z2': 6.0, 'z3': 5.0, 'z4': 4.5, 'z5': 4.1}
+HR_BY_ZONE = {'z1': 125, 'z2': 140, 'z3': 155, 'z4': 168, 'z5': 178}
+DEVICES = ['Garmin Forerunner 265', 'Garmin Fenix 7', 'COROS Pace 3', 'Apple Watch Ultra', 'Suunto Race']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Casey', 'Riley', 'Morgan', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Kipchoge', 'Radcliffe', 'Jurek', 'Dauwalter', 'Walmsley', 'Hasay', 'Flanagan', 'Rupp']
+BCRYPT_SALT_CHARS = './ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50, help='number of users to generate')
+    parser.add_argument('--seed', type=int, default=0, help='random seed; same seed, same data')
+    parser.add_argument('--batch-size', type=int, default=500, help='users per COPY batch / transaction')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='parallel loader processes')
+    parser.add_argument('--user-offset', type=int, default=0, help='first user number, to append to a dataset')
+    parser.add_argument(
+        '--anchor-date', type=date.fromisoformat, default=date(2026, 1, 5), help='"today" for generated histories'
+    )
+    parser.add_argument('--password', default='password', help='password shared by every generated user')
+    parser.add_argument('--truncate', action='store_true', help='empty all generated tables first')
+    parser.add_argument('--dsn', help='PostgreSQL DSN (defaults to the POSTGRES_* settings)')
+    return parser.parse_args(argv)
+
+
+def default_dsn() -> str:
+    # asyncpg takes a plain libpq URL, without SQLAlchemy's driver suffix
+    return settings.get_postgres_url().replace('+asyncpg', '')
+
+
+@dataclass
+class Batch:
+    rows: dict[str, list[tuple]] = field(default_factory=lambda: {table: [] for table in TABLES})
+
+    def add(self, table: str, row: dict) -> None:
+        self.rows[table].append(tuple(row[column] for column in TABLES[table]))
+
+
+class Generator:
+    def __init__(self, seed: int, anchor: date, hashed_password: str):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.anchor = anchor
+        self.hashed_password = hashed_password
+
+    def new_id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def timestamp(self, day: date, hour: float = 12.0) -> datetime:
+        return datetime.combine(day, dt_time(0, tzinfo=UTC)) + timedelta(hours=hour)
+
+    def user(self, batch: Batch, number: int) -> None:
+        rng = self.rng = random.Random(f'{self.seed}:{number}')
+        user_id = self.new_id()
+        joined = self.anchor - timedelta(days=rng.randint(30, 3 * 365))
+        created = self.timestamp(joined, rng.uniform(0, 24))
+        batch.add(
+            'users',
+            {
+                'id': user_id,
+                'email': f'user{number:08d}@example.com',
+                'full_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                'hashed_password': self.hashed_password,
+                'is_active': rng.random() > 0.02,
+                'is_superuser': False,
+                'access_token': None,
+                'created_at': created,
+                'updated_at': created,
+            },
+        )
+        if rng.random() < 0.7:
+            self.strava_connection(batch, user_id, joined)
+
+        plan_start = joined + timedelta(days=rng.randint(0, 30))
+        plan_start -= timedelta(days=plan_start.weekday())
+        for _ in range(rng.choices([1, 2, 3], weights=[5, 3, 2])[0]):
+            goal, min_weeks, max_weeks = rng.choice(GOALS)
+            weeks = rng.randint(min_weeks, max_weeks)
+            self.plan(batch, user_id, goal, weeks, plan_start)
+            plan_start += timedelta(weeks=weeks + rng.randint(1, 6))
+            if plan_start > self.anchor + timedelta(weeks=8):
+                break
+
+    def strava_connection(self, batch: Batch, user_id: uuid.UUID, joined: date) -> None:
+        rng = self.rng
+        connected = self.timestamp(joined + timedelta(days=rng.randint(0, 14)), rng.uniform(0, 24))
+        athlete_id = rng.randint(1_000_000, 150_000_000)
+        batch.add(
+            'strava_connections',
+            {
+                'id': self.new_id(),
+                'user_id': user_id,
+                'strava_user_id': str(athlete_id),
+                'access_token': f'{rng.getrandbits(160):040x}',
+                'refresh_token': f'{rng.getrandbits(160):040x}',
+                'expires_at': self.timestamp(self.anchor, rng.uniform(0, 6)),
+                'athlete_data': json.dumps(
+                    {
+                        'id': athlete_id,
+                        'sex': rng.choice(['M', 'F']),
+                        'city': rng.choice(['Boulder', 'Flagstaff', 'Portland', 'Chamonix', 'Nairobi']),
+                        'weight': round(rng.uniform(50, 90), 1),
+                        'premium': rng.random() < 0.3,
+                    }
+                ),
+                'connected_at': connected,
+                'last_sync': self.timestamp(self.anchor - timedelta(days=rng.randint(0, 3)), rng.uniform(0, 24)),
+                'created_at': connected,
+                'updated_at': connected,
+            },
+        )
+
+    def plan(self, batch: Batch, user_id: uuid.UUID, goal: str, weeks: int, start: date) -> None:
+        rng = self.rng
+        plan_id = self.new_id()
+        fitness = rng.choice(FITNESS_LEVELS)
+        base = {'beginner': 25, 'intermediate': 45, 'advanced': 70}[fitness] * rng.uniform(0.8, 1.2)
+        peak = base * rng.uniform(1.4, 1.8)
+        days_per_week = rng.randint(3, 6) if fitness == 'beginner' else rng.randint(4, 7)
+        end = start + timedelta(weeks=weeks) - timedelta(days=1)
+        created = self.timestamp(start - timedelta(days=rng.randint(1, 10)), rng.uniform(0, 24))
+
+        week_plans = []
+        for week in range(weeks):
+            phase = 'base' if week < weeks * 0.4 else 'build' if week < weeks * 0.75 else 'peak'
+            if week >= weeks - 2:
+                phase = 'taper'
+            ramp = week / max(weeks - 3, 1)
+            distance = base + (peak - base) * min(ramp, 1.0)
+            if phase == 'taper':
+                distance = peak * (0.6 if week == weeks - 2 else 0.4)
+            elif week % 4 == 3:
+                distance *= 0.8  # cutback week
+            week_plans.append({'week': week + 1, 'phase': phase, 'distance': round(distance, 1)})
+
+        batch.add(
+            'training_plans',
+            {
+                'id': plan_id,
+                'user_id': user_id,
+                'goal': goal,
+                'plan_name': f'{weeks}-Week {goal} Plan',
+                'start_date': start,
+                'end_date': end,
+                'duration_weeks': weeks,
+                'fitness_level': fitness,
+                'weekly_distance_base': Decimal(f'{base:.1f}'),
+                'weekly_distance_peak': Decimal(f'{peak:.1f}'),
+                'training_days_per_week': days_per_week,
+                'plan_data': json.dumps(
+                    {
+                        'goal_race': goal,
+                        'race_date': end.isoformat(),
+                        'surface': rng.choice(SURFACES),
+                        'phases': sorted({w['phase'] for w in week_plans}, key=[w['phase'] for w in week_plans].index),
+                        'weeks': week_plans,
+                    }
+                ),
+                'is_active': start <= self.anchor <= end,
+                'created_at': created,
+                'updated_at': created,
+            },
+        )
+
+        for week_plan in week_plans:
+            week_start = start + timedelta(weeks=week_plan['week'] - 1)
+            days = sorted(rng.sample(range(7), days_per_week))
+            types = ['long'] + [rng.choice(list(WORKOUTS)) for _ in days[1:]]
+            rng.shuffle(types)
+            prescribed = completed = 0
+            zone_hits = 0
+            for day, workout_type in zip(days, types, strict=True):
+                done, on_zone = self.workout(
+                    batch, user_id, plan_id, week_start + timedelta(days=day), workout_type, week_plan['distance']
+                )
+                prescribed += 1
+                completed += done
+                zone_hits += on_zone
+            if week_start + timedelta(days=7) <= self.anchor:
+                self.compliance(batch, user_id, week_start, prescribed, completed, zone_hits)
+
+    def workout(
+        self, batch: Batch, user_id, plan_id, day: date, workout_type: str, week_distance: float
+    ) -> tuple[int, int]:
+        rng = self.rng
+        zone, share, description = WORKOUTS[workout_type]
+        distance = round(max(week_distance * share * rng.uniform(0.8, 1.2), 3.0), 1)
+        duration = round(distance * PACE_BY_ZONE[zone] * rng.uniform(0.95, 1.05))
+        time_of_day = 'morning' if rng.random() < 0.7 else 'afternoon'
+        workout_id = self.new_id()
+        in_past = day < self.anchor
+        completed = in_past and rng.random() < 0.85
+        created = self.timestamp(day - timedelta(days=rng.randint(7, 60)))
+
+        batch.add(
+            'prescribed_workouts',
+            {
+                'id': workout_id,
+                'training_plan_id': plan_id,
+                'user_id': user_id,
+                'workout_date': day,
+                'workout_time': time_of_day,
+                'workout_type': workout_type,
+                'distance': Decimal(f'{distance:.1f}'),
+                'duration_minutes': duration,
+                'intensity_zone': zone,
+                'rpe_target': {'z1': 2, 'z2': 3, 'z3': 6, 'z4': 8, 'z5': 9}[zone],
+                'workout_description': description,
+                'workout_data': json.dumps({'warmup_minutes': 10, 'cooldown_minutes': 10, 'zone': zone}),
+                'is_completed': completed,
+                'created_at': created,
+                'updated_at': self.timestamp(day, 22) if completed else created,
+            },
+        )
+        if not completed:
+            return 0, 0
+        on_zone = self.activity(batch, user_id, workout_id, day, time_of_day, workout_type, zone, distance)
+        return 1, on_zone
+
+    def activity(self, batch: Batch, user_id, workout_id, day, time_of_day, workout_type, zone, distance) -> int:
+        rng = self.rng
+        actual_distance = distance * rng.uniform(0.85, 1.15)
+        actual_zone = zone if rng.random() < 0.75 else f'z{min(5, max(1, int(zone[1]) + rng.choice([-1, 1])))}'
+        pace = PACE_BY_ZONE[actual_zone] * rng.uniform(0.93, 1.07)  # min/km
+        moving_time = int(actual_distance * pace * 60)
+        elapsed_time = int(moving_time * rng.uniform(1.0, 1.12))
+        average_hr = int(HR_BY_ZONE[actual_zone] + rng.gauss(0, 4))
+        elevation_gain = round(actual_distance * rng.uniform(2, 25), 1)
+        hour = rng.uniform(5.5, 9) if time_of_day == 'morning' else rng.uniform(16, 19.5)
+        start = self.timestamp(day, hour)
+
+        splits = []
+        remaining = actual_distance
+        split = 1
+        while remaining > 0:
+            split_distance = min(remaining, 1.0)
+            split_pace = pace * rng.uniform(0.95, 1.05)
+            splits.append(
+                {
+                    'split': split,
+                    'distance': round(split_distance * 1000, 1),
+                    'moving_time': int(split_distance * split_pace * 60),
+                    'average_speed': round(1000 / (split_pace * 60), 3),
+                    'average_heartrate': round(average_hr + rng.gauss(0, 3), 1),
+                    'elevation_difference': round(rng.gauss(0, 6), 1),
+                }
+            )
+            remaining -= split_distance
+            split += 1
+
+        on_zone = int(actual_zone == zone)
+        compliance = max(0.0, 1 - abs(actual_distance - distance) / distance - (0 if on_zone else 0.2))
+        synced = start + timedelta(seconds=elapsed_time + rng.randint(60, 7200))
+        batch.add(
+            'training_activities',
+            {
+                'id': self.new_id(),
+                'user_id': user_id,
+                'prescribed_workout_id': workout_id,
+                'name': f'{"Morning" if time_of_day == "morning" else "Afternoon"} {workout_type.replace("_", " ")} run',
+                'activity_type': 'Run',
+                'actual_workout': json.dumps(
+                    {'type': workout_type, 'distance': round(actual_distance, 2), 'zone': actual_zone}
+                ),
+                'activity_data': json.dumps(
+                    {
+                        'device_name': rng.choice(DEVICES),
+                        'average_cadence': round(rng.uniform(160, 185), 1),
+                        'average_speed': round(1000 / (pace * 60), 3),
+                        'max_speed': round(1000 / (pace * 60) * rng.uniform(1.1, 1.4), 3),
+                        'calories': int(actual_distance * rng.uniform(55, 75)),
+                        'elev_high': round(rng.uniform(10, 2500), 1),
+                        'weather': {'temperature_c': round(rng.uniform(-5, 32), 1), 'humidity': rng.randint(20, 95)},
+                        'splits_metric': splits,
+                    }
+                ),
+                'start_date': start,
+                'strava_activity_id': str(rng.randint(10**9, 2 * 10**10)),
+                'distance': Decimal(f'{actual_distance:.2f}'),
+                'compliance_score': Decimal(f'{compliance:.3f}'),
+                'moving_time': moving_time,
+                'elapsed_time': elapsed_time,
+                'total_elevation_gain': Decimal(f'{elevation_gain:.1f}'),
+                'average_heartrate': average_hr,
+                'max_heartrate': average_hr + rng.randint(8, 25),
+                'rpe_prescribed': {'z1': 2, 'z2': 3, 'z3': 6, 'z4': 8, 'z5': 9}[zone],
+                'rpe_actual': min(10, max(1, {'z1': 2, 'z2': 3, 'z3': 6, 'z4': 8, 'z5': 9}[actual_zone] + rng.randint(-1, 1))),
+                'created_at': synced,
+                'updated_at': synced,
+            },
+        )
+        return on_zone
+
+    def compliance(self, batch: Batch, user_id, week_start: date, prescribed: int, completed: int, zone_hits: int):
+        rng = self.rng
+        workout = completed / prescribed if prescribed else 0
+        intensity = zone_hits / completed if completed else 0
+        recovery = rng.uniform(0.6, 1.0)
+        created = self.timestamp(week_start + timedelta(days=7), 3)
+        batch.add(
+            'compliance_scores',
+            {
+                'id': self.new_id(),
+                'user_id': user_id,
+                'week_start': week_start,
+                'workout_compliance': Decimal(f'{workout:.3f}'),
+                'intensity_compliance': Decimal(f'{intensity:.3f}'),
+                'recovery_compliance': Decimal(f'{recovery:.3f}'),
+                'overall_compliance': Decimal(f'{(workout + intensity + recovery) / 3:.3f}'),
+                'activities_prescribed': prescribed,
+                'activities_completed': completed,
+                'created_at': created,
+                'updated_at': created,
+            },
+        )
+
+
+def password_hash(password: str, seed: int) -> str:
+    """The bcrypt hash the app would store for ``password``, with a salt drawn from ``seed``."""
+    rng = random.Random(f'{seed}:password')
+    # 22 characters of bcrypt's base64; the last one only carries 2 bits
+    salt = ''.join(rng.choice(BCRYPT_SALT_CHARS) for _ in range(21)) + rng.choice('.Oeu')
+    return get_pwd_context().handler('bcrypt').using(salt=salt).hash(password)
+
+
+def generate_batch(seed: int, first_user: int, count: int, anchor: date, hashed_password: str):
+    generator = Generator(seed, anchor, hashed_password)
+    batch = Batch()
+    for number in range(first_user, first_user + count):
+        generator.user(batch, number)
+    return batch
+
+
+async def copy_batch(dsn: str, batch: Batch) -> None:
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute('SET synchronous_commit = off')
+        async with connection.transaction():
+            for table, columns in TABLES.items():
+                if batch.rows[table]:
+                    await connection.copy_records_to_table(table, records=batch.rows[table], columns=columns)
+    finally:
+        await connection.close()
+
+
+def load_batch(dsn, seed, first_user, count, anchor, hashed_password) -> dict[str, int]:
+    """Worker entry point: generate one batch of users and COPY it in a single transaction."""
+    batch = generate_batch(seed, first_user, count, anchor, hashed_password)
+    asyncio.run(copy_batch(dsn, batch))
+    return {table: len(rows) for table, rows in batch.rows.items()}
+
+
+async def truncate(dsn: str) -> None:
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(f'TRUNCATE {", ".join(TABLES)} CASCADE')
+    finally:
+        await connection.close()
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    dsn = args.dsn or default_dsn()
+    hashed_password = password_hash(args.password, args.seed)
+    if args.truncate:
+        asyncio.run(truncate(dsn))
+
+    started = time.perf_counter()
+    totals = dict.fromkeys(TABLES, 0)
+    jobs = []
+    for first in range(0, args.users, args.batch_size):
+        count = min(args.batch_size, args.users - first)
+        jobs.append((dsn, args.seed, args.user_offset + first, count, args.anchor_date, hashed_password))
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(load_batch, *job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            for table, rows in future.result().items():
+                totals[table] += rows
+            elapsed = time.perf_counter() - started
+            print(f'[{done}/{len(jobs)}] {sum(totals.values()):,} rows in {elapsed:.1f}s', file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    total = sum(totals.values())
+    for table, rows in totals.items():
+        print(f'{table:<22}{rows:>14,}')
+    print(f'{"total":<22}{total:>14,}  ({elapsed:.1f}s, {total / elapsed:,.0f} rows/s)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,24 @@
 from fastapi import APIRouter
-from tenflow.api.v1.endpoints import auth, users, training_plans
+from tenflow.api.v1.endpoints import (
+    auth,
+    users,
+    training_plans,
+    prescribed_workouts,
+    training_activities,
+    search,
+    sync,
+    dashboard,
+    debug,
+)
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix='/auth', tags=['auth'])
 api_router.include_router(users.router, prefix='/users', tags=['users'])
 api_router.include_router(training_plans.router, prefix='/training-plans', tags=['training-plans'])
+api_router.include_router(prescribed_workouts.router, prefix='/prescribed-workouts', tags=['prescribed-workouts'])
+api_router.include_router(training_activities.router, prefix='/training-activities', tags=['training-activities'])
+api_router.include_router(search.router, prefix='/search', tags=['search'])
+api_router.include_router(sync.router, prefix='/sync', tags=['sync'])
+api_router.include_router(dashboard.router, prefix='/dashboard', tags=['dashboard'])
+api_router.include_router(debug.router, prefix='/debug', tags=['debug'])
@@ -0,0 +1,155 @@
+"""
+Everything the dashboard page shows, in one round trip.
+
+The user comes from the auth dependency. The active plan, this week's
+prescribed workouts, recent activities and compliance scores are read in a
+single statement, one JSON subquery each, on the request's read-only session
+(the one auth already holds), so a request never needs a second connection.
+The rendered body is cached per user for ``DASHBOARD_CACHE_TTL_SECONDS``, and
+writes to training plans invalidate it.
+"""
+
+import datetime as dt
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import DateTime, Float, Numeric, Text, cast, func, select
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.orm import Session
+
+from tenflow.config import settings
+from tenflow.core.cache import dashboard_cache
+from tenflow.core.deps import get_current_active_user
+from tenflow.core.tracing import span
+from tenflow.database import get_read_only_session_gen
+from tenflow.models import (
+    ComplianceScore,
+    ComplianceScoreRead,
+    DashboardRead,
+    DashboardUser,
+    PrescribedWorkout,
+    PrescribedWorkoutRead,
+    TrainingActivity,
+    TrainingActivityRead,
+    TrainingPlan,
+    TrainingPlanRead,
+    User,
+    WeekSummary,
+)
+
+router = APIRouter()
+
+COMPLIANCE_WEEKS = 4
+
+
+def _json_value(column):
+    # numerics as text keep their digits (JSON numbers would come back as floats);
+    # timestamps in UTC, as asyncpg returns them for the ORM
+    if isinstance(column.type, Numeric) and not isinstance(column.type, Float):
+        return cast(column, Text)
+    if isinstance(column.type, DateTime) and column.type.timezone:
+        return func.to_char(func.timezone('UTC', column), 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"')
+    return column
+
+
+def _json_rows(schema: type[BaseModel], statement, *order_by):
+    """The rows of ``statement`` in ``order_by`` order, as a JSON array of ``schema``'s fields."""
+    rows = statement.add_columns(func.row_number().over(order_by=order_by).label('position'))
+    rows = rows.order_by(*order_by).subquery()
+    fields = [part for name in schema.model_fields for part in (name, _json_value(rows.c[name]))]
+    aggregate = func.jsonb_agg(aggregate_order_by(func.jsonb_build_object(*fields), rows.c.position), type_=JSONB)
+    return select(func.coalesce(aggregate, func.jsonb_build_array(), type_=JSONB)).scalar_subquery()
+
+
+def _active_plan(user_id: UUID):
+    return _json_rows(
+        TrainingPlanRead,
+        select(TrainingPlan).where(TrainingPlan.user_id == user_id, TrainingPlan.is_active.is_(True)).limit(1),
+        TrainingPlan.created_at.desc(),
+    )
+
+
+def _week_workouts(user_id: UUID, week_start: dt.date):
+    return _json_rows(
+        PrescribedWorkoutRead,
+        select(PrescribedWorkout).where(
+            PrescribedWorkout.user_id == user_id,
+            PrescribedWorkout.workout_date >= week_start,
+            PrescribedWorkout.workout_date < week_start + timedelta(days=7),
+        ),
+        PrescribedWorkout.workout_date,
+        PrescribedWorkout.workout_time,
+    )
+
+
+def _recent_activities(user_id: UUID, limit: int):
+    return _json_rows(
+        TrainingActivityRead,
+        select(TrainingActivity).where(TrainingActivity.user_id == user_id).limit(limit),
+        TrainingActivity.start_date.desc(),
+    )
+
+
+def _compliance(user_id: UUID, week_start: dt.date):
+    return _json_rows(
+        ComplianceScoreRead,
+        select(ComplianceScore)
+        .where(ComplianceScore.user_id == user_id, ComplianceScore.week_start <= week_start)
+        .limit(COMPLIANCE_WEEKS),
+        ComplianceScore.week_start.desc(),
+    )
+
+
+def _week_summary(week_start: dt.date, workouts: list[PrescribedWorkoutRead]) -> WeekSummary:
+    completed = [workout for workout in workouts if workout.is_completed]
+    return WeekSummary(
+        week_start=week_start,
+        workouts_prescribed=len(workouts),
+        workouts_completed=len(completed),
+        distance_prescribed=sum((workout.distance for workout in workouts), Decimal(0)),
+        distance_completed=sum((workout.distance for workout in completed), Decimal(0)),
+    )
+
+
+@router.get('/', response_model=DashboardRead)
+async def read_dashboard(
+    session: Session = Depends(get_read_only_session_gen),
+    current_user: User = Depends(get_current_active_user),
+    today: dt.date | None = Query(None, description="the client's local date (default: today in UTC)"),
+    recent: int = Query(10, ge=1, le=50, description='number of recent activities'),
+) -> Any:
+    """
+    Get the current user's dashboard: active plan, this week's workouts, recent activities and compliance.
+    """
+    today = today or datetime.now(UTC).date()
+    params = (today, recent)
+    headers = {'Cache-Control': f'private, max-age={settings.DASHBOARD_CACHE_TTL_SECONDS}'}
+
+    body = dashboard_cache.get(current_user.id, params)
+    if body is None:
+        week_start = today - timedelta(days=today.weekday())
+        statement = select(
+            _active_plan(current_user.id),
+            _week_workouts(current_user.id, week_start),
+            _recent_activities(current_user.id, recent),
+            _compliance(current_user.id, week_start),
+        )
+        with span('dashboard.load'):
+            active_plan, workouts, activities, compliance = (await session.execute(statement)).one()
+        workouts = [PrescribedWorkoutRead.model_validate(w) for w in workouts]
+        dashboard = DashboardRead(
+            user=DashboardUser.model_validate(current_user, from_attributes=True),
+            active_plan=TrainingPlanRead.model_validate(active_plan[0]) if active_plan else None,
+            week=_week_summary(week_start, workouts),
+            week_workouts=workouts,
+            recent_activities=[TrainingActivityRead.model_validate(a) for a in activities],
+            compliance=[ComplianceScoreRead.model_validate(c) for c in compliance],
+        )
+        body = dashboard.model_dump_json().encode()
+        dashboard_cache.set(current_user.id, params, body, settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+    return Response(body, media_type='application/json', headers=headers)
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from enum import StrEnum
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from tenflow.core.deps import get_current_active_superuser
+from tenflow.core.sampling_profiler import SamplingProfiler
+from tenflow.models import User
+
+router = APIRouter()
+
+# Only one profile may run per worker; overlapping samplers would skew each other.
+_profile_lock = threading.Lock()
+
+
+class ProfileFormat(StrEnum):
+    COLLAPSED = 'collapsed'
+    SPEEDSCOPE = 'speedscope'
+
+
+@router.get('/profile')
+async def profile(
+    seconds: float = Query(5.0, gt=0, le=60),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    format: ProfileFormat = Query(ProfileFormat.COLLAPSED),
+    include_tasks: bool = Query(True),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Sample every thread (and asyncio task) of this worker for `seconds` and return the stacks.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail='A profile is already running on this worker')
+    try:
+        profiler = SamplingProfiler(interval=interval_ms / 1000, include_tasks=include_tasks)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(profiler.stop)
+    finally:
+        _profile_lock.release()
+
+    headers = {'X-Profile-Samples': str(profiler.sample_count)}
+    if format == ProfileFormat.SPEEDSCOPE:
+        return JSONResponse(profiler.speedscope(), headers=headers)
+    return PlainTextResponse(profiler.collapsed(), headers=headers)
@@ -0,0 +1,114 @@
+"""
+Calendar queries over prescribed workouts.
+
+Ranges are read from the ``(user_id, workout_date)`` index through a
+server-side cursor and streamed out a chunk of rows at a time, so memory stays
+flat however many workouts a plan has. Clients asking for
+``application/x-ndjson`` get one workout per line; everyone else gets a JSON
+array, sent with chunked transfer encoding.
+
+A workout's workout_data is changed with a JSON Patch applied in the database.
+"""
+
+import datetime as dt
+from collections.abc import AsyncIterator
+from typing import Any
+from uuid import UUID
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from tenflow.core.cache import dashboard_cache
+from tenflow.core.deps import get_current_active_user
+from tenflow.core.json_patch import patch_owned_row
+from tenflow.database import get_session_gen, read_only_session_context
+from tenflow.models import IntensityZone, JsonPatchOperation, PrescribedWorkout, PrescribedWorkoutRead, User
+
+router = APIRouter()
+
+NDJSON = 'application/x-ndjson'
+# Rows fetched from the cursor and sent per chunk.
+CHUNK_ROWS = 200
+
+
+def workouts_in_range(
+    user_id, start: dt.date, end: dt.date, intensity_zones: list[IntensityZone] | None, is_completed: bool | None
+):
+    statement = select(PrescribedWorkout).where(
+        PrescribedWorkout.user_id == user_id,
+        PrescribedWorkout.workout_date >= start,
+        PrescribedWorkout.workout_date <= end,
+    )
+    if intensity_zones:
+        statement = statement.where(PrescribedWorkout.intensity_zone.in_(intensity_zones))
+    if is_completed is not None:
+        statement = statement.where(PrescribedWorkout.is_completed == is_completed)
+    return statement.order_by(PrescribedWorkout.workout_date, PrescribedWorkout.workout_time, PrescribedWorkout.id)
+
+
+async def _stream_chunks(statement, ndjson: bool) -> AsyncIterator[bytes]:
+    first = True
+    if not ndjson:
+        yield b'['
+    async with read_only_session_context() as session:
+        result = await session.stream_scalars(statement.execution_options(yield_per=CHUNK_ROWS))
+        async for partition in result.partitions():
+            rows = [
+                PrescribedWorkoutRead.model_validate(row, from_attributes=True).model_dump_json() for row in partition
+            ]
+            if ndjson:
+                yield ''.join(f'{row}\n' for row in rows).encode()
+            else:
+                yield (('' if first else ',') + ','.join(rows)).encode()
+                first = False
+    if not ndjson:
+        yield b']'
+
+
+@router.get(
+    '/',
+    response_model=list[PrescribedWorkoutRead],
+    responses={200: {'content': {NDJSON: {'schema': {'$ref': '#/components/schemas/PrescribedWorkoutRead'}}}}},
+)
+async def read_prescribed_workouts(
+    current_user: User = Depends(get_current_active_user),
+    start: dt.date = Query(..., alias='from', description='first workout date, inclusive'),
+    end: dt.date = Query(..., alias='to', description='last workout date, inclusive'),
+    intensity_zone: list[IntensityZone] | None = Query(None),
+    is_completed: bool | None = Query(None),
+    accept: str | None = Header(None),
+) -> Any:
+    """
+    Stream the current user's prescribed workouts between two dates, in date order.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+
+    ndjson = accept is not None and NDJSON in accept
+    statement = workouts_in_range(current_user.id, start, end, intensity_zone, is_completed)
+    return StreamingResponse(_stream_chunks(statement, ndjson), media_type=NDJSON if ndjson else 'application/json')
+
+
+@router.patch('/{workout_id}/workout-data', status_code=204, response_class=Response, response_model=None)
+async def patch_workout_data(
+    *,
+    session: Session = Depends(get_session_gen),
+    workout_id: UUID,
+    patch: list[JsonPatchOperation] = Body(..., media_type='application/json-patch+json'),
+    current_user: User = Depends(get_current_active_user),
+    if_match: str | None = Header(None),
+) -> Any:
+    """
+    Change parts of a prescribed workout's workout_data with a JSON Patch (RFC 6902).
+
+    Works as PATCH /training-plans/{id}/plan-data does.
+    """
+    operations = [operation.model_dump(by_alias=True, exclude_unset=True) for operation in patch]
+    etag = await patch_owned_row(
+        session, PrescribedWorkout.workout_data, workout_id, current_user.id, operations, if_match, 'Prescribed workout'
+    )
+    await session.commit()
+    dashboard_cache.invalidate(current_user.id)
+    return Response(status_code=204, headers={'ETag': etag})
@@ -0,0 +1,145 @@
+"""
+Full-text search over the current user's prescribed workouts and activities.
+
+Queries are parsed with ``websearch_to_tsquery`` (quoted phrases, ``or``,
+``-word``) and matched against generated ``search_vector`` columns through
+their GIN indexes, together with the user's rows from the ``user_id`` indexes;
+results are ranked with ``ts_rank_cd``. Headlines are only built for the page
+being returned.
+
+When nothing matches the words, and the pg_trgm extension is installed, the
+query is matched by trigram word similarity against workout descriptions and
+activity names instead (``<%``, served by trigram GIN indexes), which finds
+misspellings such as "threshhold" or "tempoo". (Swapped letters in a short word,
+as in "tmepo", share too few trigrams with it to match.)
+"""
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Date, cast, exists, func, literal, select, text, union_all
+from sqlalchemy.orm import Session
+
+from tenflow.core.deps import get_current_active_user
+from tenflow.database import get_read_only_session_gen
+from tenflow.models import PrescribedWorkout, SearchKind, SearchResult, TrainingActivity, User
+
+router = APIRouter()
+
+TEXT_SEARCH_CONFIG = 'english'
+HEADLINE_OPTIONS = 'MaxWords=20, MinWords=8, MaxFragments=2'
+
+# Whether pg_trgm is installed. Only a positive answer is kept for the process:
+# the extension may be installed while the server is up.
+_trigram_available = False
+
+
+async def trigram_available(session: Session) -> bool:
+    global _trigram_available
+    if not _trigram_available:
+        installed = await session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+        _trigram_available = installed.first() is not None
+    return _trigram_available
+
+
+def _full_text(user_id, query, kinds: set[SearchKind]):
+    tsquery = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+    selects = []
+    if SearchKind.WORKOUT in kinds:
+        selects.append(
+            select(
+                literal(SearchKind.WORKOUT.value).label('kind'),
+                PrescribedWorkout.id,
+                PrescribedWorkout.workout_type.label('title'),
+                PrescribedWorkout.workout_description.label('body'),
+                PrescribedWorkout.workout_date.label('date'),
+                func.ts_rank_cd(PrescribedWorkout.search_vector, tsquery).label('rank'),
+            ).where(PrescribedWorkout.user_id == user_id, PrescribedWorkout.search_vector.op('@@')(tsquery))
+        )
+    if SearchKind.ACTIVITY in kinds:
+        selects.append(
+            select(
+                literal(SearchKind.ACTIVITY.value).label('kind'),
+                TrainingActivity.id,
+                TrainingActivity.name.label('title'),
+                TrainingActivity.name.label('body'),
+                cast(TrainingActivity.start_date, Date).label('date'),
+                func.ts_rank_cd(TrainingActivity.search_vector, tsquery).label('rank'),
+            ).where(TrainingActivity.user_id == user_id, TrainingActivity.search_vector.op('@@')(tsquery))
+        )
+    return union_all(*selects), tsquery
+
+
+def _fuzzy(user_id, query, kinds: set[SearchKind]):
+    selects = []
+    if SearchKind.WORKOUT in kinds:
+        selects.append(
+            select(
+                literal(SearchKind.WORKOUT.value).label('kind'),
+                PrescribedWorkout.id,
+                PrescribedWorkout.workout_type.label('title'),
+                PrescribedWorkout.workout_date.label('date'),
+                func.word_similarity(query, PrescribedWorkout.workout_description).label('rank'),
+            ).where(
+                PrescribedWorkout.user_id == user_id,
+                literal(query).op('<%')(PrescribedWorkout.workout_description),
+            )
+        )
+    if SearchKind.ACTIVITY in kinds:
+        selects.append(
+            select(
+                literal(SearchKind.ACTIVITY.value).label('kind'),
+                TrainingActivity.id,
+                TrainingActivity.name.label('title'),
+                cast(TrainingActivity.start_date, Date).label('date'),
+                func.word_similarity(query, TrainingActivity.name).label('rank'),
+            ).where(TrainingActivity.user_id == user_id, literal(query).op('<%')(TrainingActivity.name))
+        )
+    return union_all(*selects)
+
+
+def _ranked(matches, skip: int, limit: int):
+    matches = matches.subquery('matches')
+    statement = (
+        select(matches)
+        .order_by(matches.c.rank.desc(), matches.c.date.desc(), matches.c.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return statement.subquery('page')
+
+
+@router.get('/', response_model=list[SearchResult])
+async def search(
+    session: Session = Depends(get_read_only_session_gen),
+    current_user: User = Depends(get_current_active_user),
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: list[SearchKind] | None = Query(None, description='only these kinds of results (default: all)'),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+) -> Any:
+    """
+    Search the current user's prescribed workouts and activities, best matches first.
+
+    Falls back to fuzzy (trigram) matching when no words match, if the server supports it.
+    """
+    user_id = current_user.id
+    kinds = set(kind or SearchKind)
+
+    matches, tsquery = _full_text(user_id, q, kinds)
+    page = _ranked(matches, skip, limit)
+    # headlines for the returned rows only: ts_headline re-parses the text
+    headline = func.ts_headline(TEXT_SEARCH_CONFIG, page.c.body, tsquery, HEADLINE_OPTIONS)
+    statement = select(page.c.kind, page.c.id, page.c.title, page.c.date, page.c.rank, headline.label('headline'))
+    rows = (await session.execute(statement.order_by(page.c.rank.desc(), page.c.date.desc(), page.c.id))).all()
+    if rows:
+        return [SearchResult.model_validate(row, from_attributes=True) for row in rows]
+
+    # nothing on this page: fall back only if nothing matched at all, so pages don't mix the two
+    if skip and (await session.execute(select(exists(matches.subquery())))).scalar():
+        return []
+    if not await trigram_available(session):
+        return []
+    page = _ranked(_fuzzy(user_id, q, kinds), skip, limit)
+    statement = select(page).order_by(page.c.rank.desc(), page.c.date.desc(), page.c.id)
+    return [SearchResult(**row._mapping, fuzzy=True) for row in await session.execute(statement)]
@@ -0,0 +1,111 @@
+"""
+Incremental sync of the current user's training plans, prescribed workouts and activities.
+
+``GET /sync`` returns a full snapshot and a watermark. Passing that watermark
+back as ``?since=`` returns only the rows created or updated since then (by
+the ``(user_id, updated_at)`` indexes) and the ids of rows deleted since then
+(from ``sync_tombstones``), together with the next watermark.
+
+Watermarks are opaque to clients. A watermark is never later than the start
+of any write transaction still in flight when it is issued, minus
+``SYNC_WATERMARK_MARGIN_SECONDS``, so rows committed after a sync are always
+picked up by the next one. The cost is that some rows are sent twice; clients
+apply changes as upserts. Watermarks older than the tombstone retention get a
+full snapshot (``full: true``) that replaces the client's copy.
+"""
+
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from tenflow.config import settings
+from tenflow.core.deps import get_current_active_user
+from tenflow.database import get_read_only_session_gen
+from tenflow.models import (
+    SYNCED_MODELS,
+    PrescribedWorkoutRead,
+    SyncChanges,
+    SyncResponse,
+    SyncTombstone,
+    TrainingActivityRead,
+    TrainingPlanRead,
+    User,
+)
+
+router = APIRouter()
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+READ_MODELS = {
+    'training_plans': TrainingPlanRead,
+    'prescribed_workouts': PrescribedWorkoutRead,
+    'training_activities': TrainingActivityRead,
+}
+
+# The oldest start of a transaction that has written and not yet committed, if any.
+WATERMARK_QUERY = text(
+    """
+    SELECT least(
+        statement_timestamp(),
+        (SELECT min(xact_start) FROM pg_stat_activity
+         WHERE datname = current_database() AND backend_xid IS NOT NULL)
+    )
+    """
+)
+
+
+def encode_watermark(moment: datetime) -> str:
+    return f'{(moment - _EPOCH) // timedelta(microseconds=1):x}'
+
+
+def decode_watermark(watermark: str) -> datetime:
+    try:
+        return _EPOCH + timedelta(microseconds=int(watermark, 16))
+    except (ValueError, OverflowError) as e:
+        raise HTTPException(status_code=400, detail='Invalid sync watermark') from e
+
+
+async def issue_watermark(session: Session) -> datetime:
+    safe_point = (await session.execute(WATERMARK_QUERY)).scalar_one()
+    return safe_point - timedelta(seconds=settings.SYNC_WATERMARK_MARGIN_SECONDS)
+
+
+@router.get('/', response_model=SyncResponse)
+async def sync(
+    session: Session = Depends(get_read_only_session_gen),
+    current_user: User = Depends(get_current_active_user),
+    since: str | None = Query(None, description='watermark from a previous sync; omit for a full snapshot'),
+) -> Any:
+    """
+    Changes to the current user's plans, workouts and activities since a watermark.
+    """
+    # Issued before reading, so anything committed while we read is newer than it.
+    watermark = await issue_watermark(session)
+
+    full = since is None
+    if not full:
+        since_at = decode_watermark(since)
+        full = since_at < watermark - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    changes = {}
+    for model, entity_type in SYNCED_MODELS.items():
+        read_model = READ_MODELS[entity_type]
+        changes[entity_type] = entity_changes = SyncChanges[read_model]()
+        statement = select(model).where(model.user_id == current_user.id).order_by(model.updated_at)
+        if not full:
+            statement = statement.where(model.updated_at >= since_at)
+        for row in (await session.execute(statement)).scalars():
+            bucket = entity_changes.created if full or row.created_at >= since_at else entity_changes.updated
+            bucket.append(read_model.model_validate(row, from_attributes=True))
+
+    if not full:
+        statement = select(SyncTombstone.entity_type, SyncTombstone.entity_id).where(
+            SyncTombstone.user_id == current_user.id, SyncTombstone.deleted_at >= since_at
+        )
+        for entity_type, entity_id in (await session.execute(statement)).all():
+            changes[entity_type].deleted.append(entity_id)
+
+    return SyncResponse(watermark=encode_watermark(watermark), full=full, **changes)
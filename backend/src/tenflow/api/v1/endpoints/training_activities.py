@@ -0,0 +1,254 @@
+from typing import Any
+from uuid import UUID
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from tenflow.config import settings
+from tenflow.core.cache import dashboard_cache, stream_cache
+from tenflow.core.deps import get_current_active_user
+from tenflow.core.etag import collection_etag, etag_matches, not_modified
+from tenflow.core.tracing import TracedJSONResponse
+from tenflow.database import get_read_only_session_gen, get_session_gen
+from tenflow.models import (
+    ActivityMatchResult,
+    ActivityStream,
+    ActivityStreamDownsampled,
+    ActivityStreamInfo,
+    ActivityStreamRead,
+    DownsampleMethod,
+    PersonalRecord,
+    PersonalRecordRead,
+    TrainingActivity,
+    TrainingActivityRead,
+    User,
+)
+from tenflow.training.matching import match_activities
+
+router = APIRouter()
+
+OCTET_STREAM = 'application/octet-stream'
+
+
+@router.post('/match', response_model=ActivityMatchResult)
+async def match_training_activities(
+    session: Session = Depends(get_session_gen),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Match the current user's unmatched activities to prescribed workouts, marking those workouts completed.
+
+    Activities that fit no workout stay unmatched and are listed in the response.
+    """
+    user_id = current_user.id
+    result = await match_activities(session, user_id)
+    await session.commit()
+    dashboard_cache.invalidate(user_id)
+    return ActivityMatchResult.model_validate(result, from_attributes=True)
+
+
+@router.get('/unmatched', response_model=list[TrainingActivityRead])
+async def read_unmatched_training_activities(
+    session: Session = Depends(get_read_only_session_gen),
+    current_user: User = Depends(get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """
+    Retrieve the current user's activities that aren't matched to a prescribed workout, newest first.
+    """
+    statement = (
+        select(TrainingActivity)
+        .where(TrainingActivity.user_id == current_user.id, TrainingActivity.prescribed_workout_id.is_(None))
+        .order_by(TrainingActivity.start_date.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    activities = (await session.execute(statement)).scalars().all()
+    return [TrainingActivityRead.model_validate(activity, from_attributes=True) for activity in activities]
+
+
+@router.get('/records', response_model=list[PersonalRecordRead])
+async def read_personal_records(
+    session: Session = Depends(get_read_only_session_gen),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the current user's personal records: fastest 1k to marathon and highest 20-minute heart rate.
+
+    Efforts no activity has been long enough for are left out.
+    """
+    from tenflow.training.best_efforts import EFFORTS
+
+    statement = select(PersonalRecord).where(PersonalRecord.user_id == current_user.id)
+    records = {record.effort: record for record in (await session.execute(statement)).scalars()}
+    return [
+        PersonalRecordRead.model_validate(records[effort.name], from_attributes=True)
+        for effort in EFFORTS
+        if effort.name in records
+    ]
+
+
+async def _owned_activity(session: Session, activity_id: UUID, user_id: UUID) -> None:
+    owner = (await session.execute(select(TrainingActivity.user_id).where(TrainingActivity.id == activity_id))).first()
+    if owner is None:
+        raise HTTPException(status_code=404, detail='Training activity not found')
+    if owner.user_id != user_id:
+        raise HTTPException(status_code=403, detail='Not enough permissions')
+
+
+async def _stream_info(session: Session, activity_id: UUID, user_id: UUID) -> list[ActivityStreamInfo]:
+    # metadata only; the samples themselves are never read
+    statement = (
+        select(
+            ActivityStream.channel,
+            ActivityStream.length,
+            ActivityStream.dims,
+            ActivityStream.dtype,
+            ActivityStream.compression,
+            func.octet_length(ActivityStream.data).label('stored_bytes'),
+        )
+        .where(ActivityStream.activity_id == activity_id, ActivityStream.user_id == user_id)
+        .order_by(ActivityStream.channel)
+    )
+    return [ActivityStreamInfo.model_validate(row, from_attributes=True) for row in await session.execute(statement)]
+
+
+@router.put('/{activity_id}/streams', response_model=list[ActivityStreamInfo])
+async def store_activity_streams(
+    *,
+    session: Session = Depends(get_session_gen),
+    activity_id: UUID,
+    streams: dict[str, list[float] | list[list[float]]] = Body(
+        ..., examples=[{'time': [0, 1, 2], 'heartrate': [120, 122, 125]}]
+    ),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Store recorded streams for an activity, one array of samples per channel.
+
+    Channels in the request replace the stored ones; other stored channels are kept.
+    The activity's derived metrics (time in zone, paces, training stress) are
+    recomputed from the result.
+    """
+    from tenflow.training.activity_metrics import update_activity_metrics
+    from tenflow.training.streams import store_streams
+
+    user_id = current_user.id
+    await _owned_activity(session, activity_id, user_id)
+    try:
+        await store_streams(session, activity_id, user_id, streams)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    await update_activity_metrics(session, user_id, [activity_id])
+    await session.commit()
+    dashboard_cache.invalidate(user_id)
+    return await _stream_info(session, activity_id, user_id)
+
+
+@router.get('/{activity_id}/streams', response_model=list[ActivityStreamInfo])
+async def read_activity_stream_info(
+    *,
+    session: Session = Depends(get_read_only_session_gen),
+    activity_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    List the stored channels of an activity's streams.
+    """
+    return await _stream_info(session, activity_id, current_user.id)
+
+
+@router.get(
+    '/{activity_id}/streams/{channel}',
+    response_model=ActivityStreamRead,
+    responses={200: {'content': {OCTET_STREAM: {}}}},
+)
+async def read_activity_stream(
+    *,
+    session: Session = Depends(get_read_only_session_gen),
+    activity_id: UUID,
+    channel: str,
+    current_user: User = Depends(get_current_active_user),
+    accept: str | None = Header(None),
+) -> Any:
+    """
+    Get one channel of an activity's streams.
+
+    With `Accept: application/octet-stream` the samples are sent as packed
+    little-endian float64 (shape in X-Stream-Shape) instead of JSON.
+    """
+    from tenflow.training.streams import load_streams, to_list
+
+    values = (await load_streams(session, activity_id, current_user.id, [channel])).get(channel)
+    if values is None:
+        raise HTTPException(status_code=404, detail='Stream not found')
+
+    if accept is not None and OCTET_STREAM in accept:
+        shape = ','.join(str(size) for size in values.shape)
+        return Response(values.astype('<f8').tobytes(), media_type=OCTET_STREAM, headers={'X-Stream-Shape': shape})
+    return TracedJSONResponse({'channel': channel, 'length': len(values), 'data': to_list(channel, values)})
+
+
+@router.get('/{activity_id}/streams/{channel}/downsampled', response_model=ActivityStreamDownsampled)
+async def read_downsampled_activity_stream(
+    *,
+    session: Session = Depends(get_read_only_session_gen),
+    activity_id: UUID,
+    channel: str,
+    current_user: User = Depends(get_current_active_user),
+    if_none_match: str | None = Header(None),
+    points: int = Query(500, ge=10, le=5000, description='at most this many samples are returned'),
+    method: DownsampleMethod = Query(DownsampleMethod.LTTB),
+) -> Any:
+    """
+    Get one channel of an activity's streams reduced to at most `points` samples, for charting.
+
+    Samples are plotted against the time stream when there is one. latlng is
+    reduced as a route (lttb only). Responses carry an ETag that changes when
+    the streams are uploaded again.
+    """
+    from tenflow.training.downsample import downsample
+    from tenflow.training.streams import load_streams, to_list
+
+    user_id = current_user.id
+    channels = [channel] if channel == 'time' else [channel, 'time']
+    statement = select(ActivityStream.channel, ActivityStream.updated_at).where(
+        ActivityStream.activity_id == activity_id,
+        ActivityStream.user_id == user_id,
+        ActivityStream.channel.in_(channels),
+    )
+    # the stored versions of the channel and the time stream tag both the ETag and the cache entry
+    versions = tuple(sorted(tuple(row) for row in await session.execute(statement)))
+    if channel not in {name for name, _ in versions}:
+        raise HTTPException(status_code=404, detail='Stream not found')
+    etag = collection_etag([(activity_id, updated_at) for _, updated_at in versions], versions, method, points)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    key = (activity_id, channel, method, points)
+    tag = (user_id, versions)
+    body = stream_cache.get(key, tag)
+    if body is None:
+        streams = await load_streams(session, activity_id, user_id, channels)
+        values, time = streams[channel], streams.get('time')
+        if time is not None and len(time) != len(values):
+            time = None
+        try:
+            index = downsample(values, time, method, points)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e)) from e
+        downsampled = ActivityStreamDownsampled(
+            channel=channel,
+            method=method,
+            length=len(values),
+            index=index.tolist(),
+            time=time[index].tolist() if time is not None else None,
+            data=to_list(channel, values[index]),
+        )
+        body = downsampled.model_dump_json().encode()
+        stream_cache.set(key, tag, body, settings.STREAM_CACHE_TTL_SECONDS)
+
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    return Response(body, media_type='application/json', headers=headers)
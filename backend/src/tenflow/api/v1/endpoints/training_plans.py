@@ -1,13 +1,29 @@
-from datetime import UTC, datetime
+import json
+from datetime import UTC, date, datetime
 from typing import Any
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import String, case, cast, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
+from tenflow.core.cache import dashboard_cache
+from tenflow.core.compression import compression
 from tenflow.core.deps import get_current_active_user
-from tenflow.database import get_session_gen
-from tenflow.models import User, TrainingPlan, TrainingPlanCreate, TrainingPlanRead, TrainingPlanUpdate
+from tenflow.core.etag import check_if_match, collection_etag, etag_matches, not_modified, row_etag
+from tenflow.core.json_patch import patch_owned_row
+from tenflow.database import get_read_only_session_gen, get_session_gen
+from tenflow.models import (
+    User,
+    JsonPatchOperation,
+    ReplanResult,
+    TrainingPlan,
+    TrainingPlanCreate,
+    TrainingPlanRead,
+    TrainingPlanUpdate,
+)
+from tenflow.training.replanning import replan
 
 router = APIRouter()
 
@@ -17,6 +33,7 @@ async def create_training_plan(
    *,
    session: Session = Depends(get_session_gen),
    training_plan_in: TrainingPlanCreate,
+   response: Response,
    current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -30,41 +47,148 @@ async def create_training_plan(
     session.add(training_plan)
     await session.commit()
     await session.refresh(training_plan)
+    dashboard_cache.invalidate(training_plan.user_id)
+    response.headers['ETag'] = row_etag(training_plan.id, training_plan.updated_at)
     return TrainingPlanRead.model_validate(training_plan, from_attributes=True)
 
 
+def user_training_plans(columns, user_id: UUID, is_active: bool | None, skip: int, limit: int):
+    statement = select(*columns).where(TrainingPlan.user_id == user_id)
+    if is_active is not None:
+        statement = statement.where(TrainingPlan.is_active == is_active)
+    return statement.offset(skip).limit(limit).order_by(TrainingPlan.created_at.desc())
+
+
 @router.get('/', response_model=list[TrainingPlanRead])
 async def read_training_plans(
+    response: Response,
     session: Session = Depends(get_session_gen),
     current_user: User = Depends(get_current_active_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     is_active: bool | None = Query(None),
+    if_none_match: str | None = Header(None),
 ) -> Any:
     """
     Retrieve training plans for the current user.
+
+    The ETag covers the returned page. A matching If-None-Match is answered
+    with 304 from an index-only scan of (id, updated_at), without loading the plans.
     """
-    statement = select(TrainingPlan).where(TrainingPlan.user_id == current_user.id)
-    
-    if is_active is not None:
-        statement = statement.where(TrainingPlan.is_active == is_active)
-    
-    statement = statement.offset(skip).limit(limit).order_by(TrainingPlan.created_at.desc())
+    if if_none_match:
+        versions = user_training_plans(
+            (TrainingPlan.id, TrainingPlan.updated_at), current_user.id, is_active, skip, limit
+        )
+        etag = collection_etag((await session.execute(versions)).all(), is_active, skip, limit)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    statement = user_training_plans((TrainingPlan,), current_user.id, is_active, skip, limit)
     result = await session.execute(statement)
     training_plans = result.scalars().all()
+    response.headers['ETag'] = collection_etag(
+        ((training_plan.id, training_plan.updated_at) for training_plan in training_plans), is_active, skip, limit
+    )
+    return [TrainingPlanRead.model_validate(training_plan, from_attributes=True) for training_plan in training_plans]
+
+
+# Constants rather than bind parameters, so the planner matches the expressions of
+# ix_training_plans_plan_attributes and ix_training_plans_race_date.
+PLAN_ATTRIBUTES = case(
+    (
+        func.jsonb_typeof(TrainingPlan.plan_data) == literal_column("'object'"),
+        TrainingPlan.plan_data.op('-', return_type=JSONB)(literal_column("'weeks'")),
+    ),
+)
+RACE_DATE = TrainingPlan.plan_data.op('->>', return_type=String)(literal_column("'race_date'"))
+
+
+def plan_data_filters(
+    goal_race: str | None, surface: str | None, phase: str | None, race_from: date | None, race_to: date | None
+) -> list:
+    """Conditions for the whitelisted plan_data attributes; the containment ones are merged into one index probe."""
+    contains: dict[str, Any] = {}
+    if goal_race is not None:
+        contains['goal_race'] = goal_race
+    if surface is not None:
+        contains['surface'] = surface
+    if phase is not None:
+        contains['phases'] = [phase]
+    conditions = [PLAN_ATTRIBUTES.op('@>')(cast(literal(json.dumps(contains)), JSONB))] if contains else []
+    # ISO dates compare as text in date order
+    if race_from is not None:
+        conditions.append(RACE_DATE >= race_from.isoformat())
+    if race_to is not None:
+        conditions.append(RACE_DATE <= race_to.isoformat())
+    return conditions
+
+
+@router.get('/search', response_model=list[TrainingPlanRead])
+async def search_training_plans(
+    session: Session = Depends(get_read_only_session_gen),
+    current_user: User = Depends(get_current_active_user),
+    goal_race: str | None = Query(None, max_length=100),
+    surface: str | None = Query(None, max_length=50),
+    phase: str | None = Query(None, max_length=50, description='plans with a phase of this name'),
+    race_from: date | None = Query(None, description='race date on or after'),
+    race_to: date | None = Query(None, description='race date on or before'),
+    user_id: UUID | None = Query(None, description='superusers: only this user\'s plans'),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """
+    Find training plans by attributes of their plan_data, newest first.
+
+    Superusers search everyone's plans; other users their own.
+    """
+    conditions = plan_data_filters(goal_race, surface, phase, race_from, race_to)
+    if not conditions:
+        raise HTTPException(status_code=400, detail='At least one plan attribute filter is required')
+    if not current_user.is_superuser:
+        if user_id is not None and user_id != current_user.id:
+            raise HTTPException(status_code=403, detail='Not enough permissions')
+        user_id = current_user.id
+    if user_id is not None:
+        conditions.append(TrainingPlan.user_id == user_id)
+    statement = (
+        select(TrainingPlan)
+        .where(*conditions)
+        .order_by(TrainingPlan.created_at.desc(), TrainingPlan.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    training_plans = (await session.execute(statement)).scalars().all()
     return [TrainingPlanRead.model_validate(training_plan, from_attributes=True) for training_plan in training_plans]
 
 
-@router.get('/{training_plan_id}', response_model=TrainingPlanRead)
+# Single plans are small (~16KB for 16 weeks): a higher level saves ~10% more for well under 1ms of CPU.
+@router.get(
+    '/{training_plan_id}',
+    response_model=TrainingPlanRead,
+    dependencies=[Depends(compression(gzip=6, br=6, zstd=6))],
+)
 async def read_training_plan(
     *,
     session: Session = Depends(get_session_gen),
     training_plan_id: UUID,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
+    if_none_match: str | None = Header(None),
 ) -> Any:
     """
     Get training plan by ID.
+
+    A matching If-None-Match is answered with 304 from an index-only lookup of
+    the plan's version, without loading the plan.
     """
+    if if_none_match:
+        statement = select(TrainingPlan.user_id, TrainingPlan.updated_at).where(TrainingPlan.id == training_plan_id)
+        version = (await session.execute(statement)).first()
+        if version is not None and version.user_id == current_user.id:
+            etag = row_etag(training_plan_id, version.updated_at)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
     training_plan = await session.get(TrainingPlan, training_plan_id)
     if not training_plan:
         raise HTTPException(status_code=404, detail='Training plan not found')
@@ -73,6 +197,7 @@ async def read_training_plan(
     if training_plan.user_id != current_user.id:
         raise HTTPException(status_code=403, detail='Not enough permissions')
     
+    response.headers['ETag'] = row_etag(training_plan.id, training_plan.updated_at)
     return TrainingPlanRead.model_validate(training_plan, from_attributes=True)
 
 
@@ -81,10 +206,14 @@ async def update_training_plan(
     *,
     session: Session = Depends(get_session_gen),
     training_plan_in: TrainingPlanUpdate,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
+    if_match: str | None = Header(None),
 ) -> Any:
     """
     Update a training plan.
+
+    With If-Match, the update only applies if the plan still has that ETag (412 otherwise).
     """
     training_plan_id: UUID = training_plan_in.id
     training_plan = await session.get(TrainingPlan, training_plan_id)
@@ -95,17 +224,51 @@ async def update_training_plan(
     if training_plan.user_id != current_user.id:
         raise HTTPException(status_code=403, detail='Not enough permissions')
     
+    check_if_match(if_match, row_etag(training_plan.id, training_plan.updated_at))
+
     training_plan_data = training_plan_in.model_dump(exclude_unset=True)
     for field, value in training_plan_data.items():
         setattr(training_plan, field, value)
     
     training_plan.updated_at = datetime.now(UTC)
     session.add(training_plan)
-    await session.commit()
+    try:
+        # the UPDATE is guarded by the version read above, so a concurrent write can't be lost
+        await session.commit()
+    except StaleDataError as e:
+        await session.rollback()
+        raise HTTPException(status_code=412, detail='The resource has changed; fetch it again and retry') from e
+    dashboard_cache.invalidate(current_user.id)
     await session.refresh(training_plan)
+    response.headers['ETag'] = row_etag(training_plan.id, training_plan.updated_at)
     return TrainingPlanRead.model_validate(training_plan, from_attributes=True)
 
 
+@router.patch('/{training_plan_id}/plan-data', status_code=204, response_class=Response, response_model=None)
+async def patch_training_plan_data(
+    *,
+    session: Session = Depends(get_session_gen),
+    training_plan_id: UUID,
+    patch: list[JsonPatchOperation] = Body(..., media_type='application/json-patch+json'),
+    current_user: User = Depends(get_current_active_user),
+    if_match: str | None = Header(None),
+) -> Any:
+    """
+    Change parts of a training plan's plan_data with a JSON Patch (RFC 6902).
+
+    The patch is applied in the database, so the document itself is neither sent
+    nor returned; the response carries the plan's new ETag. If an operation
+    doesn't apply the plan is left as it was (409).
+    """
+    operations = [operation.model_dump(by_alias=True, exclude_unset=True) for operation in patch]
+    etag = await patch_owned_row(
+        session, TrainingPlan.plan_data, training_plan_id, current_user.id, operations, if_match, 'Training plan'
+    )
+    await session.commit()
+    dashboard_cache.invalidate(current_user.id)
+    return Response(status_code=204, headers={'ETag': etag})
+
+
 @router.delete('/{training_plan_id}')
 async def delete_training_plan(
     *,
@@ -126,9 +289,43 @@ async def delete_training_plan(
     
     await session.delete(training_plan)
     await session.commit()
+    dashboard_cache.invalidate(current_user.id)
     return {'message': 'Training plan deleted successfully'}
 
 
+@router.post('/{training_plan_id}/replan', response_model=ReplanResult)
+async def replan_training_plan(
+    *,
+    session: Session = Depends(get_session_gen),
+    training_plan_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    today: date | None = Query(None, description="the client's local date (default: today in UTC)"),
+    dry_run: bool = Query(False, description='only report the changes'),
+) -> Any:
+    """
+    Adapt the rest of a training plan to the load run last week.
+
+    Only weeks whose load changes are rebuilt, and only their workouts still ahead;
+    the changed workouts are returned.
+    """
+    # locked, so concurrent replans of the same plan apply one after the other
+    statement = select(TrainingPlan).where(TrainingPlan.id == training_plan_id).with_for_update()
+    training_plan = (await session.execute(statement)).scalar_one_or_none()
+    if not training_plan:
+        raise HTTPException(status_code=404, detail='Training plan not found')
+    if training_plan.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail='Not enough permissions')
+
+    changes = await replan(session, training_plan, today or datetime.now(UTC).date(), apply=not dry_run)
+    result = ReplanResult.model_validate(changes, from_attributes=True)
+    if dry_run:
+        await session.rollback()
+    else:
+        await session.commit()
+        dashboard_cache.invalidate(current_user.id)
+    return result
+
+
 @router.get('/stats/count')
 async def get_training_plan_count(
     session: Session = Depends(get_session_gen),
@@ -1,16 +1,21 @@
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import or_, select, tuple_, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from tenflow.core import security
+from tenflow.core.cache import dashboard_cache
 from tenflow.core.deps import get_current_active_user, get_current_active_superuser
-from tenflow.models import User, UserCreate, UserRead, UserUpdate
-from tenflow.database import session_context, read_only_session_context, get_read_only_session_gen
+from tenflow.models import TrainingPlan, User, UserCreate, UserPage, UserRead, UserSummary, UserThresholds, UserUpdate
+from tenflow.database import session_context, read_only_session_context, get_read_only_session_gen, get_session_gen
 
 router = APIRouter()
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
 
 @router.post('/', response_model=UserRead)
 async def create_user(
@@ -43,7 +48,11 @@ async def create_user(
 @router.get('/me', response_model=UserRead)
 async def read_user_me(
     current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_read_only_session_gen),
 ) -> Any:
+    # the auth dependency loads the bare user; only this endpoint needs the plans
+    statement = select(TrainingPlan).where(TrainingPlan.user_id == current_user.id)
+    set_committed_value(current_user, 'training_plans', (await session.execute(statement)).scalars().all())
     return UserRead.model_validate(current_user, from_attributes=True)
 
 
@@ -71,6 +80,28 @@ async def update_user_me(
     return user_read
 
 
+@router.put('/me/thresholds', response_model=UserThresholds)
+async def update_user_thresholds(
+    *,
+    session: Session = Depends(get_session_gen),
+    thresholds: UserThresholds,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Set the thresholds heart-rate zones and training stress are measured against.
+
+    The metrics of the user's activities with streams are recomputed with the new values.
+    """
+    from tenflow.training.activity_metrics import update_activity_metrics
+
+    user_id = current_user.id
+    await session.execute(update(User).where(User.id == user_id).values(**thresholds.model_dump()))
+    await update_activity_metrics(session, user_id)
+    await session.commit()
+    dashboard_cache.invalidate(user_id)
+    return thresholds
+
+
 @router.get('/{user_id}', response_model=UserRead)
 async def read_user_by_id(
     user_id: UUID,
@@ -83,16 +114,56 @@ async def read_user_by_id(
             status_code=404,
             detail='The user with this id does not exist.',
         )
+    # loaded explicitly: a lazy load can't run on an async session
+    statement = select(TrainingPlan).where(TrainingPlan.user_id == user_id)
+    set_committed_value(user, 'training_plans', (await session.execute(statement)).scalars().all())
     return UserRead.model_validate(user, from_attributes=True)
 
 
-@router.get('/', response_model=list[UserRead])
+def encode_cursor(created_at: datetime, user_id: UUID) -> str:
+    return f'{(created_at - _EPOCH) // timedelta(microseconds=1):x}.{user_id.hex}'
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        micros, user_id = cursor.split('.')
+        return _EPOCH + timedelta(microseconds=int(micros, 16)), UUID(hex=user_id)
+    except (ValueError, OverflowError) as e:
+        raise HTTPException(status_code=400, detail='Invalid cursor') from e
+
+
+def _contains(text: str) -> str:
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+@router.get('/', response_model=UserPage)
 async def read_users(
     session: Session = Depends(get_read_only_session_gen),
-    skip: int = 0,
-    limit: int = 100,
+    q: str | None = Query(None, min_length=1, max_length=50, description='part of the email or full name'),
+    is_active: bool | None = Query(None),
+    cursor: str | None = Query(None, description='next_cursor of the previous page'),
+    limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
-    statement = select(User).offset(skip).limit(limit)
-    users = (await session.execute(statement)).all()
-    return [UserRead.model_validate(u, from_attributes=True) for u in users]
+    """
+    List users, newest first (superusers only).
+
+    Pages follow each other by keyset on (created_at, id), so every page costs
+    the same however deep it is, and users signing up meanwhile don't shift them.
+    """
+    statement = select(User.id, User.email, User.full_name, User.is_active, User.is_superuser, User.created_at)
+    if q is not None:
+        # plain ILIKE on the columns, so trigram indexes on them apply
+        pattern = _contains(q)
+        statement = statement.where(or_(User.email.ilike(pattern), User.full_name.ilike(pattern)))
+    if is_active is not None:
+        statement = statement.where(User.is_active == is_active)
+    if cursor is not None:
+        statement = statement.where(tuple_(User.created_at, User.id) < tuple_(*decode_cursor(cursor)))
+    statement = statement.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1)
+
+    rows = (await session.execute(statement)).all()
+    users = [UserSummary.model_validate(row, from_attributes=True) for row in rows[:limit]]
+    next_cursor = encode_cursor(users[-1].created_at, users[-1].id) if len(rows) > limit else None
+    return UserPage(users=users, next_cursor=next_cursor)
@@ -0,0 +1,189 @@
+"""
+The `tenflow` command.
+
+    tenflow serve                      # one worker per CPU, uvloop + httptools
+    tenflow serve --workers 4 --port 8080
+    tenflow serve --reload             # development
+    tenflow prune-tombstones           # drop sync tombstones past their retention
+    tenflow compute-metrics            # derive activity metrics not yet computed from streams
+
+`serve` runs uvicorn's multi-process supervisor with the app factory. Workers
+share the listening socket; the supervisor pings them and replaces any that
+die or stop answering. Send SIGHUP for a rolling restart: workers are replaced
+one at a time, and each old worker stops accepting, closes idle keep-alive
+connections and finishes in-flight requests (up to --graceful-timeout) before
+it exits.
+
+The connection pool budget (DATABASE_CONNECTION_BUDGET) is split across the
+workers and their two engines, so adding workers never multiplies the number
+of connections PostgreSQL has to hold.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import sys
+from datetime import UTC, datetime, timedelta
+
+from tenflow.config import settings
+
+ENGINES_PER_WORKER = 2  # primary and read-only
+
+
+def available_cpus() -> int:
+    # Honour CPU affinity / container cpusets where the platform exposes them.
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    return settings.WEB_CONCURRENCY or available_cpus()
+
+
+def split_pool_budget(budget: int, workers: int) -> tuple[int, int]:
+    """
+    Split a total connection budget into a per-engine (pool_size, max_overflow).
+
+    Half of each engine's share is kept open and half is overflow that is
+    only opened under load.
+    """
+    per_engine = budget // (workers * ENGINES_PER_WORKER)
+    if per_engine < 1:
+        raise ValueError(
+            f'a connection budget of {budget} cannot give each of {workers} workers '
+            f'{ENGINES_PER_WORKER} connections; raise the budget or use fewer workers'
+        )
+    pool_size = max(1, per_engine // 2)
+    return pool_size, per_engine - pool_size
+
+
+def require_fast_stack() -> None:
+    missing = [name for name in ('uvloop', 'httptools') if importlib.util.find_spec(name) is None]
+    if missing:
+        sys.exit(f'tenflow serve requires {" and ".join(missing)}; install uvicorn[standard]')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='tenflow', description='Tenflow API tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='run the API server')
+    serve.add_argument('--host', default='0.0.0.0')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--workers', type=int, default=None, help='worker processes (default: WEB_CONCURRENCY or CPUs)')
+    serve.add_argument(
+        '--connection-budget',
+        type=int,
+        default=settings.DATABASE_CONNECTION_BUDGET,
+        help='database connections shared by all workers (default: DATABASE_CONNECTION_BUDGET)',
+    )
+    serve.add_argument('--keep-alive', type=int, default=settings.SERVER_KEEP_ALIVE, help='keep-alive timeout (s)')
+    serve.add_argument(
+        '--graceful-timeout',
+        type=int,
+        default=settings.SERVER_GRACEFUL_TIMEOUT,
+        help='seconds a stopping worker waits for in-flight requests',
+    )
+    serve.add_argument('--max-requests', type=int, default=None, help='recycle a worker after this many requests')
+    serve.add_argument('--backlog', type=int, default=2048)
+    serve.add_argument('--reload', action='store_true', help='restart on code changes (single worker)')
+    serve.add_argument('--reload-dir', action='append', dest='reload_dirs')
+
+    prune = commands.add_parser('prune-tombstones', help='delete sync tombstones older than their retention')
+    prune.add_argument(
+        '--days',
+        type=int,
+        default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+        help='retention in days (default: SYNC_TOMBSTONE_RETENTION_DAYS; a shorter one loses deletes for syncing clients)',
+    )
+
+    metrics = commands.add_parser('compute-metrics', help='derive activity metrics (time in zone, paces, stress)')
+    metrics.add_argument('--all', action='store_true', help='recompute every activity, not only outdated ones')
+    return parser.parse_args(argv)
+
+
+def serve(args) -> None:
+    import uvicorn
+
+    require_fast_stack()
+    workers = 1 if args.reload else args.workers or default_workers()
+    if args.connection_budget:
+        pool_size, max_overflow = split_pool_budget(args.connection_budget, workers)
+        # Workers are spawned processes that read their settings from the environment.
+        os.environ['DATABASE_POOL_SIZE'] = str(pool_size)
+        os.environ['DATABASE_MAX_OVERFLOW'] = str(max_overflow)
+
+    uvicorn.run(
+        'tenflow.main:create_app',
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop='uvloop',
+        http='httptools',
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_max_requests=args.max_requests,
+        reload=args.reload,
+        reload_dirs=args.reload_dirs,
+        proxy_headers=True,
+        server_header=False,
+    )
+
+
+async def prune_tombstones(days: int) -> int:
+    from sqlalchemy import delete
+
+    from tenflow.database import session_context
+    from tenflow.models import SyncTombstone
+
+    cutoff = datetime.now(UTC) - timedelta(days=days)
+    async with session_context() as session:
+        result = await session.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff))
+        await session.commit()
+    return result.rowcount
+
+
+async def compute_metrics(recompute_all: bool = False) -> int:
+    from sqlalchemy import select
+
+    from tenflow.database import session_context
+    from tenflow.models import ActivityStream, TrainingActivity
+    from tenflow.training.activity_metrics import METRICS_VERSION, update_activity_metrics
+
+    statement = (
+        select(ActivityStream.user_id, ActivityStream.activity_id)
+        .join(TrainingActivity, TrainingActivity.id == ActivityStream.activity_id)
+        .distinct()
+    )
+    if not recompute_all:
+        statement = statement.where(TrainingActivity.metrics_version.is_distinct_from(METRICS_VERSION))
+    updated = 0
+    async with session_context() as session:
+        activities: dict = {}
+        for user_id, activity_id in await session.execute(statement):
+            activities.setdefault(user_id, []).append(activity_id)
+        # one transaction per user, so a long backfill holds no locks for long
+        for user_id, activity_ids in activities.items():
+            updated += await update_activity_metrics(session, user_id, activity_ids)
+            await session.commit()
+    return updated
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.command == 'serve':
+        serve(args)
+    elif args.command == 'prune-tombstones':
+        deleted = asyncio.run(prune_tombstones(args.days))
+        print(f'deleted {deleted} tombstones older than {args.days} days')
+    elif args.command == 'compute-metrics':
+        updated = asyncio.run(compute_metrics(args.all))
+        print(f'computed metrics for {updated} activities')
+
+
+if __name__ == '__main__':
+    main()
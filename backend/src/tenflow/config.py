@@ -14,6 +14,42 @@ class Settings(BaseSettings):
     DATABASE_POOL_TIMEOUT: int = 31
     LOGLEVEL: str = 'INFO'
 
+    # Query profiling
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    N_PLUS_ONE_THRESHOLD: int = 5
+    QUERY_PROFILE_HEADERS: bool = False
+
+    # Tracing ('' disables, 'console' or 'file')
+    TRACING_EXPORTER: str = ''
+    TRACING_FILE: str = 'traces/spans.jsonl'
+    TRACING_SAMPLE_RATE: float = 1.0
+
+    # Server (`tenflow serve`)
+    WEB_CONCURRENCY: int = 0  # workers; 0 sizes to the available CPUs
+    DATABASE_CONNECTION_BUDGET: int = 0  # connections shared by all workers; 0 keeps the per-worker pool settings
+    SERVER_KEEP_ALIVE: int = 5
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+
+    # Response compression (brotli and zstd need the `compression` extra)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_CONTENT_TYPES: str = 'application/json,application/x-ndjson,application/problem+json,text/*'
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Incremental sync (/sync)
+    SYNC_WATERMARK_MARGIN_SECONDS: int = 5  # overlap covering app/database clock skew
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90  # older watermarks get a full snapshot
+
+    # Dashboard (/dashboard)
+    DASHBOARD_CACHE_TTL_SECONDS: int = 15  # 0 disables the per-user cache
+    DASHBOARD_CACHE_MAX_USERS: int = 10000  # per worker
+
+    # Downsampled activity streams (/training-activities/{id}/streams/{channel}/downsampled)
+    STREAM_CACHE_TTL_SECONDS: int = 3600  # entries are checked against the stored streams on every hit
+    STREAM_CACHE_MAX_ENTRIES: int = 5000  # per worker
+
     # Security
     SECRET_KEY: str = 'your-secret-key-here-change-in-production'
     ALGORITHM: str = 'HS256'
@@ -0,0 +1,56 @@
+"""
+Short-lived in-process cache for per-user responses.
+
+One entry per user (or other key), tagged with the request parameters it was
+built for, so a lookup with other parameters is a miss. Entries live in the worker that built
+them: endpoints that change what an entry covers call ``invalidate`` so that
+worker serves fresh data straight away, while other workers may keep serving
+their copy until it expires. TTLs are kept to seconds for that reason.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from tenflow.config import settings
+
+
+class UserCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, Hashable, Any]] = OrderedDict()
+
+    def get(self, user_id: Hashable, params: Hashable) -> Any | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires, cached_params, value = entry
+        if cached_params != params or expires <= time.monotonic():
+            return None
+        self._entries.move_to_end(user_id)
+        return value
+
+    def set(self, user_id: Hashable, params: Hashable, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + ttl, params, value)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Hashable) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+dashboard_cache = UserCache(maxsize=settings.DASHBOARD_CACHE_MAX_USERS)
+
+# Keyed by (activity_id, channel, method, points) and tagged with the owner and the
+# streams' updated_at, so a re-upload is a miss in every worker, not just this one.
+stream_cache = UserCache(maxsize=settings.STREAM_CACHE_MAX_ENTRIES)
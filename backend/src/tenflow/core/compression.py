@@ -0,0 +1,255 @@
+"""
+Response compression.
+
+``CompressionMiddleware`` negotiates zstd, brotli or gzip from Accept-Encoding
+and compresses responses whose content type is allowlisted and whose body
+reaches ``COMPRESSION_MINIMUM_SIZE``. Streaming responses are compressed
+chunk by chunk and flushed at every chunk boundary, so clients still receive
+each chunk as soon as it is sent. brotli and zstd are optional
+(``pip install tenflow[compression]``); without them only gzip is offered.
+
+Levels default to the ``COMPRESSION_*_LEVEL`` settings and can be changed for
+a single route with the ``compression`` dependency:
+
+    @router.get('/{id}', dependencies=[Depends(compression(zstd=9, br=6))])
+    @router.get('/export', dependencies=[Depends(compression(enabled=False))])
+"""
+
+import zlib
+from dataclasses import dataclass
+
+from starlette.requests import Request
+
+from tenflow.config import settings
+from tenflow.core.tracing import span
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+SCOPE_KEY = 'tenflow.compression'
+
+
+@dataclass(frozen=True, slots=True)
+class CompressionOptions:
+    enabled: bool = True
+    gzip: int | None = None
+    br: int | None = None
+    zstd: int | None = None
+
+    def level(self, encoding: str) -> int:
+        configured = getattr(self, encoding)
+        if configured is not None:
+            return configured
+        return {
+            'gzip': settings.COMPRESSION_GZIP_LEVEL,
+            'br': settings.COMPRESSION_BROTLI_LEVEL,
+            'zstd': settings.COMPRESSION_ZSTD_LEVEL,
+        }[encoding]
+
+
+def compression(*, enabled: bool = True, gzip: int | None = None, br: int | None = None, zstd: int | None = None):
+    """Route dependency overriding compression levels (or disabling compression) for that route."""
+    options = CompressionOptions(enabled=enabled, gzip=gzip, br=br, zstd=zstd)
+
+    def set_compression(request: Request) -> None:
+        request.scope[SCOPE_KEY] = options
+
+    return set_compression
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+ENCODERS = {'gzip': _GzipEncoder}
+if brotli is not None:
+    ENCODERS['br'] = _BrotliEncoder
+if zstandard is not None:
+    ENCODERS['zstd'] = _ZstdEncoder
+
+# Server preference when the client accepts several encodings equally.
+PREFERENCE = ('zstd', 'br', 'gzip')
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Pick the encoding to use for an Accept-Encoding header value, or None for identity."""
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for encoding in PREFERENCE:
+        if encoding not in ENCODERS:
+            continue
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(encoding: str, level: int, body: bytes) -> bytes:
+    encoder = ENCODERS[encoding](level)
+    return encoder.compress(body) + encoder.finish()
+
+
+def _compressible(content_type: str) -> bool:
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    for allowed in settings.COMPRESSION_CONTENT_TYPES.split(','):
+        allowed = allowed.strip().lower()
+        if media_type == allowed or (allowed.endswith('/*') and media_type.startswith(allowed[:-1])):
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing allowlisted responses above a size threshold."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope['headers'])
+        encoding = negotiate(headers.get(b'accept-encoding', b'').decode('latin-1'))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message['type'] == 'http.response.start':
+                start_message = message
+                response_headers = {k.lower(): v for k, v in message.get('headers', [])}
+                options = scope.get(SCOPE_KEY) or CompressionOptions()
+                if (
+                    not options.enabled
+                    or b'content-encoding' in response_headers
+                    or message['status'] in (204, 304)
+                    or not _compressible(response_headers.get(b'content-type', b'').decode('latin-1'))
+                ):
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            level = (scope.get(SCOPE_KEY) or CompressionOptions()).level(encoding)
+
+            if encoder is None:
+                if not more_body:
+                    # Whole body in one message: compress it in one go if it is big enough.
+                    if len(body) < settings.COMPRESSION_MINIMUM_SIZE:
+                        passthrough = True
+                        await send(start_message)
+                        await send(message)
+                        return
+                    with span('http.compress', encoding=encoding, level=level, bytes_in=len(body)) as compress_span:
+                        compressed = compress(encoding, level, body)
+                        if compress_span is not None:
+                            compress_span.set_attribute('bytes_out', len(compressed))
+                    await send(_encoded_start(start_message, encoding, len(compressed)))
+                    await send({'type': 'http.response.body', 'body': compressed})
+                    return
+                encoder = ENCODERS[encoding](level)
+                await send(_encoded_start(start_message, encoding, None))
+
+            chunk = encoder.compress(body)
+            chunk += encoder.flush() if more_body else encoder.finish()
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _encoded_start(message, encoding: str, content_length: int | None) -> dict:
+    headers = []
+    vary = None
+    for name, value in message.get('headers', []):
+        lower = name.lower()
+        if lower == b'content-length':
+            continue
+        if lower == b'etag' and not value.startswith(b'W/'):
+            # the encoded bytes differ from the identity representation
+            value = b'W/' + value
+        if lower == b'vary':
+            vary = value
+            continue
+        headers.append((name, value))
+    headers.append((b'content-encoding', encoding.encode()))
+    if content_length is not None:
+        headers.append((b'content-length', str(content_length).encode()))
+    if vary is None:
+        headers.append((b'vary', b'Accept-Encoding'))
+    elif b'accept-encoding' not in vary.lower():
+        headers.append((b'vary', vary + b', Accept-Encoding'))
+    else:
+        headers.append((b'vary', vary))
+    return {**message, 'headers': headers}
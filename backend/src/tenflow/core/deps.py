@@ -1,11 +1,12 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 
 from tenflow.config import settings
+from tenflow.core.security import decode_access_token
+from tenflow.core.tracing import span
 from tenflow.database import get_read_only_session_gen
 from tenflow.models import User, TokenPayload
 
@@ -14,16 +15,18 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f'{settings.API_V1_STR}/auth/login
 
 async def get_current_user(session: Session = Depends(get_read_only_session_gen), token: str = Depends(oauth2_scheme)) -> User:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        token_data = TokenPayload(**payload)
-    except (JWTError, ValidationError) as e:
+        with span('auth.jwt_decode'):
+            payload = decode_access_token(token)
+            token_data = TokenPayload(**payload)
+    except (ValueError, ValidationError) as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail='Could not validate credentials',
         ) from e
 
-    statement = select(User).options(selectinload(User.training_plans)).where(User.id == token_data.sub)
-    row = (await session.execute(statement)).first()
+    statement = select(User).where(User.id == token_data.sub)
+    with span('auth.load_user'):
+        row = (await session.execute(statement)).first()
     if row is None or len(row) == 0 or not row[0]:
         raise HTTPException(status_code=404, detail='User not found')
     return row[0]
@@ -0,0 +1,68 @@
+"""
+Weak entity tags and conditional request helpers.
+
+Tags are derived from row versions (``id`` and ``updated_at``) rather than
+from the serialized body, so whether a client's copy is current can be
+decided from an index-only query without loading or rendering the row.
+
+They are weak (``W/"..."``) because the same version may be sent with
+different encodings. Because a tag still identifies exactly one row version,
+``If-Match`` compares tags with the weak marker stripped as well. This lets
+clients send back the tag they received for optimistic concurrency.
+"""
+
+import hashlib
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _version(updated_at: datetime) -> int:
+    # exact microseconds; float timestamps would round
+    return (updated_at - _EPOCH) // timedelta(microseconds=1)
+
+
+def row_etag(row_id: UUID, updated_at: datetime) -> str:
+    return f'W/"{row_id.hex}-{_version(updated_at):x}"'
+
+
+def collection_etag(rows: Iterable[tuple[UUID, datetime]], *params: object) -> str:
+    """Tag for a page of rows: changes when any row in it changes, or rows enter or leave it."""
+    digest = hashlib.blake2b(digest_size=12)
+    for param in params:
+        digest.update(f'{param!r};'.encode())
+    for row_id, updated_at in rows:
+        digest.update(row_id.bytes)
+        digest.update(_version(updated_at).to_bytes(8, 'big', signed=True))
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith('W/') else tag
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Whether an If-None-Match / If-Match header value lists ``etag`` (or is ``*``)."""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in header.split(',')}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def check_if_match(header: str | None, etag: str) -> None:
+    if header is not None and not etag_matches(header, etag):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail='The resource has changed; fetch it again and retry',
+            headers={'ETag': etag},
+        )
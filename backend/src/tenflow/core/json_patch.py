@@ -0,0 +1,257 @@
+"""
+JSON Patch (RFC 6902) applied to a JSONB column inside Postgres.
+
+A patch is compiled to one statement: a chain of CTEs, one per operation,
+each deriving the document from the one before with ``jsonb_set``,
+``jsonb_insert``, ``#-``, ``||`` and ``#>``. Only the operations travel to the
+database and nothing but the new version travels back, however large the
+document. The row is locked when the chain starts, so concurrent patches
+apply one after the other.
+
+Each step also carries the index of the first operation that couldn't be
+applied (a missing target, a failed ``test``, ...). The UPDATE only happens
+when there is none; otherwise the index is reported and nothing changes.
+"""
+
+import datetime as dt
+import json
+import re
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import ARRAY, Integer, Text, and_, case, cast, false, func, literal, null, or_, select, true, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tenflow.core.etag import check_if_match, row_etag
+
+OPERATIONS = ('add', 'remove', 'replace', 'move', 'copy', 'test')
+_ARRAY_INDEX = re.compile(r'0|[1-9][0-9]*')
+
+
+class PatchConflict(Exception):
+    """An operation of a well-formed patch doesn't apply to the document."""
+
+    def __init__(self, index: int, operation: 'Operation'):
+        self.index = index
+        self.operation = operation
+        super().__init__(f'Patch operation {index} ({operation.op} {operation.pointer!r}) could not be applied')
+
+
+@dataclass(frozen=True, slots=True)
+class Operation:
+    op: str
+    pointer: str
+    path: tuple[str, ...]
+    value: Any = None
+    source: tuple[str, ...] | None = None  # 'from' of move and copy
+
+
+def parse_pointer(pointer: str) -> tuple[str, ...]:
+    """The reference tokens of a JSON Pointer (RFC 6901); ``''`` is the whole document."""
+    if pointer == '':
+        return ()
+    if not pointer.startswith('/'):
+        raise ValueError(f'{pointer!r} is not a JSON pointer')
+    return tuple(token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/'))
+
+
+def parse_patch(patch: list[dict[str, Any]]) -> list[Operation]:
+    """Validate a patch document; raises ValueError when it is malformed."""
+    operations = []
+    for index, item in enumerate(patch):
+        op = item.get('op')
+        if op not in OPERATIONS:
+            raise ValueError(f'operation {index}: op must be one of {", ".join(OPERATIONS)}')
+        if not isinstance(item.get('path'), str):
+            raise ValueError(f'operation {index}: path is required')
+        if op in ('add', 'replace', 'test') and 'value' not in item:
+            raise ValueError(f'operation {index}: {op} needs a value')
+        path = parse_pointer(item['path'])
+        source = None
+        if op in ('move', 'copy'):
+            if not isinstance(item.get('from'), str):
+                raise ValueError(f'operation {index}: {op} needs from')
+            source = parse_pointer(item['from'])
+            if op == 'move' and path[: len(source)] == source and path != source:
+                raise ValueError(f'operation {index}: cannot move a value into itself')
+        if op == 'remove' and not path:
+            raise ValueError(f'operation {index}: cannot remove the whole document')
+        operations.append(Operation(op, item['path'], path, item.get('value'), source))
+    return operations
+
+
+def _path(tokens: tuple[str, ...]):
+    return literal(list(tokens), ARRAY(Text))
+
+
+def _at(document, tokens: tuple[str, ...]):
+    return document.op('#>')(_path(tokens)) if tokens else document
+
+
+def _set_at(document, tokens: tuple[str, ...], value):
+    return func.jsonb_set(document, _path(tokens), value) if tokens else value
+
+
+def _exists(document, tokens: tuple[str, ...]):
+    """Whether ``tokens`` points at a value, taking array indices as RFC 6901 does (no negatives)."""
+    if not tokens:
+        return document.is_not(None)
+    found = _at(document, tokens).is_not(None)
+    if _ARRAY_INDEX.fullmatch(tokens[-1]):
+        return found
+    return and_(found, func.jsonb_typeof(_at(document, tokens[:-1])) != 'array')
+
+
+def _add(document, tokens: tuple[str, ...], value):
+    """(document with ``value`` added at ``tokens``, whether that is possible)."""
+    if not tokens:
+        return value, true()
+    parent, key = _at(document, tokens[:-1]), tokens[-1]
+    kind = func.jsonb_typeof(parent)
+    into_object = parent.op('||')(func.jsonb_build_object(key, value))
+    if key == '-':
+        into_array, fits = parent.op('||')(func.jsonb_build_array(value)), true()
+    elif _ARRAY_INDEX.fullmatch(key):
+        # an index may be one past the end, which appends
+        into_array = func.jsonb_insert(parent, _path((key,)), value)
+        fits = case((kind == 'array', int(key) <= func.jsonb_array_length(parent)), else_=False)
+    else:
+        into_array, fits = null(), false()
+    added = case((kind == 'object', into_object), (kind == 'array', into_array))
+    return _set_at(document, tokens[:-1], added), or_(kind == 'object', and_(kind == 'array', fits))
+
+
+def _steps(operations: list[Operation]):
+    """(operation index, step, operation): move takes its value out in one step and adds it in the next."""
+    for index, operation in enumerate(operations):
+        if operation.op == 'move' and operation.path != operation.source:
+            yield index, 'take', operation
+            yield index, 'put', operation
+        else:
+            yield index, operation.op, operation
+
+
+def _step(document, held, step: str, operation: Operation):
+    """(new document, value held for the next step, whether the step applies)."""
+    value = cast(literal(json.dumps(operation.value)), JSONB)
+    path, source = operation.path, operation.source
+    if step == 'add':
+        added, applies = _add(document, path, value)
+        return added, null(), applies
+    if step == 'remove':
+        return document.op('#-')(_path(path)), null(), _exists(document, path)
+    if step == 'replace':
+        return _set_at(document, path, value), null(), _exists(document, path)
+    if step == 'test':
+        return document, null(), _at(document, path) == value
+    if step == 'copy':
+        added, applies = _add(document, path, _at(document, source))
+        return added, null(), and_(_exists(document, source), applies)
+    if step == 'take':
+        return document.op('#-')(_path(source)), _at(document, source), _exists(document, source)
+    if step == 'put':
+        added, applies = _add(document, path, held)
+        return added, null(), applies
+    # a move onto itself changes nothing, but its source must exist
+    return document, null(), _exists(document, source)
+
+
+def patch_statement(column, where: list, operations: list[Operation], values: dict[str, Any] | None = None):
+    """
+    A statement applying ``operations`` to ``column`` of the row matching ``where``.
+
+    It returns one row if the row exists: ``failed``, the index of the first
+    operation that didn't apply (None if the patch applied), and ``version``,
+    the new ``updated_at`` (None unless updated). ``values`` are set as well
+    when the patch applies; ``updated_at`` must be among them.
+    """
+    table = column.class_.__table__
+    chain = (
+        select(
+            table.c.id,
+            column.label('document'),
+            cast(null(), JSONB).label('held'),
+            cast(null(), Integer).label('failed'),
+        )
+        .where(*where)
+        .with_for_update()
+        .cte('patch_0')
+    )
+    for number, (index, step, operation) in enumerate(_steps(operations), 1):
+        document, held, applies = _step(chain.c.document, chain.c.held, step, operation)
+        # functions are only evaluated on documents the step applies to; past a failure the chain idles
+        ok = and_(chain.c.failed.is_(None), applies)
+        chain = select(
+            chain.c.id,
+            case((ok, document), else_=chain.c.document).label('document'),
+            case((ok, cast(held, JSONB)), else_=None).label('held'),
+            case((chain.c.failed.is_not(None), chain.c.failed), (applies, None), else_=index).label('failed'),
+        ).cte(f'patch_{number}')
+
+    patched = (
+        update(table)
+        .where(table.c.id == chain.c.id, chain.c.failed.is_(None))
+        .values({column.key: chain.c.document, **(values or {})})
+        .returning(table.c.updated_at)
+        .cte('patched')
+    )
+    return select(chain.c.failed, select(patched.c.updated_at).scalar_subquery().label('version'))
+
+
+async def apply_patch(
+    session: AsyncSession, column, where: list, operations: list[Operation], values: dict[str, Any]
+) -> dt.datetime | None:
+    """
+    Patch ``column`` of the row matching ``where``; returns its new version, or None if there is no such row.
+
+    Raises PatchConflict, leaving the row alone, if an operation doesn't apply. The caller commits.
+    """
+    result = (await session.execute(patch_statement(column, where, operations, values))).first()
+    if result is None:
+        return None
+    if result.failed is not None:
+        raise PatchConflict(result.failed, operations[result.failed])
+    return result.version
+
+
+async def patch_owned_row(
+    session: AsyncSession,
+    column,
+    row_id: UUID,
+    user_id: UUID,
+    patch: list[dict[str, Any]],
+    if_match: str | None,
+    name: str,
+) -> str:
+    """
+    Apply ``patch`` to ``column`` of one of the user's rows for an endpoint; returns the row's new ETag.
+
+    Answers 422 for a malformed patch, 404 and 403 as other endpoints do, 412
+    when If-Match doesn't hold and 409 when an operation doesn't apply. The caller commits.
+    """
+    try:
+        operations = parse_patch(patch)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    model = column.class_
+    version = (await session.execute(select(model.user_id, model.updated_at).where(model.id == row_id))).first()
+    if version is None:
+        raise HTTPException(status_code=404, detail=f'{name} not found')
+    if version.user_id != user_id:
+        raise HTTPException(status_code=403, detail='Not enough permissions')
+    check_if_match(if_match, row_etag(row_id, version.updated_at))
+
+    where = [model.id == row_id]
+    if if_match is not None:
+        # still the version the client saw once the row is locked
+        where.append(model.updated_at == version.updated_at)
+    try:
+        updated_at = await apply_patch(session, column, where, operations, {'updated_at': dt.datetime.now(dt.UTC)})
+    except PatchConflict as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    if updated_at is None:
+        raise HTTPException(status_code=412, detail='The resource has changed; fetch it again and retry')
+    return row_etag(row_id, updated_at)
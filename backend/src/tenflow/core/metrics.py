@@ -0,0 +1,344 @@
+"""
+Prometheus-style metrics for the API.
+
+Metrics live in-process and are rendered in the Prometheus text exposition
+format by the ``/metrics`` endpoint. Request metrics are recorded by
+``MetricsMiddleware``; database metrics come from SQLAlchemy engine and pool
+events registered through ``instrument_engine``.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000, 10000)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        return sum(self._values.values())
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        return sum(self._values.values())
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float('inf')), counts, strict=True):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector) -> None:
+        """Register a callable that refreshes gauges right before rendering."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+http_requests_total = REGISTRY.register(
+    Counter('tenflow_http_requests_total', 'Total HTTP requests.', ('method', 'route', 'status'))
+)
+http_request_duration_seconds = REGISTRY.register(
+    Histogram('tenflow_http_request_duration_seconds', 'HTTP request latency in seconds.', ('method', 'route'))
+)
+http_requests_in_flight = REGISTRY.register(
+    Gauge('tenflow_http_requests_in_flight', 'HTTP requests currently being served.', ('method',))
+)
+http_request_queries = REGISTRY.register(
+    Histogram(
+        'tenflow_http_request_queries',
+        'SQL statements executed per HTTP request.',
+        ('method', 'route'),
+        buckets=DEFAULT_COUNT_BUCKETS,
+    )
+)
+http_request_rows = REGISTRY.register(
+    Histogram(
+        'tenflow_http_request_rows',
+        'Rows fetched or affected by SQL per HTTP request.',
+        ('method', 'route'),
+        buckets=DEFAULT_COUNT_BUCKETS,
+    )
+)
+db_queries_total = REGISTRY.register(Counter('tenflow_db_queries_total', 'SQL statements executed.', ('engine',)))
+db_rows_total = REGISTRY.register(
+    Counter('tenflow_db_rows_total', 'Rows fetched or affected by SQL statements.', ('engine',))
+)
+db_pool_checkouts_total = REGISTRY.register(
+    Counter('tenflow_db_pool_checkouts_total', 'Connections checked out of the pool.', ('engine',))
+)
+db_pool_size = REGISTRY.register(Gauge('tenflow_db_pool_size', 'Configured pool size.', ('engine',)))
+db_pool_checked_out = REGISTRY.register(
+    Gauge('tenflow_db_pool_checked_out', 'Connections currently checked out.', ('engine',))
+)
+db_pool_checked_in = REGISTRY.register(
+    Gauge('tenflow_db_pool_checked_in', 'Idle connections held by the pool.', ('engine',))
+)
+db_pool_overflow = REGISTRY.register(
+    Gauge('tenflow_db_pool_overflow', 'Connections open beyond pool_size (negative when below).', ('engine',))
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    rows: int = 0
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar('tenflow_request_stats', default=None)
+
+_engines = {}
+
+
+def _collect_pool_stats() -> None:
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        if not hasattr(pool, 'checkedout'):
+            continue
+        db_pool_size.set(pool.size(), engine=name)
+        db_pool_checked_out.set(pool.checkedout(), engine=name)
+        db_pool_checked_in.set(pool.checkedin(), engine=name)
+        db_pool_overflow.set(pool.overflow(), engine=name)
+
+
+REGISTRY.add_collector(_collect_pool_stats)
+
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Attach query and pool listeners to an (async) engine.
+
+    The listeners only bump counters so they stay cheap on the hot path.
+    """
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    _engines[name] = sync_engine
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        rows = max(getattr(cursor, 'rowcount', 0) or 0, 0)
+        db_queries_total.inc(engine=name)
+        db_rows_total.inc(rows, engine=name)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.rows += rows
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        db_pool_checkouts_total.inc(engine=name)
+
+    event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(sync_engine.pool, 'checkout', checkout)
+
+
+PROCESS_STARTED = time.time()
+
+
+def worker_status() -> dict:
+    """
+    Health of the current worker process.
+
+    Metrics are per process, so under a multi-worker server each worker reports
+    only its own requests and pools; the response says which worker answered.
+    """
+    pools = {}
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        if hasattr(pool, 'checkedout'):
+            pools[name] = {'size': pool.size(), 'checked_out': pool.checkedout(), 'overflow': pool.overflow()}
+    return {
+        'status': 'healthy',
+        'pid': os.getpid(),
+        'uptime_seconds': round(time.time() - PROCESS_STARTED, 1),
+        'requests_served': int(http_requests_total.total()),
+        'requests_in_flight': int(http_requests_in_flight.total()),
+        'db_pools': pools,
+    }
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency, status and query counts."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status_code = 500
+        stats = RequestStats()
+        token = request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec(method=method)
+            request_stats.reset(token)
+            route = scope.get('route')
+            route_path = getattr(route, 'path', 'unmatched')
+            http_requests_total.inc(method=method, route=route_path, status=str(status_code))
+            http_request_duration_seconds.observe(elapsed, method=method, route=route_path)
+            http_request_queries.observe(stats.queries, method=method, route=route_path)
+            http_request_rows.observe(stats.rows, method=method, route=route_path)
@@ -0,0 +1,153 @@
+"""
+Per-request SQL profiling.
+
+Every statement executed on an instrumented engine is recorded with its
+duration and row count on the profile of the request that issued it.
+Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged, and a request
+that repeats the same statement ``N_PLUS_ONE_THRESHOLD`` times or more is
+reported as a likely N+1.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from tenflow.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = 'X-Query-Count'
+QUERY_TIME_HEADER = 'X-Query-Time-Ms'
+
+
+@dataclass(slots=True)
+class QueryRecord:
+    statement: str
+    duration: float
+    rows: int
+    engine: str
+
+
+@dataclass
+class QueryProfile:
+    records: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.records)
+
+    @property
+    def total_time(self) -> float:
+        return sum(record.duration for record in self.records)
+
+    @property
+    def rows(self) -> int:
+        return sum(record.rows for record in self.records)
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements executed at least ``threshold`` times, most frequent first."""
+        counts = Counter(record.statement for record in self.records)
+        return [(statement, n) for statement, n in counts.most_common() if n >= threshold]
+
+    def summary(self) -> str:
+        return f'{self.count} queries, {self.rows} rows, {self.total_time * 1000:.1f}ms'
+
+
+current_profile: ContextVar[QueryProfile | None] = ContextVar('tenflow_query_profile', default=None)
+
+# Profiles opened with capture_queries(); they see statements from every request.
+_captures: list[QueryProfile] = []
+
+
+@contextmanager
+def capture_queries():
+    """Collect every statement executed while the block runs, regardless of request."""
+    profile = QueryProfile()
+    _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        _captures.remove(profile)
+
+
+def profile_engine(engine, name: str) -> None:
+    """Attach statement timing listeners to an (async) engine."""
+    sync_engine = getattr(engine, 'sync_engine', engine)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('tenflow_query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info['tenflow_query_start'].pop()
+        duration = time.perf_counter() - start
+        rows = max(getattr(cursor, 'rowcount', 0) or 0, 0)
+
+        if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            logger.warning('Slow query on %s engine (%.1fms, %d rows): %s', name, duration * 1000, rows, statement)
+
+        profile = current_profile.get()
+        if profile is None and not _captures:
+            return
+        record = QueryRecord(statement, duration, rows, name)
+        if profile is not None:
+            profile.records.append(record)
+        for capture in _captures:
+            capture.records.append(record)
+
+    def handle_error(exception_context):
+        stack = exception_context.connection.info.get('tenflow_query_start') if exception_context.connection else None
+        if stack:
+            stack.pop()
+
+    event.listen(sync_engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(sync_engine, 'handle_error', handle_error)
+
+
+class QueryProfilerMiddleware:
+    """
+    Pure ASGI middleware that opens a query profile for each request.
+
+    The profile is logged when the request finishes. With
+    ``QUERY_PROFILE_HEADERS`` enabled, the query count and total SQL time are
+    also returned as response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start' and settings.QUERY_PROFILE_HEADERS:
+                headers = list(message.get('headers', []))
+                headers.append((QUERY_COUNT_HEADER.lower().encode(), str(profile.count).encode()))
+                headers.append((QUERY_TIME_HEADER.lower().encode(), f'{profile.total_time * 1000:.2f}'.encode()))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            if profile.count:
+                logger.debug('%s %s: %s', scope['method'], scope['path'], profile.summary())
+                for statement, n in profile.repeated_statements(settings.N_PLUS_ONE_THRESHOLD):
+                    logger.warning(
+                        'Possible N+1 in %s %s: statement executed %d times: %s',
+                        scope['method'],
+                        scope['path'],
+                        n,
+                        statement,
+                    )
@@ -0,0 +1,144 @@
+"""
+In-process statistical sampling profiler.
+
+A background thread wakes up every ``interval`` seconds and records the
+Python stack of every other thread via ``sys._current_frames()``. With
+``include_tasks`` it also records the suspended coroutine stack of every
+asyncio task on the event loop, which shows where requests are waiting and
+not only where CPU is spent. Samples are aggregated as collapsed stacks, so
+memory stays bounded by the number of distinct stacks.
+
+Output is either the collapsed-stack text format (``flamegraph.pl``,
+speedscope, ...) or speedscope's JSON format.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+_path_prefixes = sorted({os.path.abspath(p) + os.sep for p in sys.path if p}, key=len, reverse=True)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _path_prefixes:
+        if filename.startswith(prefix):
+            return filename[len(prefix) :]
+    return filename
+
+
+def _frame_label(code, lineno: int) -> str:
+    return f'{code.co_name} ({_short_path(code.co_filename)}:{lineno})'
+
+
+def _thread_stack(frame) -> list[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _coroutine_stack(coro) -> list[str]:
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            break
+        stack.append(_frame_label(frame.f_code, frame.f_lineno))
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return stack
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.01, include_tasks: bool = True, loop=None):
+        self.interval = interval
+        self.include_tasks = include_tasks
+        self.loop = loop
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.include_tasks and self.loop is None:
+            try:
+                self.loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.loop = None
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='tenflow-sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.stopped_at = time.perf_counter()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(own_ident)
+
+    def sample(self, skip_ident: int | None = None) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            stack = _thread_stack(frame)
+            self.samples[(f'thread:{names.get(ident, ident)}', *stack)] += 1
+        if self.loop is not None:
+            try:
+                tasks = list(asyncio.all_tasks(self.loop))
+            except RuntimeError:
+                tasks = []
+            for task in tasks:
+                stack = _coroutine_stack(task.get_coro())
+                if stack:
+                    self.samples[('task', *stack)] += 1
+        self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """Stacks in the ``frame;frame;frame count`` format, heaviest first."""
+        return ''.join(f'{";".join(stack)} {count}\n' for stack, count in self.samples.most_common())
+
+    def speedscope(self, name: str = 'tenflow') -> dict:
+        frames: list[dict] = []
+        frame_index: dict[str, int] = {}
+        samples = []
+        weights = []
+        for stack, count in self.samples.most_common():
+            indices = []
+            for label in stack:
+                if label not in frame_index:
+                    frame_index[label] = len(frames)
+                    frames.append({'name': label})
+                indices.append(frame_index[label])
+            samples.append(indices)
+            weights.append(round(count * self.interval, 6))
+        duration = (self.stopped_at or time.perf_counter()) - self.started_at
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'shared': {'frames': frames},
+            'profiles': [
+                {
+                    'type': 'sampled',
+                    'name': name,
+                    'unit': 'seconds',
+                    'startValue': 0,
+                    'endValue': round(max(duration, sum(weights)), 6),
+                    'samples': samples,
+                    'weights': weights,
+                }
+            ],
+            'name': name,
+            'exporter': 'tenflow.core.sampling_profiler',
+        }
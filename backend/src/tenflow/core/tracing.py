@@ -0,0 +1,286 @@
+"""
+Lightweight, local-only request tracing.
+
+Each HTTP request becomes a trace whose root span is opened by
+``TracingMiddleware``. Code running inside the request opens child spans with
+``span()``; SQL statements are traced through engine events registered with
+``trace_engine``. Incoming W3C ``traceparent`` headers are honoured and the
+resulting ``traceparent`` is echoed on the response.
+
+Finished traces are written as JSON lines to the console or to a local file
+(``TRACING_EXPORTER``), so no collector is needed. With tracing disabled,
+``span()`` costs a single context variable lookup.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from starlette.responses import JSONResponse
+
+from tenflow.config import settings
+
+TRACEPARENT_HEADER = 'traceparent'
+TRACESTATE_HEADER = 'tracestate'
+
+_TRACEPARENT_RE = re.compile(r'^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = 'ok'
+    # spans of the trace finished so far; shared by every span in the trace
+    trace: list['Span'] = field(default_factory=list, repr=False)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        self.trace.append(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_us': self.start_ns // 1000,
+            'duration_ms': round(self.duration_ms, 3),
+            'status': self.status,
+            'attributes': self.attributes,
+        }
+
+
+# Ids and sampling draw from the OS rather than the `random` module, whose state
+# is shared by every process forked or restored from the same memory snapshot.
+_random = random.SystemRandom()
+
+
+def _new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Parse a W3C traceparent header into (trace_id, parent_span_id, sampled)."""
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if not match:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == 'ff' or trace_id == '0' * 32 or span_id == '0' * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+def format_traceparent(span: Span, sampled: bool = True) -> str:
+    return f'00-{span.trace_id}-{span.span_id}-{"01" if sampled else "00"}'
+
+
+class ConsoleSpanExporter:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        lines = ''.join(json.dumps(span.to_dict(), default=str) + '\n' for span in spans)
+        with self._lock:
+            self.stream.write(lines)
+            self.stream.flush()
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__(open(path, 'a', buffering=1, encoding='utf-8'))
+
+
+class InMemorySpanExporter:
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+
+_exporter = None
+_configured = False
+
+current_span: ContextVar[Span | None] = ContextVar('tenflow_current_span', default=None)
+
+
+def configure(exporter) -> None:
+    """Install an exporter; ``None`` disables tracing."""
+    global _exporter, _configured
+    _exporter = exporter
+    _configured = True
+
+
+def get_exporter():
+    global _exporter, _configured
+    if not _configured:
+        kind = settings.TRACING_EXPORTER.lower()
+        if kind == 'console':
+            _exporter = ConsoleSpanExporter()
+        elif kind == 'file':
+            _exporter = FileSpanExporter(settings.TRACING_FILE)
+        _configured = True
+    return _exporter
+
+
+def start_span(name: str, **attributes: Any) -> Span | None:
+    """Open a child of the current span, or return None when not tracing."""
+    parent = current_span.get()
+    if parent is None:
+        return None
+    return Span(
+        name=name,
+        trace_id=parent.trace_id,
+        span_id=_new_span_id(),
+        parent_id=parent.span_id,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+        trace=parent.trace,
+    )
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Trace the enclosed block as a child of the current span."""
+    child = start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.status = 'error'
+        child.set_attribute('exception', type(e).__name__)
+        raise
+    finally:
+        current_span.reset(token)
+        child.end()
+
+
+def trace_engine(engine, name: str) -> None:
+    """Emit a ``db.query`` span for every statement executed on an (async) engine."""
+    sync_engine = getattr(engine, 'sync_engine', engine)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        query_span = start_span('db.query', engine=name, statement=statement[:500])
+        conn.info.setdefault('tenflow_query_spans', []).append(query_span)
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        query_span = conn.info['tenflow_query_spans'].pop()
+        if query_span is not None:
+            query_span.set_attribute('rows', max(getattr(cursor, 'rowcount', 0) or 0, 0))
+            query_span.end()
+
+    def handle_error(exception_context):
+        spans = exception_context.connection.info.get('tenflow_query_spans') if exception_context.connection else None
+        if spans:
+            query_span = spans.pop()
+            if query_span is not None:
+                query_span.status = 'error'
+                query_span.end()
+
+    event.listen(sync_engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(sync_engine, 'handle_error', handle_error)
+
+
+class TracedJSONResponse(JSONResponse):
+    """JSONResponse that traces the encoding of the response body."""
+
+    def render(self, content: Any) -> bytes:
+        with span('http.serialize') as serialize_span:
+            body = super().render(content)
+            if serialize_span is not None:
+                serialize_span.set_attribute('bytes', len(body))
+            return body
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening the root span of each request's trace."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        exporter = get_exporter()
+        if scope['type'] != 'http' or exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get('headers') or [])
+        incoming = parse_traceparent(headers.get(TRACEPARENT_HEADER.encode(), b'').decode('latin-1'))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = _new_trace_id(), None
+            sampled = _random.random() < settings.TRACING_SAMPLE_RATE
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(
+            name='http.request',
+            trace_id=trace_id,
+            span_id=_new_span_id(),
+            parent_id=parent_id,
+            start_ns=time.time_ns(),
+            attributes={'http.method': scope['method'], 'http.target': scope['path']},
+        )
+        tracestate = headers.get(TRACESTATE_HEADER.encode())
+        if tracestate:
+            root.set_attribute('tracestate', tracestate.decode('latin-1'))
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                root.set_attribute('http.status_code', message['status'])
+                response_headers = [*message.get('headers', []), (b'traceparent', format_traceparent(root).encode())]
+                message = {**message, 'headers': response_headers}
+            await send(message)
+
+        token = current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            root.status = 'error'
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get('route')
+            if route is not None:
+                root.set_attribute('http.route', route.path)
+                root.name = f'{scope["method"]} {route.path}'
+            root.end()
+            exporter.export(root.trace)
@@ -1,7 +1,11 @@
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import scoped_session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from tenflow.config import settings
+from tenflow.core.metrics import instrument_engine
+from tenflow.core.query_profiler import profile_engine
+from tenflow.core.tracing import span, start_span, trace_engine
 from contextlib import asynccontextmanager
 
 global engine
@@ -15,6 +19,14 @@ global ReadOnlySession
 ReadOnlySession = None
 
 
+class TracedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that traces how long a checkout (including any wait) takes."""
+
+    def connect(self):
+        with span('db.pool.checkout', checked_out=self.checkedout(), overflow=self.overflow()):
+            return super().connect()
+
+
 def recreate_engine():
     global engine
     engine = create_async_engine(
@@ -26,7 +38,11 @@ def recreate_engine():
         pool_recycle=settings.DATABASE_POOL_RECYCLE,
         pool_timeout=settings.DATABASE_POOL_TIMEOUT,
         pool_use_lifo=True,
+        poolclass=TracedAsyncAdaptedQueuePool,
     )
+    instrument_engine(engine, 'primary')
+    profile_engine(engine, 'primary')
+    trace_engine(engine, 'primary')
 
 def recreate_read_only_engine():
     global read_only_engine
@@ -39,6 +55,7 @@ def recreate_read_only_engine():
         pool_recycle=settings.DATABASE_POOL_RECYCLE,
         pool_timeout=settings.DATABASE_POOL_TIMEOUT,
         pool_use_lifo=True,
+        poolclass=TracedAsyncAdaptedQueuePool,
         connect_args={
             'server_settings': {
                 'default_transaction_isolation': 'serializable',
@@ -46,6 +63,9 @@ def recreate_read_only_engine():
             }
         },
     )
+    instrument_engine(read_only_engine, 'read_only')
+    profile_engine(read_only_engine, 'read_only')
+    trace_engine(read_only_engine, 'read_only')
     
 def recreate_session():
     global Session
@@ -72,15 +92,25 @@ async def get_session_gen():
     if Session is None:
         recreate_session()
 
-    async with Session() as session:
-        yield session
+    session_span = start_span('db.session', engine='primary')
+    try:
+        async with Session() as session:
+            yield session
+    finally:
+        if session_span is not None:
+            session_span.end()
 
 async def get_read_only_session_gen():
     if ReadOnlySession is None:
         recreate_read_only_session()
 
-    async with ReadOnlySession() as session:
-        yield session
+    session_span = start_span('db.session', engine='read_only')
+    try:
+        async with ReadOnlySession() as session:
+            yield session
+    finally:
+        if session_span is not None:
+            session_span.end()
 
 
 
@@ -1,32 +1,91 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+"""
+Application factory.
+
+`create_app()` builds the ASGI app. Routers, and with them the models, the
+database layer and the auth dependencies, are only imported when it runs, so
+importing this module is cheap. `tenflow.main:app` keeps working for uvicorn
+and Modal: the module-level `app` is created on first access. `warm_up()` is
+for platforms that snapshot a process after startup.
+"""
+
+from typing import TYPE_CHECKING
 
 from tenflow.config import settings
-from tenflow.api.v1.api import api_router
 
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+
+def create_app() -> 'FastAPI':
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import PlainTextResponse
+
+    from tenflow.api.v1.api import api_router
+    from tenflow.core.compression import CompressionMiddleware
+    from tenflow.core.metrics import (
+        CONTENT_TYPE as METRICS_CONTENT_TYPE,
+        MetricsMiddleware,
+        render_metrics,
+        worker_status,
+    )
+    from tenflow.core.query_profiler import QueryProfilerMiddleware
+    from tenflow.core.tracing import TracedJSONResponse, TracingMiddleware
+
+    app = FastAPI(
+        title=settings.APP_NAME,
+        openapi_url=f'{settings.API_V1_STR}/openapi.json',
+        default_response_class=TracedJSONResponse,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.get_allowed_origins(),
+        allow_credentials=True,
+        allow_methods=['*'],
+        allow_headers=['*'],
+    )
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(QueryProfilerMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(TracingMiddleware)
+
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+
+    @app.get('/')
+    def root():
+        return {'message': f'Welcome to {settings.APP_NAME} API'}
+
+    @app.get('/health')
+    def health_check():
+        return {'status': 'healthy'}
 
-app = FastAPI(
-    title=settings.APP_NAME,
-    openapi_url=f'{settings.API_V1_STR}/openapi.json',
-)
+    @app.get('/health/worker')
+    def worker_health():
+        return worker_status()
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.get_allowed_origins(),
-    allow_credentials=True,
-    allow_methods=['*'],
-    allow_headers=['*'],
-)
+    @app.get('/metrics', include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
+    return app
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
 
+def warm_up(app: 'FastAPI') -> None:
+    """
+    Pay one-off costs before the first request: the lazy jose/passlib imports,
+    bcrypt backend detection and OpenAPI schema generation. No connections are
+    opened, so the warmed process can be captured in a memory snapshot.
+    """
+    from tenflow.core import security
 
-@app.get('/')
-def root():
-    return {'message': f'Welcome to {settings.APP_NAME} API'}
+    security.decode_access_token(security.create_access_token(subject='warm-up'))
+    security.get_password_hash('warm-up')
+    app.openapi()
 
 
-@app.get('/health')
-def health_check():
-    return {'status': 'healthy'}
+def __getattr__(name: str):
+    if name == 'app':
+        app = globals()['app'] = create_app()
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,7 +1,7 @@
-from typing import Any
+from typing import Any, ClassVar, Literal
 from datetime import datetime, date
 import datetime as dt 
-from uuid import UUID, uuid4
+from uuid import UUID
 from decimal import Decimal
 from sqlalchemy import (
     String, 
@@ -10,29 +10,56 @@ from sqlalchemy import (
     Date, 
     UUID as SAUUID, 
     ForeignKey, 
+    Index,
     Integer,
     Enum,
-    Numeric
+    Numeric,
+    Float,
+    LargeBinary,
+    REAL,
+    SmallInteger,
+    event,
+    insert,
+    inspect,
+    text,
+    Computed,
 )
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import MappedAsDataclass, Mapped, mapped_column, relationship, DeclarativeBase
-from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy.orm import MappedAsDataclass, Mapped, mapped_column, relationship, DeclarativeBase, object_session
+from pydantic import BaseModel, Field
 from enum import StrEnum
 
+from tenflow.core.ids import uuid7
+
+
 class Base(MappedAsDataclass, DeclarativeBase):
     pass
 
+
+# Generated full-text search columns; words in the title (workout type, activity name) rank higher.
+WORKOUT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(workout_type, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(workout_description, '')), 'B')"
+)
+ACTIVITY_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(activity_type, '')), 'B')"
+)
+
 class User(Base):
     __tablename__ = 'users'
     email: Mapped[str] = mapped_column(String(50), unique=True, index=True)
     full_name: Mapped[str | None] = mapped_column(String(50))
     hashed_password: Mapped[str] = mapped_column(String(255))
-    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid4)
+    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid7)
     is_active: Mapped[bool] = mapped_column(Boolean(), default=True)
     is_superuser: Mapped[bool] = mapped_column(Boolean(), default=False)
     access_token: Mapped[str | None] = mapped_column(String(255), default=None)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
     updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
+    # what heart-rate zones and training stress are measured against (see tenflow.training.activity_metrics)
+    threshold_heartrate: Mapped[int | None] = mapped_column(SmallInteger(), default=None)  # bpm
+    threshold_pace: Mapped[int | None] = mapped_column(SmallInteger(), default=None)  # s/km
 
     compliance_scores: Mapped[list["ComplianceScore"]] = relationship(
         back_populates="user", cascade="all, delete-orphan",
@@ -56,6 +83,10 @@ class User(Base):
         default_factory=list
     )
 
+    # Keyset pagination of the admin listing, newest first. Trigram indexes on email and full_name
+    # serve its search where pg_trgm is installed (see migration 0b5f7d3e9a61).
+    __table_args__ = (Index('ix_users_created_at_id', 'created_at', 'id'),)
+
 class UserBase(BaseModel):
     id: UUID | None = None
     created_at: datetime | None = None
@@ -66,6 +97,8 @@ class UserBase(BaseModel):
     access_token: str | None = None
     is_active: bool = True
     is_superuser: bool = False
+    threshold_heartrate: int | None = None
+    threshold_pace: int | None = None
 
 class UserRead(UserBase):
     id: UUID
@@ -75,6 +108,20 @@ class UserRead(UserBase):
     updated_at: datetime
     access_token: str
 
+class UserSummary(BaseModel):
+    id: UUID
+    email: str
+    full_name: str | None = None
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+
+
+class UserPage(BaseModel):
+    users: list[UserSummary]
+    next_cursor: str | None = None  # pass back as ?cursor= for the next page; None on the last page
+
+
 class UserCreate(UserBase):
     password: str
     email: str
@@ -93,6 +140,11 @@ class UserUpdate(UserPublicUpdate):
     is_superuser: bool | None = None
 
 
+class UserThresholds(BaseModel):
+    threshold_heartrate: int | None = Field(None, ge=100, le=230, description='lactate threshold heart rate, bpm')
+    threshold_pace: int | None = Field(None, ge=120, le=900, description='threshold pace, s/km')
+
+
 # Auth Models
 class Token(BaseModel):
     access_token: str
@@ -109,7 +161,7 @@ class ComplianceScore(Base):
     user_id: Mapped[UUID] = mapped_column(ForeignKey('users.id'), init=False)
     week_start: Mapped[dt.date] = mapped_column(Date())
 
-    id: Mapped[UUID] = mapped_column(SAUUID(), default_factory=uuid4, primary_key=True)
+    id: Mapped[UUID] = mapped_column(SAUUID(), default_factory=uuid7, primary_key=True)
 
     workout_compliance: Mapped[Decimal | None] = mapped_column(Numeric(), default=Decimal(0))
     intensity_compliance: Mapped[Decimal | None] = mapped_column(Numeric(), default=Decimal(0))
@@ -125,6 +177,17 @@ class ComplianceScore(Base):
     user: Mapped["User"] = relationship(back_populates="compliance_scores", default=None)
 
 
+class ComplianceScoreRead(BaseModel):
+    id: UUID
+    week_start: dt.date
+    workout_compliance: Decimal | None = None
+    intensity_compliance: Decimal | None = None
+    recovery_compliance: Decimal | None = None
+    overall_compliance: Decimal | None = None
+    activities_prescribed: int | None = None
+    activities_completed: int | None = None
+
+
 class TrainingPlan(Base):
     __tablename__ = 'training_plans'
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), init=False)
@@ -147,12 +210,38 @@ class TrainingPlan(Base):
         default_factory=list
     )
 
-    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid4)
+    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid7)
     is_active: Mapped[bool] = mapped_column(Boolean(), default=True)
+    # the last plan week (from 0) adapted to the load run before it (see tenflow.training.replanning)
+    replanned_week: Mapped[int | None] = mapped_column(Integer(), default=None)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
 
+    __table_args__ = (
+        # Covering indexes for ETag checks: conditional GETs are answered by index-only scans.
+        Index('ix_training_plans_id_version', 'id', unique=True, postgresql_include=['user_id', 'updated_at']),
+        Index(
+            'ix_training_plans_user_id_created_at',
+            'user_id',
+            created_at.desc(),
+            postgresql_include=['id', 'updated_at', 'is_active'],
+        ),
+        Index('ix_training_plans_user_id_updated_at', 'user_id', 'updated_at'),
+        # Plan attribute filters (see training_plans.plan_data_filters): containment over the document
+        # without its weeks, which keeps the GIN index small (NULL unless plan_data is an object), and
+        # race date ranges.
+        Index(
+            'ix_training_plans_plan_attributes',
+            text("(CASE WHEN jsonb_typeof(plan_data) = 'object' THEN plan_data - 'weeks' END) jsonb_path_ops"),
+            postgresql_using='gin',
+        ),
+        Index('ix_training_plans_race_date', text("(plan_data ->> 'race_date')")),
+    )
+    # updated_at doubles as the row version: UPDATEs are guarded by the value that was read
+    # (StaleDataError otherwise), and callers set the new value themselves.
+    __mapper_args__: ClassVar[dict[str, Any]] = {'version_id_col': updated_at, 'version_id_generator': False}
+
 
 class TrainingPlanBase(BaseModel):
     id: UUID | None = None
@@ -219,18 +308,32 @@ class PrescribedWorkout(Base):
 
     user: Mapped[User] = relationship(back_populates='prescribed_workouts', default=None)
     training_plan: Mapped[TrainingPlan | None] = relationship(back_populates='prescribed_workouts', default=None)
+    # activities outlive their prescription: deleting a workout unmatches them (prescribed_workout_id = NULL)
     training_activities: Mapped[list["TrainingActivity"]] = relationship(
-        back_populates="prescribed_workout", cascade="all, delete-orphan",
+        back_populates="prescribed_workout",
         default_factory=list
     )
 
-    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid4)
+    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid7)
     workout_data: Mapped[dict[str, Any] | None] = mapped_column(JSONB(), default=None)
     is_completed: Mapped[bool] = mapped_column(Boolean(), default=False)
+    # Full-text search (see api.v1.endpoints.search); kept by the database and never loaded with the row.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR(),
+        Computed(WORKOUT_SEARCH_VECTOR, persisted=True),
+        deferred=True,
+        init=False,
+    )
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
 
+    __table_args__ = (
+        Index('ix_prescribed_workouts_user_id_updated_at', 'user_id', 'updated_at'),
+        Index('ix_prescribed_workouts_user_id_workout_date', 'user_id', 'workout_date'),
+        Index('ix_prescribed_workouts_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+
 class PrescribedWorkoutBase(BaseModel):
     id: UUID | None = None
     training_plan_id: UUID
@@ -268,6 +371,28 @@ class PrescribedWorkoutUpdate(PrescribedWorkoutBase):
     is_completed: bool | None = None
 
 
+class JsonPatchOperation(BaseModel):
+    op: Literal['add', 'remove', 'replace', 'move', 'copy', 'test']
+    path: str  # a JSON pointer, e.g. /weeks/3/long_run
+    value: Any = None
+    from_: str | None = Field(None, alias='from')
+
+
+class ReplannedWorkout(BaseModel):
+    id: UUID | None = None  # None in a dry run, for workouts that would be added
+    workout_date: date
+    workout_type: str
+    distance: Decimal
+    duration_minutes: int | None = None
+
+
+class ReplanResult(BaseModel):
+    weeks: list[int]  # plan weeks that changed, from 0
+    inserted: list[ReplannedWorkout]
+    updated: list[ReplannedWorkout]
+    deleted: list[UUID]
+
+
 class StravaConnection(Base):
     __tablename__ = 'strava_connections'
 
@@ -279,7 +404,7 @@ class StravaConnection(Base):
     athlete_data: Mapped[dict[str, Any] | None] = mapped_column(JSONB())
 
     user: Mapped["User"] = relationship(back_populates="strava_connections", default=None)
-    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid4)
+    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid7)
     connected_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
     last_sync: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), default=None)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
@@ -293,13 +418,16 @@ class TrainingActivity(Base):
     name: Mapped[str] = mapped_column(String(1000))
     activity_type: Mapped[str] = mapped_column(String(50))
 
-    prescribed_workout_id: Mapped[UUID] = mapped_column(ForeignKey("prescribed_workouts.id"), init=False)
+    # NULL until the activity is matched to a prescription (see tenflow.training.matching)
+    prescribed_workout_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("prescribed_workouts.id", ondelete='SET NULL'), init=False
+    )
 
     actual_workout: Mapped[dict[str, Any] | None] = mapped_column(JSONB())
     activity_data: Mapped[dict[str, Any] | None] = mapped_column(JSONB())
     start_date: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
-    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid4)
+    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid7)
     strava_activity_id: Mapped[str | None] = mapped_column(String(50), default=None)
     distance: Mapped[Decimal | None] = mapped_column(Numeric(), default=None)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
@@ -313,7 +441,272 @@ class TrainingActivity(Base):
     rpe_prescribed: Mapped[int | None] = mapped_column(Integer(), default=None)
     rpe_actual: Mapped[int | None] = mapped_column(Integer(), default=None)
 
+    # Derived from the streams (see tenflow.training.activity_metrics); NULL where there was nothing to derive them from.
+    zone_seconds: Mapped[list[int] | None] = mapped_column(ARRAY(Integer()), default=None)  # z1..z5
+    grade_adjusted_pace: Mapped[float | None] = mapped_column(REAL(), default=None)  # s/km
+    normalized_pace: Mapped[float | None] = mapped_column(REAL(), default=None)  # s/km
+    training_stress: Mapped[float | None] = mapped_column(REAL(), default=None)
+    metrics_version: Mapped[int | None] = mapped_column(SmallInteger(), default=None)  # NULL until computed
+
+    # Full-text search, as on prescribed workouts.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR(),
+        Computed(ACTIVITY_SEARCH_VECTOR, persisted=True),
+        deferred=True,
+        init=False,
+    )
+
     user: Mapped["User"] = relationship(back_populates="training_activities", default=None)
-    prescribed_workout: Mapped["PrescribedWorkout"] = relationship(
-        back_populates="training_activities", default_factory=list
+    prescribed_workout: Mapped["PrescribedWorkout | None"] = relationship(
+        back_populates="training_activities", default=None
     )
+    # rows are removed by the database (ON DELETE CASCADE) without loading the samples
+    streams: Mapped[list["ActivityStream"]] = relationship(
+        cascade="all, delete-orphan", passive_deletes=True, default_factory=list
+    )
+
+    __table_args__ = (
+        Index('ix_training_activities_user_id_updated_at', 'user_id', 'updated_at'),
+        Index('ix_training_activities_user_id_start_date', 'user_id', 'start_date'),
+        Index('ix_training_activities_prescribed_workout_id', 'prescribed_workout_id'),
+        Index('ix_training_activities_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+
+class TrainingActivityRead(BaseModel):
+    id: UUID
+    user_id: UUID
+    prescribed_workout_id: UUID | None = None
+    name: str
+    activity_type: str
+    start_date: datetime
+    strava_activity_id: str | None = None
+    distance: Decimal | None = None
+    moving_time: int | None = None
+    elapsed_time: int | None = None
+    total_elevation_gain: Decimal | None = None
+    average_heartrate: int | None = None
+    max_heartrate: int | None = None
+    rpe_prescribed: int | None = None
+    rpe_actual: int | None = None
+    compliance_score: Decimal | None = None
+    zone_seconds: list[int] | None = None
+    grade_adjusted_pace: float | None = None
+    normalized_pace: float | None = None
+    training_stress: float | None = None
+    actual_workout: dict[str, Any] | None = None
+    activity_data: dict[str, Any] | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+
+class DashboardUser(BaseModel):
+    id: UUID
+    email: str
+    full_name: str | None = None
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+
+
+class WeekSummary(BaseModel):
+    week_start: dt.date
+    workouts_prescribed: int
+    workouts_completed: int
+    distance_prescribed: Decimal
+    distance_completed: Decimal
+
+
+class DashboardRead(BaseModel):
+    user: DashboardUser
+    active_plan: TrainingPlanRead | None = None
+    week: WeekSummary
+    week_workouts: list[PrescribedWorkoutRead]
+    recent_activities: list[TrainingActivityRead]
+    compliance: list[ComplianceScoreRead]
+
+class SyncTombstone(Base):
+    """A deleted row, kept so clients syncing incrementally learn to drop it."""
+    __tablename__ = 'sync_tombstones'
+
+    # no foreign key: tombstones outlive the rows (and users) they record
+    user_id: Mapped[UUID] = mapped_column(SAUUID())
+    entity_type: Mapped[str] = mapped_column(String(50))
+    entity_id: Mapped[UUID] = mapped_column(SAUUID())
+
+    id: Mapped[UUID] = mapped_column(SAUUID(), primary_key=True, default_factory=uuid7)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
+
+    __table_args__ = (Index('ix_sync_tombstones_user_id_deleted_at', 'user_id', 'deleted_at'),)
+
+
+class ActivityStream(Base):
+    """One channel of an activity's recorded time series, packed (see tenflow.training.streams)."""
+    __tablename__ = 'activity_streams'
+
+    activity_id: Mapped[UUID] = mapped_column(
+        ForeignKey('training_activities.id', ondelete='CASCADE'), primary_key=True
+    )
+    channel: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
+    dtype: Mapped[str] = mapped_column(String(8))
+    length: Mapped[int] = mapped_column(Integer())
+    dims: Mapped[int] = mapped_column(SmallInteger())
+    compression: Mapped[str] = mapped_column(String(8))
+    data: Mapped[bytes] = mapped_column(LargeBinary())
+    scale: Mapped[float | None] = mapped_column(Float(), default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
+
+
+class ActivityBestEffort(Base):
+    """An activity's best effort of one kind (see tenflow.training.best_efforts)."""
+    __tablename__ = 'activity_best_efforts'
+
+    activity_id: Mapped[UUID] = mapped_column(
+        ForeignKey('training_activities.id', ondelete='CASCADE'), primary_key=True
+    )
+    effort: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
+    value: Mapped[float] = mapped_column(REAL())  # seconds for distance efforts, bpm for heart-rate ones
+    start_offset: Mapped[int] = mapped_column(Integer())  # seconds from the start of the activity
+    end_offset: Mapped[int] = mapped_column(Integer())
+
+    __table_args__ = (
+        # finding the best stored effort when a record has to be refilled
+        Index('ix_activity_best_efforts_user_id_effort_value', 'user_id', 'effort', 'value'),
+    )
+
+
+class PersonalRecord(Base):
+    """A user's best effort of one kind across all their activities."""
+    __tablename__ = 'personal_records'
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    effort: Mapped[str] = mapped_column(String(32), primary_key=True)
+    activity_id: Mapped[UUID] = mapped_column(ForeignKey('training_activities.id', ondelete='CASCADE'))
+    value: Mapped[float] = mapped_column(REAL())
+    start_offset: Mapped[int] = mapped_column(Integer())
+    end_offset: Mapped[int] = mapped_column(Integer())
+    achieved_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # when the activity started
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: dt.datetime.now(dt.UTC))
+
+
+class PersonalRecordRead(BaseModel):
+    effort: str
+    value: float
+    activity_id: UUID
+    achieved_at: datetime
+    start_offset: int
+    end_offset: int
+
+
+class ActivityStreamInfo(BaseModel):
+    channel: str
+    length: int
+    dims: int
+    dtype: str
+    compression: str
+    stored_bytes: int
+
+
+class ActivityStreamRead(BaseModel):
+    channel: str
+    length: int
+    data: list[float] | list[list[float]]
+
+
+class SearchKind(StrEnum):
+    WORKOUT = 'workout'
+    ACTIVITY = 'activity'
+
+
+class SearchResult(BaseModel):
+    kind: SearchKind
+    id: UUID
+    title: str  # the workout type or the activity name
+    date: date
+    rank: float
+    headline: str | None = None  # matching words wrapped in <b>; full-text matches only
+    fuzzy: bool = False  # a trigram match, found when nothing matched the words exactly
+
+
+class DownsampleMethod(StrEnum):
+    LTTB = 'lttb'
+    MINMAX = 'minmax'
+
+
+class ActivityStreamDownsampled(BaseModel):
+    channel: str
+    method: DownsampleMethod
+    length: int  # samples in the full stream
+    index: list[int]  # positions of the returned samples in the full stream
+    time: list[float] | None  # the time stream at those positions, if stored
+    data: list[float] | list[list[float]]
+
+
+class ActivityMatch(BaseModel):
+    activity_id: UUID
+    workout_id: UUID
+    score: float
+
+
+class ActivityMatchResult(BaseModel):
+    matched: list[ActivityMatch]
+    unmatched: list[UUID]
+
+
+class SyncChanges[SyncedRead: BaseModel](BaseModel):
+    created: list[SyncedRead] = []
+    updated: list[SyncedRead] = []
+    deleted: list[UUID] = []
+
+
+class SyncResponse(BaseModel):
+    watermark: str
+    full: bool
+    training_plans: SyncChanges[TrainingPlanRead]
+    prescribed_workouts: SyncChanges[PrescribedWorkoutRead]
+    training_activities: SyncChanges[TrainingActivityRead]
+
+
+# Rows clients can sync incrementally (/sync), keyed by the entity type they are reported under.
+SYNCED_MODELS = {
+    TrainingPlan: 'training_plans',
+    PrescribedWorkout: 'prescribed_workouts',
+    TrainingActivity: 'training_activities',
+}
+
+
+def _touch_updated_at(mapper, connection, target):
+    # Keep updated_at a reliable change marker even where a caller doesn't set it.
+    if inspect(target).attrs.updated_at.history.added:
+        return
+    if object_session(target).is_modified(target, include_collections=False):
+        target.updated_at = dt.datetime.now(dt.UTC)
+
+
+def _record_tombstone(mapper, connection, target):
+    connection.execute(
+        insert(SyncTombstone).values(
+            id=uuid7(),
+            user_id=target.user_id,
+            entity_type=SYNCED_MODELS[mapper.class_],
+            entity_id=target.id,
+            deleted_at=dt.datetime.now(dt.UTC),
+        )
+    )
+
+
+def _refill_personal_records(mapper, connection, target):
+    # the database dropped the records the activity held; the next best stored efforts take over
+    from tenflow.training.best_efforts import refill_records
+
+    for statement in refill_records(target.user_id):
+        connection.execute(statement)
+
+
+for _model in SYNCED_MODELS:
+    event.listen(_model, 'before_update', _touch_updated_at)
+    event.listen(_model, 'after_delete', _record_tombstone)
+event.listen(TrainingActivity, 'after_delete', _refill_personal_records)
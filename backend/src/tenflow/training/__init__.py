@@ -0,0 +1 @@
+# Training domain logic package
@@ -0,0 +1,206 @@
+"""
+Metrics derived from an activity's recorded streams.
+
+Computed once per activity (when its streams are stored, or by ``tenflow
+compute-metrics``) and kept in typed columns on ``training_activities``, so
+compliance and load calculations read a handful of numbers instead of decoding
+streams or parsing Strava's JSON:
+
+- ``zone_seconds``: moving seconds in each heart-rate zone z1..z5, as fractions
+  of the runner's threshold (lactate threshold) heart rate.
+- ``grade_adjusted_pace``: average pace on flat ground for the same effort, in
+  s/km. Each sample's speed is scaled by the energy cost of running at its
+  grade (Minetti et al., 2002) relative to the flat.
+- ``normalized_pace``: the 4th-power mean of the 30-second rolling grade
+  adjusted speed, as a pace. Surges count for more than their duration, as they
+  do physiologically.
+- ``training_stress``: hours x intensity² x 100, with intensity the normalized
+  speed over threshold speed; from heart rate over threshold heart rate when the
+  runner has no threshold pace.
+
+Everything is computed on whole arrays. Samples are weighted by the seconds
+until the next sample, counting only moving time, so irregular recordings and
+pauses don't skew the results.
+"""
+
+import datetime as dt
+from collections import defaultdict
+from collections.abc import Collection
+from dataclasses import asdict, dataclass
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tenflow.models import ActivityStream, TrainingActivity, User
+from tenflow.training.best_efforts import best_efforts, record_best_efforts
+from tenflow.training.streams import decode
+
+# Bump when the computation changes; `tenflow compute-metrics` recomputes older rows.
+# 2: best efforts and personal records
+METRICS_VERSION = 2
+
+INPUT_CHANNELS = ('time', 'distance', 'velocity_smooth', 'altitude', 'grade_smooth', 'heartrate', 'moving')
+# Lower bounds of z2..z5 as fractions of threshold heart rate.
+ZONE_BOUNDS = (0.85, 0.90, 0.95, 1.00)
+# Below this speed (m/s) a sample counts as stopped when there is no moving stream.
+MOVING_SPEED = 0.5
+NORMALIZED_WINDOW_SECONDS = 30
+MAX_GRADE = 0.45  # the range the cost model was fitted on
+# Energy cost of running in J/kg/m by grade (rise over run), highest power first.
+MINETTI_COST = (155.4, -30.4, -43.3, 46.3, 19.5, 3.6)
+BATCH_ACTIVITIES = 200
+
+
+@dataclass(frozen=True, slots=True)
+class ActivityMetrics:
+    zone_seconds: list[int] | None = None
+    grade_adjusted_pace: float | None = None  # s/km
+    normalized_pace: float | None = None  # s/km
+    training_stress: float | None = None
+
+
+def grade_cost_factor(grade: np.ndarray) -> np.ndarray:
+    """Energy cost of running at each grade relative to the flat."""
+    grade = np.clip(grade, -MAX_GRADE, MAX_GRADE)
+    return np.polyval(MINETTI_COST, grade) / MINETTI_COST[-1]
+
+
+def _forward_rate(values: np.ndarray, over: np.ndarray) -> np.ndarray:
+    # change in values per unit of `over` until the next sample; 0 where `over` doesn't change
+    change, step = np.diff(values, append=values[-1]), np.diff(over, append=over[-1])
+    return np.divide(change, step, out=np.zeros(len(values)), where=step > 0)
+
+
+def derive(
+    streams: dict[str, np.ndarray], threshold_heartrate: int | None = None, threshold_pace: int | None = None
+) -> ActivityMetrics:
+    """Metrics of one activity from its decoded streams; thresholds are in bpm and s/km."""
+    time = streams.get('time')
+    if time is None or len(time) < 2:
+        return ActivityMetrics()
+    time = time.astype(np.float64)
+    # channels that don't line up with the time stream can't be weighted by it
+    streams = {channel: values for channel, values in streams.items() if len(values) == len(time)}
+    durations = np.diff(time, append=time[-1])
+
+    speed, distance = streams.get('velocity_smooth'), streams.get('distance')
+    if speed is not None:
+        speed = speed.astype(np.float64)
+    elif distance is not None:
+        speed = _forward_rate(distance.astype(np.float64), time)
+    if 'moving' in streams:
+        moving = streams['moving'] > 0
+    elif speed is not None:
+        moving = speed > MOVING_SPEED
+    else:
+        moving = np.ones(len(time), dtype=bool)
+    seconds = durations * moving
+    moving_time = float(seconds.sum())
+    if moving_time <= 0:
+        return ActivityMetrics()
+
+    zone_seconds = None
+    heartrate = streams.get('heartrate')
+    if heartrate is not None and threshold_heartrate:
+        zones = np.digitize(heartrate / threshold_heartrate, ZONE_BOUNDS)
+        zone_seconds = np.bincount(zones, weights=seconds, minlength=len(ZONE_BOUNDS) + 1)
+        zone_seconds = np.rint(zone_seconds).astype(int).tolist()
+
+    grade_adjusted_pace = normalized_pace = normalized_speed = None
+    if speed is not None:
+        if 'grade_smooth' in streams:
+            grade = streams['grade_smooth'] / 100
+        elif 'altitude' in streams and distance is not None:
+            grade = _forward_rate(streams['altitude'].astype(np.float64), distance.astype(np.float64))
+        else:
+            grade = np.zeros(len(time))
+        graded_distance = np.cumsum(speed * grade_cost_factor(grade) * seconds)
+        total = float(graded_distance[-1])
+        if total > 0:
+            grade_adjusted_pace = round(1000 * moving_time / total, 1)
+
+            # rolling averages over moving time, read off the cumulative curves at 1 s steps
+            elapsed = np.concatenate(([0.0], np.cumsum(seconds)))
+            covered = np.concatenate(([0.0], graded_distance))
+            if moving_time > NORMALIZED_WINDOW_SECONDS:
+                ends = np.arange(NORMALIZED_WINDOW_SECONDS, moving_time, 1.0)
+                rolling = (
+                    np.interp(ends, elapsed, covered) - np.interp(ends - NORMALIZED_WINDOW_SECONDS, elapsed, covered)
+                ) / NORMALIZED_WINDOW_SECONDS
+                normalized_speed = float(np.mean(rolling**4) ** 0.25)
+            else:
+                normalized_speed = total / moving_time
+            if normalized_speed > 0:  # every window can be stopped while the odd sample moved
+                normalized_pace = round(1000 / normalized_speed, 1)
+
+    intensity = None
+    if normalized_speed and threshold_pace:
+        intensity = normalized_speed * threshold_pace / 1000
+    elif heartrate is not None and threshold_heartrate:
+        intensity = float(np.average(heartrate, weights=seconds)) / threshold_heartrate
+    training_stress = round(moving_time / 3600 * intensity**2 * 100, 1) if intensity is not None else None
+
+    return ActivityMetrics(zone_seconds, grade_adjusted_pace, normalized_pace, training_stress)
+
+
+async def update_activity_metrics(
+    session: AsyncSession, user_id: UUID, activity_ids: Collection[UUID] | None = None
+) -> int:
+    """
+    (Re)compute the metrics of a user's activities with streams (or just ``activity_ids``).
+
+    Streams are decoded a batch of activities at a time and the results written
+    with bulk updates by primary key. The activities' best efforts are stored
+    and the user's personal records updated from the same decoded streams. The
+    caller commits. Returns the number of activities updated.
+    """
+    thresholds = await session.execute(select(User.threshold_heartrate, User.threshold_pace).where(User.id == user_id))
+    threshold_heartrate, threshold_pace = thresholds.one()
+
+    statement = select(ActivityStream.activity_id).where(ActivityStream.user_id == user_id).distinct()
+    if activity_ids is not None:
+        statement = statement.where(ActivityStream.activity_id.in_(activity_ids))
+    pending = list((await session.execute(statement)).scalars())
+
+    now = dt.datetime.now(dt.UTC)
+    for start in range(0, len(pending), BATCH_ACTIVITIES):
+        batch = pending[start : start + BATCH_ACTIVITIES]
+        # columns rather than entities: the bytes aren't kept in the identity map after decoding
+        rows = await session.execute(
+            select(
+                ActivityStream.activity_id,
+                ActivityStream.channel,
+                ActivityStream.dtype,
+                ActivityStream.scale,
+                ActivityStream.length,
+                ActivityStream.dims,
+                ActivityStream.compression,
+                ActivityStream.data,
+            ).where(ActivityStream.activity_id.in_(batch), ActivityStream.channel.in_(INPUT_CHANNELS))
+        )
+        streams = defaultdict(dict)
+        for row in rows:
+            streams[row.activity_id][row.channel] = decode(row)
+        await session.execute(
+            update(TrainingActivity),
+            [
+                {
+                    'id': activity_id,
+                    **asdict(derive(streams[activity_id], threshold_heartrate, threshold_pace)),
+                    'metrics_version': METRICS_VERSION,
+                    'updated_at': now,
+                }
+                for activity_id in batch
+            ],
+        )
+        starts = await session.execute(
+            select(TrainingActivity.id, TrainingActivity.start_date).where(TrainingActivity.id.in_(batch))
+        )
+        await record_best_efforts(
+            session,
+            user_id,
+            {activity_id: (start_date, best_efforts(streams[activity_id])) for activity_id, start_date in starts},
+        )
+    return len(pending)
@@ -0,0 +1,217 @@
+"""
+Best efforts within activities and personal records across them.
+
+An activity's best efforts (its fastest 1 km, 5 km, ..., its highest 20-minute
+average heart rate) are found from its streams once, when its metrics are
+derived (see ``tenflow.training.activity_metrics``), and stored per activity in
+``activity_best_efforts``. ``personal_records`` keeps the best of those per
+user and effort. It is updated from each new activity's efforts alone, and
+only refilled from the stored efforts when a record's activity goes away or
+gets worse. The records page reads a handful of rows and never touches history.
+
+Windows slide over cumulative sums: the time to cover a distance, or the heart
+beats in a span of time, is a difference of two points on a cumulative curve.
+The window start for every sample is found at once with ``np.searchsorted`` over
+the sorted targets (the vectorized form of a two-pointer sweep). Starts are
+interpolated between samples, so efforts are exact to the metre and second
+rather than to the sampling interval.
+"""
+
+import datetime as dt
+from collections.abc import Iterable
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tenflow.models import ActivityBestEffort, PersonalRecord, TrainingActivity
+
+
+@dataclass(frozen=True, slots=True)
+class Effort:
+    name: str
+    kind: str  # 'distance': fastest time over `length` metres; 'heartrate': highest average over `length` seconds
+    length: float
+
+    @property
+    def lower_is_better(self) -> bool:
+        return self.kind == 'distance'
+
+
+EFFORTS = (
+    Effort('1k', 'distance', 1000),
+    Effort('5k', 'distance', 5000),
+    Effort('10k', 'distance', 10000),
+    Effort('half_marathon', 'distance', 21097.5),
+    Effort('marathon', 'distance', 42195),
+    Effort('heartrate_20min', 'heartrate', 1200),
+)
+EFFORTS_BY_NAME = {effort.name: effort for effort in EFFORTS}
+
+
+@dataclass(frozen=True, slots=True)
+class BestEffort:
+    value: float  # seconds for distance efforts, bpm for heart-rate ones
+    start_offset: int  # seconds from the start of the activity
+    end_offset: int
+
+
+def fastest(time: np.ndarray, distance: np.ndarray, meters: float) -> tuple[float, float, float] | None:
+    """(seconds, start, end) of the fastest stretch covering ``meters``; None if the activity is shorter."""
+    # GPS corrections can step distance back; a cumulative curve may only rise
+    distance = np.maximum.accumulate(distance)
+    if len(distance) < 2 or distance[-1] - distance[0] < meters:
+        return None
+    ends = np.flatnonzero(distance - distance[0] >= meters)
+    targets = distance[ends] - meters
+    # the last sample at or before each target distance; the window starts between it and the next one
+    before = np.searchsorted(distance, targets, side='right') - 1
+    d0, d1 = distance[before], distance[before + 1]
+    t0, t1 = time[before], time[before + 1]
+    starts = t0 + (targets - d0) / (d1 - d0) * (t1 - t0)
+    durations = time[ends] - starts
+    best = int(np.argmin(durations))
+    return float(durations[best]), float(starts[best]), float(time[ends[best]])
+
+
+def highest_average(time: np.ndarray, values: np.ndarray, seconds: float) -> tuple[float, float, float] | None:
+    """(average, start, end) of the ``seconds``-long span with the highest time-weighted average."""
+    if len(time) < 2 or time[-1] - time[0] < seconds:
+        return None
+    # each sample holds until the next one, so the running integral is piecewise linear
+    area = np.concatenate(([0.0], np.cumsum(values[:-1] * np.diff(time))))
+    ends = np.flatnonzero(time - time[0] >= seconds)
+    starts = time[ends] - seconds
+    averages = (area[ends] - np.interp(starts, time, area)) / seconds
+    best = int(np.argmax(averages))
+    return float(averages[best]), float(starts[best]), float(time[ends[best]])
+
+
+def best_efforts(streams: dict[str, np.ndarray]) -> dict[str, BestEffort]:
+    """An activity's best efforts from its decoded streams, for the efforts it is long enough for."""
+    time = streams.get('time')
+    if time is None or len(time) < 2:
+        return {}
+    time = time.astype(np.float64)
+    found = {}
+    for effort in EFFORTS:
+        channel = streams.get('distance' if effort.kind == 'distance' else 'heartrate')
+        if channel is None or len(channel) != len(time):
+            continue
+        window = fastest if effort.kind == 'distance' else highest_average
+        best = window(time, channel.astype(np.float64), effort.length)
+        if best is not None:
+            value, start, end = best
+            found[effort.name] = BestEffort(round(value, 1), round(start - time[0]), round(end - time[0]))
+    return found
+
+
+def refill_records(user_id: UUID, efforts: Iterable[str] | None = None) -> list:
+    """
+    Statements inserting a user's best stored effort for each of ``efforts`` that has no record.
+
+    Run after records were removed; existing records are left alone. Returns
+    statements rather than executing them, so they can run on an async session
+    as well as on the connection of a mapper event.
+    """
+    efforts = EFFORTS if efforts is None else [EFFORTS_BY_NAME[name] for name in efforts]
+    statements = []
+    for lower_is_better in (True, False):
+        names = [effort.name for effort in efforts if effort.lower_is_better == lower_is_better]
+        if not names:
+            continue
+        value = ActivityBestEffort.value.asc() if lower_is_better else ActivityBestEffort.value.desc()
+        best = (
+            select(
+                ActivityBestEffort.user_id,
+                ActivityBestEffort.effort,
+                ActivityBestEffort.activity_id,
+                ActivityBestEffort.value,
+                ActivityBestEffort.start_offset,
+                ActivityBestEffort.end_offset,
+                TrainingActivity.start_date,
+                func.now(),
+            )
+            .join(TrainingActivity, TrainingActivity.id == ActivityBestEffort.activity_id)
+            .where(ActivityBestEffort.user_id == user_id, ActivityBestEffort.effort.in_(names))
+            .distinct(ActivityBestEffort.effort)
+            # ties go to whoever got there first
+            .order_by(ActivityBestEffort.effort, value, TrainingActivity.start_date)
+        )
+        columns = [
+            'user_id', 'effort', 'activity_id', 'value', 'start_offset', 'end_offset', 'achieved_at', 'updated_at'
+        ]
+        statements.append(insert(PersonalRecord).from_select(columns, best).on_conflict_do_nothing())
+    return statements
+
+
+async def record_best_efforts(
+    session: AsyncSession, user_id: UUID, activities: dict[UUID, tuple[dt.datetime, dict]]
+) -> None:
+    """
+    Store the best efforts of some of a user's activities and update their records.
+
+    ``activities`` maps activity ids to their start date and ``best_efforts``.
+    Efforts previously stored for them are replaced. The caller commits.
+    """
+    if not activities:
+        return
+    activity_ids = list(activities)
+    await session.execute(delete(ActivityBestEffort).where(ActivityBestEffort.activity_id.in_(activity_ids)))
+    rows = [
+        {
+            'activity_id': activity_id,
+            'effort': name,
+            'user_id': user_id,
+            'value': effort.value,
+            'start_offset': effort.start_offset,
+            'end_offset': effort.end_offset,
+        }
+        for activity_id, (_, efforts) in activities.items()
+        for name, effort in efforts.items()
+    ]
+    if rows:
+        await session.execute(insert(ActivityBestEffort).values(rows))
+
+    # records these activities held may have got worse (or gone): hand them back to the best stored effort
+    vacated = await session.execute(
+        delete(PersonalRecord)
+        .where(PersonalRecord.user_id == user_id, PersonalRecord.activity_id.in_(activity_ids))
+        .returning(PersonalRecord.effort)
+    )
+    vacated = set(vacated.scalars())
+    if vacated:
+        for statement in refill_records(user_id, vacated):
+            await session.execute(statement)
+
+    # everything else only has to beat the current record
+    now = dt.datetime.now(dt.UTC)
+    for lower_is_better in (True, False):
+        candidates = [
+            {**row, 'achieved_at': activities[row['activity_id']][0], 'updated_at': now}
+            for row in rows
+            if EFFORTS_BY_NAME[row['effort']].lower_is_better == lower_is_better and row['effort'] not in vacated
+        ]
+        if not candidates:
+            continue
+        # one candidate per effort: the best among these activities
+        best = {}
+        for candidate in sorted(candidates, key=lambda c: c['value'], reverse=not lower_is_better):
+            best.setdefault(candidate['effort'], candidate)
+        statement = insert(PersonalRecord).values(list(best.values()))
+        beaten = (
+            PersonalRecord.value > statement.excluded.value
+            if lower_is_better
+            else PersonalRecord.value < statement.excluded.value
+        )
+        columns = ('activity_id', 'value', 'start_offset', 'end_offset', 'achieved_at', 'updated_at')
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=['user_id', 'effort'],
+                set_={column: statement.excluded[column] for column in columns},
+                where=beaten,
+            )
+        )
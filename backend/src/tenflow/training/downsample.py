@@ -0,0 +1,83 @@
+"""
+Reducing a long activity stream to a few hundred points for charting.
+
+Both methods pick samples rather than averaging them, so every returned point
+is a real recorded value and spikes survive:
+
+- ``lttb``: Largest-Triangle-Three-Buckets. The interior samples are split
+  into equal buckets and each bucket keeps the sample forming the largest
+  triangle with the previously kept sample and the next bucket's average.
+  It keeps the visual shape of a line chart.
+- ``minmax``: the lowest and highest sample of each bucket, which guarantees
+  the chart shows the true range (e.g. peak heart rate).
+
+Both return sample indices, so other channels can be read at the same points.
+The work per bucket is vectorized; LTTB still loops once per bucket, since each
+choice depends on the one before, but that's per output point, not per sample.
+"""
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of ``points`` samples of the line (x, y), always including the first and last."""
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # points - 2 buckets over samples 1..n-2; with n > points each holds at least one
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    mean_x = (sum_x[edges[1:]] - sum_x[edges[:-1]]) / sizes
+    mean_y = (sum_y[edges[1:]] - sum_y[edges[:-1]]) / sizes
+    # the point each bucket's triangles close on: the next bucket's mean, or the last sample
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    kept = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        ax, ay = x[kept], y[kept]
+        # twice the triangle areas; the factor doesn't change the argmax
+        areas = np.abs((ax - next_x[bucket]) * (y[start:end] - ay) - (ax - x[start:end]) * (next_y[bucket] - ay))
+        kept = start + int(np.argmax(areas))
+        selected[bucket + 1] = kept
+    return selected
+
+
+def minmax(y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of ``points // 2`` buckets, in order."""
+    n = len(y)
+    if points >= n or points < 2:
+        return np.arange(n)
+    size = -(-n // (points // 2))
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets)[:, None] * size
+    pairs = np.column_stack([np.nanargmin(padded, axis=1), np.nanargmax(padded, axis=1)]) + offsets
+    # one index per bucket when its min and max are the same sample
+    return np.unique(pairs)
+
+
+def downsample(values: np.ndarray, time: np.ndarray | None, method: str, points: int) -> np.ndarray:
+    """
+    Indices of at most ``points`` samples of a decoded stream, by ``method`` ('lttb' or 'minmax').
+
+    Values are taken against ``time``, or evenly spaced without it. Two-column
+    streams (latlng) are treated as a route and reduced with LTTB in the plane.
+    """
+    if values.ndim == 2:
+        if method != 'lttb':
+            raise ValueError('two-dimensional streams can only be downsampled with lttb')
+        return lttb(values[:, 0], values[:, 1], points)
+    if method == 'minmax':
+        return minmax(values, points)
+    return lttb(time if time is not None else np.arange(len(values)), values, points)
@@ -0,0 +1,219 @@
+"""
+Pairing recorded activities with the prescribed workouts they fulfil.
+
+Candidates are scored on date, time of day, type and distance similarity.
+Each user's open workouts are held in a ``WorkoutIndex``: sorted by date, each
+accepting activities up to ``DAY_TOLERANCE`` days either side, so an
+activity's candidates are one contiguous slice found with two bisects. Pairs
+scoring at least ``MIN_SCORE`` are then assigned best first, one activity per
+workout. A backfill of n activities costs O(n log n) rather than comparing
+every activity with every workout.
+
+Activities that fit no workout are left unmatched on purpose: their
+``prescribed_workout_id`` stays NULL and they are reported back, rather than
+being forced onto the nearest prescription.
+"""
+
+import bisect
+import datetime as dt
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from sqlalchemy import exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tenflow.models import PrescribedWorkout, TrainingActivity
+
+# How many days early or late an activity may be recorded and still count.
+DAY_TOLERANCE = 1
+MIN_SCORE = 0.5
+WEIGHTS = {'date': 0.4, 'time_of_day': 0.15, 'distance': 0.35, 'type': 0.1}
+AFTERNOON_FROM_HOUR = 12
+
+# Activity types (Strava sport types, lower-cased) that fulfil a prescription.
+# Prescriptions not listed here are runs of some kind ('easy', 'tempo', 'long', ...).
+RUN_ACTIVITY_TYPES = frozenset({'run', 'trailrun', 'virtualrun', 'treadmill'})
+CROSS_TRAINING_TYPES = {
+    'ride': frozenset({'ride', 'virtualride', 'gravelride', 'mountainbikeride'}),
+    'swim': frozenset({'swim'}),
+    'strength': frozenset({'weighttraining', 'workout', 'crossfit'}),
+    'cross_training': frozenset({'ride', 'virtualride', 'swim', 'elliptical', 'rowing', 'workout'}),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class WorkoutSlot:
+    id: UUID
+    workout_date: dt.date
+    workout_time: str
+    workout_type: str
+    distance: float
+
+
+@dataclass(frozen=True, slots=True)
+class ActivityRecord:
+    id: UUID
+    local_start: dt.datetime  # wall-clock time where the activity happened
+    activity_type: str
+    distance: float | None
+    workout_type: str | None = None  # the prescription type the import recorded, if any
+
+
+@dataclass(frozen=True, slots=True)
+class Match:
+    activity_id: UUID
+    workout_id: UUID
+    score: float
+
+
+@dataclass(slots=True)
+class MatchResult:
+    matched: list[Match] = field(default_factory=list)
+    unmatched: list[UUID] = field(default_factory=list)
+
+
+class WorkoutIndex:
+    """A user's open workouts sorted by date, queried by the day an activity happened."""
+
+    def __init__(self, workouts: Iterable[WorkoutSlot]):
+        self._workouts = sorted(workouts, key=lambda workout: (workout.workout_date, workout.id))
+        self._days = [workout.workout_date.toordinal() for workout in self._workouts]
+
+    def candidates(self, day: dt.date) -> list[WorkoutSlot]:
+        ordinal = day.toordinal()
+        start = bisect.bisect_left(self._days, ordinal - DAY_TOLERANCE)
+        end = bisect.bisect_right(self._days, ordinal + DAY_TOLERANCE)
+        return self._workouts[start:end]
+
+    def __len__(self) -> int:
+        return len(self._workouts)
+
+
+def time_of_day(moment: dt.datetime) -> str:
+    return 'afternoon' if moment.hour >= AFTERNOON_FROM_HOUR else 'morning'
+
+
+def types_compatible(workout_type: str, activity_type: str) -> bool:
+    activity_type = activity_type.lower().replace('_', '')
+    accepted = CROSS_TRAINING_TYPES.get(workout_type.lower())
+    if accepted is None:
+        return activity_type in RUN_ACTIVITY_TYPES
+    return activity_type in accepted
+
+
+def score(activity: ActivityRecord, workout: WorkoutSlot) -> float | None:
+    """How well an activity fits a workout, from 0 to 1; None when it can't fulfil it at all."""
+    days_apart = abs((activity.local_start.date() - workout.workout_date).days)
+    if days_apart > DAY_TOLERANCE or not types_compatible(workout.workout_type, activity.activity_type):
+        return None
+
+    if activity.distance and workout.distance > 0:
+        distance = min(activity.distance, workout.distance) / max(activity.distance, workout.distance)
+    else:
+        distance = 0.5  # nothing to compare
+    return (
+        WEIGHTS['date'] * (1.0 if days_apart == 0 else 0.5)
+        + WEIGHTS['time_of_day'] * (time_of_day(activity.local_start) == workout.workout_time)
+        + WEIGHTS['distance'] * distance
+        + WEIGHTS['type'] * (activity.workout_type == workout.workout_type)
+    )
+
+
+def match(activities: Iterable[ActivityRecord], workouts: Iterable[WorkoutSlot]) -> MatchResult:
+    """Assign each activity at most one workout and each workout at most one activity, best pairs first."""
+    activities = list(activities)
+    index = WorkoutIndex(workouts)
+    pairs = []
+    for activity in activities:
+        for workout in index.candidates(activity.local_start.date()):
+            pair_score = score(activity, workout)
+            if pair_score is not None and pair_score >= MIN_SCORE:
+                pairs.append((pair_score, activity, workout))
+    # ties go to the earlier activity, then by id, so results don't depend on input order
+    pairs.sort(key=lambda pair: (-pair[0], pair[1].local_start, pair[1].id, pair[2].id))
+
+    result = MatchResult()
+    matched_activities, matched_workouts = set(), set()
+    for pair_score, activity, workout in pairs:
+        if activity.id in matched_activities or workout.id in matched_workouts:
+            continue
+        matched_activities.add(activity.id)
+        matched_workouts.add(workout.id)
+        result.matched.append(Match(activity.id, workout.id, round(pair_score, 4)))
+    result.unmatched = [activity.id for activity in activities if activity.id not in matched_activities]
+    return result
+
+
+def _local_start(start_date: dt.datetime, start_date_local: str | None) -> dt.datetime:
+    # Strava's start_date_local is wall-clock time, despite its trailing 'Z'
+    if start_date_local:
+        return dt.datetime.fromisoformat(start_date_local).replace(tzinfo=None)
+    return start_date.astimezone(dt.UTC).replace(tzinfo=None)
+
+
+async def match_activities(
+    session: AsyncSession, user_id: UUID, activity_ids: Collection[UUID] | None = None
+) -> MatchResult:
+    """
+    Match a user's unmatched activities (or just ``activity_ids``) to workouts that have none yet.
+
+    Matched activities get their ``prescribed_workout_id`` and matched workouts are
+    marked completed, in bulk; the caller commits.
+    """
+    statement = select(
+        TrainingActivity.id,
+        TrainingActivity.start_date,
+        TrainingActivity.activity_data['start_date_local'].astext,
+        TrainingActivity.activity_type,
+        TrainingActivity.distance,
+        TrainingActivity.actual_workout['type'].astext,
+    ).where(TrainingActivity.user_id == user_id, TrainingActivity.prescribed_workout_id.is_(None))
+    if activity_ids is not None:
+        statement = statement.where(TrainingActivity.id.in_(activity_ids))
+    activities = [
+        ActivityRecord(
+            id=activity_id,
+            local_start=_local_start(start_date, start_date_local),
+            activity_type=activity_type,
+            distance=float(distance) if distance is not None else None,
+            workout_type=workout_type,
+        )
+        for activity_id, start_date, start_date_local, activity_type, distance, workout_type in (
+            await session.execute(statement)
+        )
+    ]
+    if not activities:
+        return MatchResult()
+
+    days = [activity.local_start.date() for activity in activities]
+    has_activity = exists().where(TrainingActivity.prescribed_workout_id == PrescribedWorkout.id)
+    statement = select(
+        PrescribedWorkout.id,
+        PrescribedWorkout.workout_date,
+        PrescribedWorkout.workout_time,
+        PrescribedWorkout.workout_type,
+        PrescribedWorkout.distance,
+    ).where(
+        PrescribedWorkout.user_id == user_id,
+        PrescribedWorkout.workout_date >= min(days) - dt.timedelta(days=DAY_TOLERANCE),
+        PrescribedWorkout.workout_date <= max(days) + dt.timedelta(days=DAY_TOLERANCE),
+        ~has_activity,
+    )
+    workouts = [
+        WorkoutSlot(workout_id, workout_date, workout_time, workout_type, float(distance))
+        for workout_id, workout_date, workout_time, workout_type, distance in await session.execute(statement)
+    ]
+
+    result = match(activities, workouts)
+    if result.matched:
+        now = dt.datetime.now(dt.UTC)
+        await session.execute(
+            update(TrainingActivity),
+            [{'id': m.activity_id, 'prescribed_workout_id': m.workout_id, 'updated_at': now} for m in result.matched],
+        )
+        await session.execute(
+            update(PrescribedWorkout),
+            [{'id': m.workout_id, 'is_completed': True, 'updated_at': now} for m in result.matched],
+        )
+    return result
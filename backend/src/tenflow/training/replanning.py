@@ -0,0 +1,246 @@
+"""
+Adapting the rest of a training plan to what the athlete actually ran.
+
+After each week the load that was run (the distance of their runs) is
+compared with the load that was prescribed:
+
+- Missed load: the next weeks' totals may rise at most ``MAX_WEEKLY_INCREASE``
+  a week from what was actually run (but from no less than
+  ``MIN_RESTART_LOAD`` of what was prescribed), until they meet the plan again.
+  A week with nothing recorded is no basis for rebuilding (runs may just not
+  be synced yet), so it leaves the plan alone.
+- Overrun: part of the excess (``OVERRUN_ABSORB``) comes off the next week.
+
+Each week is adapted once: the plan remembers the last week it was replanned
+in, and replanning again in the same week changes nothing.
+
+Only weeks whose total changes are rebuilt, and within those only workouts
+still ahead. Workout distances are scaled to the week's new total. Easy runs
+are dropped when the total can't keep every run at ``MIN_WORKOUT_DISTANCE``,
+and added back on free training days when the remaining runs would grow more
+than ``MAX_WORKOUT_GROWTH``. Key sessions (long runs, tempo, intervals) are
+never dropped. The result is compared with the stored workouts and applied
+as the inserts, updates and deletes that differ, in the caller's transaction.
+Nothing else in the plan is touched.
+"""
+
+import datetime as dt
+from dataclasses import dataclass, field, replace
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tenflow.models import PrescribedWorkout, TrainingActivity, TrainingPlan, User
+from tenflow.training.matching import RUN_ACTIVITY_TYPES
+
+MAX_WEEKLY_INCREASE = 0.10
+MIN_RESTART_LOAD = 0.25  # of last week's prescription
+# A week within this fraction of its prescription was run as planned.
+LOAD_TOLERANCE = 0.10
+OVERRUN_ABSORB = 0.5
+MAX_OVERRUN_CUT = 0.3  # of the next week's prescription
+MIN_WORKOUT_DISTANCE = 3.0  # km
+MAX_WORKOUT_GROWTH = 1.3
+FLEXIBLE_WORKOUT_TYPES = frozenset({'easy', 'recovery'})
+DISTANCE_STEP = Decimal('0.1')
+
+
+@dataclass(frozen=True, slots=True)
+class WorkoutSpec:
+    """A workout as the replanned week wants it; ``id`` is None for new ones."""
+
+    id: UUID | None
+    workout_date: dt.date
+    workout_type: str
+    distance: Decimal
+    duration_minutes: int | None = None
+    workout_time: str = 'morning'
+
+
+@dataclass(slots=True)
+class PlanChanges:
+    weeks: list[int] = field(default_factory=list)  # plan week numbers, from 0
+    inserted: list[WorkoutSpec] = field(default_factory=list)
+    updated: list[WorkoutSpec] = field(default_factory=list)
+    deleted: list[UUID] = field(default_factory=list)
+
+
+def adapt_targets(prescribed: list[float], last_prescribed: float, last_actual: float) -> list[float]:
+    """Week totals from the current week on, given how the last completed week went."""
+    targets = list(prescribed)
+    if not targets or last_prescribed <= 0 or last_actual <= 0:
+        return targets
+    if last_actual < last_prescribed * (1 - LOAD_TOLERANCE):
+        ceiling = max(last_actual, MIN_RESTART_LOAD * last_prescribed)
+        for week, total in enumerate(prescribed):
+            ceiling *= 1 + MAX_WEEKLY_INCREASE
+            if total <= ceiling:
+                break  # caught up; the plan's own progression takes over
+            targets[week] = ceiling
+    elif last_actual > last_prescribed * (1 + LOAD_TOLERANCE):
+        cut = min(OVERRUN_ABSORB * (last_actual - last_prescribed), MAX_OVERRUN_CUT * prescribed[0])
+        targets[0] = prescribed[0] - cut
+    return targets
+
+
+def _scaled(workout: WorkoutSpec, factor: float) -> WorkoutSpec:
+    distance = (workout.distance * Decimal(factor)).quantize(DISTANCE_STEP)
+    duration = round(workout.duration_minutes * factor) if workout.duration_minutes is not None else None
+    return replace(workout, distance=distance, duration_minutes=duration)
+
+
+def rebuild_week(upcoming: list[WorkoutSpec], target: float, free_days: list[dt.date]) -> list[WorkoutSpec]:
+    """
+    The workouts still ahead in a week, reshaped so they add up to ``target`` km.
+
+    ``free_days`` are days ahead in the week with no workout, where easy runs can go.
+    """
+    if target <= 0:
+        return [workout for workout in upcoming if workout.workout_type not in FLEXIBLE_WORKOUT_TYPES]
+    workouts = sorted(upcoming, key=lambda workout: workout.workout_date)
+    capacity = int(target // MIN_WORKOUT_DISTANCE)
+
+    # too little load for every run to be worth doing: drop the shortest easy runs
+    flexible = sorted(
+        (workout for workout in workouts if workout.workout_type in FLEXIBLE_WORKOUT_TYPES),
+        key=lambda workout: workout.distance,
+    )
+    while len(workouts) > max(capacity, 1) and flexible:
+        workouts.remove(flexible.pop(0))
+
+    # more load than the runs can carry: add easy runs on free days
+    free_days = sorted(free_days)
+    total = float(sum(workout.distance for workout in workouts))
+    while free_days and len(workouts) < capacity and (not total or target / total > MAX_WORKOUT_GROWTH):
+        workouts.append(WorkoutSpec(None, free_days.pop(0), 'easy', Decimal(MIN_WORKOUT_DISTANCE)))
+        total += MIN_WORKOUT_DISTANCE
+
+    if not total:
+        return workouts
+    factor = target / total
+    return sorted((_scaled(workout, factor) for workout in workouts), key=lambda workout: workout.workout_date)
+
+
+def _spec(workout: PrescribedWorkout) -> WorkoutSpec:
+    return WorkoutSpec(
+        workout.id,
+        workout.workout_date,
+        workout.workout_type,
+        workout.distance,
+        workout.duration_minutes,
+        workout.workout_time,
+    )
+
+
+def _week(plan: TrainingPlan, day: dt.date) -> int:
+    return (day - plan.start_date).days // 7
+
+
+async def _run_distance(session: AsyncSession, user_id: UUID, start: dt.datetime, end: dt.datetime) -> float:
+    statement = select(func.coalesce(func.sum(TrainingActivity.distance), 0)).where(
+        TrainingActivity.user_id == user_id,
+        TrainingActivity.start_date >= start,
+        TrainingActivity.start_date < end,
+        func.lower(func.replace(TrainingActivity.activity_type, '_', '')).in_(RUN_ACTIVITY_TYPES),
+    )
+    return float((await session.execute(statement)).scalar_one())
+
+
+def _midnight(day: dt.date) -> dt.datetime:
+    return dt.datetime.combine(day, dt.time(), tzinfo=dt.UTC)
+
+
+async def replan(session: AsyncSession, plan: TrainingPlan, today: dt.date, apply: bool = True) -> PlanChanges:
+    """
+    Adapt the weeks of ``plan`` from the one containing ``today`` to the load run in the week before.
+
+    With ``apply`` the changes are made on the session (the caller commits);
+    otherwise they are only returned, with new workouts still lacking an id.
+    """
+    current_week = _week(plan, today)
+    if current_week < 1 or current_week >= plan.duration_weeks:
+        return PlanChanges()  # nothing run yet, or nothing left to adapt
+    if plan.replanned_week is not None and current_week <= plan.replanned_week:
+        return PlanChanges()  # the stored weeks already account for last week's load
+    current_start = plan.start_date + dt.timedelta(weeks=current_week)
+    last_start = current_start - dt.timedelta(weeks=1)
+
+    statement = (
+        select(PrescribedWorkout)
+        .where(PrescribedWorkout.training_plan_id == plan.id, PrescribedWorkout.workout_date >= last_start)
+        .order_by(PrescribedWorkout.workout_date)
+    )
+    workouts = (await session.execute(statement)).scalars().all()
+    weeks: dict[int, list[PrescribedWorkout]] = {}
+    for workout in workouts:
+        weeks.setdefault(_week(plan, workout.workout_date), []).append(workout)
+
+    last_prescribed = float(sum(workout.distance for workout in weeks.get(current_week - 1, [])))
+    last_actual = await _run_distance(session, plan.user_id, _midnight(last_start), _midnight(current_start))
+    remaining = range(current_week, plan.duration_weeks)
+    prescribed = [float(sum(workout.distance for workout in weeks.get(week, []))) for week in remaining]
+    targets = adapt_targets(prescribed, last_prescribed, last_actual)
+
+    changes = PlanChanges()
+    for week, total, target in zip(remaining, prescribed, targets, strict=True):
+        if abs(target - total) < float(DISTANCE_STEP):
+            continue
+        week_start = plan.start_date + dt.timedelta(weeks=week)
+        upcoming = [w for w in weeks.get(week, []) if w.workout_date >= today and not w.is_completed]
+        done = 0.0
+        if week == current_week:
+            # what's behind us this week counts as it was run; the rest of the week makes up the difference
+            done = await _run_distance(session, plan.user_id, _midnight(week_start), _midnight(today))
+        taken = {w.workout_date for w in weeks.get(week, [])}
+        free_days = [
+            day
+            for day in (week_start + dt.timedelta(days=offset) for offset in range(7))
+            if day >= today and day not in taken and day <= plan.end_date
+        ][: max(0, plan.training_days_per_week - len(taken))]
+
+        current = {w.id: _spec(w) for w in upcoming}
+        desired = rebuild_week(list(current.values()), target - done, free_days)
+        kept = {spec.id for spec in desired if spec.id is not None}
+        changes.weeks.append(week)
+        changes.inserted += [spec for spec in desired if spec.id is None]
+        changes.updated += [spec for spec in desired if spec.id is not None and spec != current[spec.id]]
+        changes.deleted += [workout_id for workout_id in current if workout_id not in kept]
+
+    if apply and changes.weeks:
+        changes.inserted = await _apply(session, plan, workouts, changes)
+        plan.replanned_week = current_week
+    return changes
+
+
+async def _apply(
+    session: AsyncSession, plan: TrainingPlan, workouts: list[PrescribedWorkout], changes: PlanChanges
+) -> list[WorkoutSpec]:
+    # through the ORM so updated_at and sync tombstones are kept; only changed rows are written
+    by_id = {workout.id: workout for workout in workouts}
+    for spec in changes.updated:
+        workout = by_id[spec.id]
+        workout.distance = spec.distance
+        workout.duration_minutes = spec.duration_minutes
+    for workout_id in changes.deleted:
+        await session.delete(by_id[workout_id])
+    inserted = []
+    # the relationships, not just the keys: an unset relationship would clear its key on flush
+    user = await session.get(User, plan.user_id) if changes.inserted else None
+    for spec in changes.inserted:
+        workout = PrescribedWorkout(
+            user=user,
+            training_plan=plan,
+            workout_date=spec.workout_date,
+            workout_time=spec.workout_time,
+            workout_type=spec.workout_type,
+            distance=spec.distance,
+            duration_minutes=spec.duration_minutes,
+            intensity_zone=None,
+            rpe_target=None,
+            workout_description='Easy run added to rebuild load',
+        )
+        session.add(workout)
+        inserted.append(replace(spec, id=workout.id))
+    return inserted
@@ -0,0 +1,173 @@
+"""
+Columnar storage for activity time-series streams.
+
+Each channel of an activity (heart rate, altitude, latlng, ...) is one row of
+``activity_streams`` holding the whole series as a packed little-endian array,
+so reading a channel never touches the others, and nothing goes through JSON.
+
+Channels are encoded one of two ways (see ``CHANNELS``):
+
+- ``float32``: the values as float32.
+- ``delta``: values quantized to multiples of ``scale`` and stored as the
+  differences between consecutive samples, in the narrowest integer type that
+  holds them. Per-second samples barely change, so most deltas fit in a byte.
+
+The packed bytes are zlib-compressed when that makes them smaller. Decoding
+wraps the bytes in a ``memoryview`` and reads them with ``np.frombuffer``
+without copying; only the prefix sum of delta channels allocates.
+"""
+
+import datetime as dt
+import math
+import zlib
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tenflow.models import ActivityStream
+
+COMPRESSION_LEVEL = 6
+# Compressed data is only kept if it saves at least this much; otherwise reads stay zero-copy.
+MIN_COMPRESSION_SAVING = 0.1
+
+
+@dataclass(frozen=True, slots=True)
+class Codec:
+    encoding: str  # 'delta' or 'float32'
+    scale: float = 1.0  # quantum of a delta channel, in the channel's unit
+    dims: int = 1
+
+
+# Strava's stream types, in their units.
+CHANNELS = {
+    'time': Codec('delta'),  # s since the start
+    'distance': Codec('delta', scale=0.1),  # m
+    'latlng': Codec('delta', scale=1e-7, dims=2),  # degrees (~1 cm)
+    'altitude': Codec('delta', scale=0.1),  # m
+    'velocity_smooth': Codec('float32'),  # m/s
+    'heartrate': Codec('delta'),  # bpm
+    'cadence': Codec('delta'),  # rpm
+    'watts': Codec('delta'),  # W
+    'temp': Codec('delta'),  # °C
+    'moving': Codec('delta'),  # 0 or 1
+    'grade_smooth': Codec('float32'),  # %
+}
+
+_INT_DTYPES = ('<i1', '<i2', '<i4', '<i8')
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedStream:
+    dtype: str
+    scale: float | None  # None for float32 channels
+    length: int
+    dims: int
+    compression: str  # 'zlib' or 'none'
+    data: bytes
+
+
+def encode(channel: str, values) -> EncodedStream:
+    codec = CHANNELS.get(channel)
+    if codec is None:
+        raise ValueError(f'unknown stream channel {channel!r}')
+    array = np.asarray(values, dtype=np.float64)
+    expected = (len(array),) if codec.dims == 1 else (len(array), codec.dims)
+    if array.size == 0:
+        array = array.reshape(expected)
+    if array.shape != expected:
+        shape = 'numbers' if codec.dims == 1 else f'lists of {codec.dims} numbers'
+        raise ValueError(f'{channel} samples must be {shape}')
+    if not np.isfinite(array).all():
+        raise ValueError(f'{channel} has missing or non-finite samples')
+
+    if codec.encoding == 'float32':
+        packed, dtype, scale = array.astype('<f4'), '<f4', None
+    else:
+        quantized = np.rint(array / codec.scale).astype(np.int64)
+        deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, *quantized.shape[1:]), dtype=np.int64))
+        dtype = next(
+            name
+            for name in _INT_DTYPES
+            if deltas.size == 0
+            or (np.iinfo(name).min <= deltas.min() and deltas.max() <= np.iinfo(name).max)
+        )
+        packed, scale = deltas.astype(dtype), codec.scale
+
+    raw = packed.tobytes()
+    compressed = zlib.compress(raw, COMPRESSION_LEVEL)
+    if len(compressed) <= len(raw) * (1 - MIN_COMPRESSION_SAVING):
+        return EncodedStream(dtype, scale, len(array), codec.dims, 'zlib', compressed)
+    return EncodedStream(dtype, scale, len(array), codec.dims, 'none', raw)
+
+
+def decode(stream: ActivityStream | EncodedStream) -> np.ndarray:
+    """
+    The samples of a stored channel: shape (length,) or (length, dims).
+
+    float32 channels stored uncompressed come back as a read-only view of the
+    row's bytes. Delta channels with a scale of 1 decode to int64, others to float64.
+    """
+    raw = stream.data if stream.compression == 'none' else zlib.decompress(stream.data)
+    values = np.frombuffer(memoryview(raw), dtype=stream.dtype)
+    if stream.dims > 1:
+        values = values.reshape(stream.length, stream.dims)
+    if stream.scale is None:
+        return values
+    values = np.cumsum(values, axis=0, dtype=np.int64)
+    return values if stream.scale == 1 else values * stream.scale
+
+
+def to_list(channel: str, values: np.ndarray) -> list:
+    """Samples as JSON-ready lists, without float noise beyond the channel's precision."""
+    codec = CHANNELS[channel]
+    if values.dtype.kind in 'iu':
+        return values.tolist()
+    decimals = 3 if codec.encoding == 'float32' else max(0, math.ceil(-math.log10(codec.scale)))
+    return np.round(values.astype(np.float64), decimals).tolist()
+
+
+async def store_streams(session: AsyncSession, activity_id: UUID, user_id: UUID, streams: dict) -> list[str]:
+    """Encode and upsert channels of one activity; other stored channels are left alone. The caller commits."""
+    now = dt.datetime.now(dt.UTC)
+    rows = []
+    for channel, values in streams.items():
+        encoded = encode(channel, values)
+        rows.append(
+            {
+                'activity_id': activity_id,
+                'channel': channel,
+                'user_id': user_id,
+                'dtype': encoded.dtype,
+                'scale': encoded.scale,
+                'length': encoded.length,
+                'dims': encoded.dims,
+                'compression': encoded.compression,
+                'data': encoded.data,
+                'created_at': now,
+                'updated_at': now,
+            }
+        )
+    if rows:
+        statement = insert(ActivityStream).values(rows)
+        columns = ('dtype', 'scale', 'length', 'dims', 'compression', 'data', 'updated_at')
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=['activity_id', 'channel'],
+                set_={column: statement.excluded[column] for column in columns},
+            )
+        )
+    return [row['channel'] for row in rows]
+
+
+async def load_streams(session: AsyncSession, activity_id: UUID, user_id: UUID, channels: list[str]) -> dict:
+    """Decode the requested channels of one of the user's activities; channels that aren't stored are omitted."""
+    statement = select(ActivityStream).where(
+        ActivityStream.activity_id == activity_id,
+        ActivityStream.user_id == user_id,
+        ActivityStream.channel.in_(channels),
+    )
+    return {stream.channel: decode(stream) for stream in (await session.execute(statement)).scalars()}
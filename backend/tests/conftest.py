@@ -1,5 +1,6 @@
 import pytest
 import uuid
+from contextlib import contextmanager
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 import alembic.config
@@ -179,4 +180,88 @@ async def async_client_fixture(session, env_vars):
     from tenflow.main import app
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url='http://localhost') as ac:
-        yield ac
\ No newline at end of file
+        yield ac
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail the test when the wrapped block issues more SQL statements than budgeted.
+
+    Usage:
+        with query_budget(3):
+            response = await async_client.get(...)
+    """
+    from tenflow.core.query_profiler import capture_queries
+
+    @contextmanager
+    def budget(max_queries: int):
+        with capture_queries() as profile:
+            yield profile
+        statements = '\n'.join(f'  [{r.engine}] {r.statement}' for r in profile.records)
+        assert profile.count <= max_queries, (
+            f'Expected at most {max_queries} queries, got {profile.count}:\n{statements}'
+        )
+
+    return budget
+
+
+@pytest.fixture
+async def pg_trgm(session):
+    """Skip the test unless the pg_trgm extension (and so the migrations' trigram indexes) is installed."""
+    installed = await session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+    if installed.first() is None:
+        pytest.skip('pg_trgm is not available on the test server, so there are no trigram indexes')
+
+
+
+@pytest.fixture
+def make_user(env_vars):
+    """
+    Build unsaved users, active and not superusers, with the password 'testpassword'.
+
+    Usage:
+        user = make_user('runner', threshold_heartrate=160)
+    """
+    from tenflow.core import security
+    from tenflow.models import User
+
+    def make(name: str = 'testuser', **fields):
+        user_id = fields.pop('id', None) or uuid.uuid4()
+        defaults = {
+            'email': f'{name}-{uuid.uuid4().hex[:8]}@example.com',
+            'full_name': name.title(),
+            'hashed_password': security.get_password_hash('testpassword'),
+            'access_token': security.create_access_token(subject=user_id),
+            'is_active': True,
+            'is_superuser': False,
+        }
+        return User(id=user_id, **(defaults | fields))
+
+    return make
+
+
+@pytest.fixture
+def headers_for(env_vars):
+    """Authorization headers for a user id."""
+    from tenflow.core import security
+
+    def headers(user_id):
+        return {'Authorization': f'Bearer {security.create_access_token(subject=user_id)}'}
+
+    return headers
+
+
+@pytest.fixture
+async def test_user(session, make_user):
+    """A saved user for authenticated requests."""
+    user = make_user(full_name='Test User')
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_headers(test_user, headers_for):
+    return headers_for(test_user.id)
@@ -0,0 +1,183 @@
+import numpy as np
+import pytest
+from datetime import UTC, datetime
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from tenflow.models import TrainingActivity
+from tenflow.training.activity_metrics import METRICS_VERSION, derive, grade_cost_factor
+
+HOUR = 3600
+
+
+def steady(seconds=HOUR, speed=3.0, **channels):
+    time = np.arange(seconds)
+    return {"time": time, "velocity_smooth": np.full(seconds, speed), **channels}
+
+
+# Derivation Tests
+
+def test_time_in_zone():
+    heartrate = np.repeat([120, 140, 150, 155, 175], HOUR // 5)
+    metrics = derive(steady(heartrate=heartrate), threshold_heartrate=160)
+
+    # the last sample has no duration of its own
+    assert metrics.zone_seconds == [720, 720, 720, 720, 719]
+
+
+def test_flat_steady_run():
+    metrics = derive(steady(speed=1000 / 300), threshold_pace=300)
+
+    assert metrics.grade_adjusted_pace == pytest.approx(300, abs=0.1)
+    assert metrics.normalized_pace == pytest.approx(300, abs=0.1)
+    # an hour at threshold
+    assert metrics.training_stress == pytest.approx(100, abs=0.1)
+
+
+def test_climbing_is_graded_faster():
+    uphill = derive(steady(grade_smooth=np.full(HOUR, 8.0)))
+    downhill = derive(steady(grade_smooth=np.full(HOUR, -8.0)))
+    flat = derive(steady())
+
+    assert uphill.grade_adjusted_pace < flat.grade_adjusted_pace < downhill.grade_adjusted_pace
+    assert grade_cost_factor(np.array([0.0]))[0] == pytest.approx(1)
+
+
+def test_grade_from_altitude_and_distance():
+    distance = np.arange(HOUR) * 3.0
+    recorded = derive(steady(distance=distance, altitude=distance * 0.05))
+    given = derive(steady(grade_smooth=np.full(HOUR, 5.0)))
+
+    assert recorded.grade_adjusted_pace == pytest.approx(given.grade_adjusted_pace, abs=0.5)
+
+
+def test_surges_raise_normalized_pace():
+    # 2 minutes hard, 2 minutes easy, averaging 3 m/s
+    speed = np.tile(np.repeat([4.0, 2.0], 120), HOUR // 240)
+    metrics = derive({"time": np.arange(HOUR), "velocity_smooth": speed})
+
+    assert metrics.grade_adjusted_pace == pytest.approx(1000 / 3, abs=0.5)
+    assert metrics.normalized_pace < metrics.grade_adjusted_pace - 20
+
+
+def test_stops_are_left_out():
+    speed = np.concatenate([np.full(HOUR // 2, 3.0), np.zeros(HOUR // 2)])
+    metrics = derive({"time": np.arange(HOUR), "velocity_smooth": speed}, threshold_pace=300)
+
+    assert metrics.grade_adjusted_pace == pytest.approx(1000 / 3, abs=0.5)
+    assert metrics.training_stress == pytest.approx(0.5 * 0.9**2 * 100, abs=0.5)
+
+
+def test_stress_from_heart_rate_without_threshold_pace():
+    metrics = derive({"time": np.arange(HOUR), "heartrate": np.full(HOUR, 144)}, threshold_heartrate=160)
+
+    assert metrics.grade_adjusted_pace is None
+    assert metrics.training_stress == pytest.approx(0.9**2 * 100, abs=0.5)
+
+
+def test_no_normalized_pace_when_every_window_is_stopped():
+    speed = np.zeros(33)
+    speed[31] = 5.0
+    metrics = derive({"time": np.arange(33), "moving": np.ones(33), "velocity_smooth": speed}, threshold_pace=300)
+
+    assert metrics.grade_adjusted_pace is not None
+    assert metrics.normalized_pace is None
+    assert metrics.training_stress is None
+
+
+def test_nothing_to_derive():
+    assert derive({}).training_stress is None
+    assert derive({"heartrate": np.full(10, 150)}, threshold_heartrate=160).zone_seconds is None
+    assert derive(steady(heartrate=np.full(10, 150)), threshold_heartrate=160).zone_seconds is None
+
+
+# Stored Metrics Tests
+
+@pytest.fixture
+async def test_user(session, make_user):
+    user = make_user("metrics", threshold_heartrate=160)
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+@pytest.fixture
+async def activity_id(session, test_user):
+    activity = TrainingActivity(
+        user=test_user,
+        name="Threshold Run",
+        activity_type="Run",
+        actual_workout=None,
+        activity_data=None,
+        start_date=datetime(2026, 3, 2, 7, tzinfo=UTC),
+    )
+    session.add(activity)
+    activity_id = activity.id
+    await session.commit()
+    return activity_id
+
+
+async def stored_metrics(session, activity_id):
+    statement = select(
+        TrainingActivity.zone_seconds,
+        TrainingActivity.grade_adjusted_pace,
+        TrainingActivity.training_stress,
+        TrainingActivity.metrics_version,
+    ).where(TrainingActivity.id == activity_id)
+    return (await session.execute(statement)).one()
+
+
+async def upload(client, headers, activity_id):
+    streams = {
+        "time": list(range(HOUR)),
+        "velocity_smooth": [1000 / 300] * HOUR,
+        "heartrate": [150] * (HOUR // 2) + [165] * (HOUR // 2),
+    }
+    return await client.put(f"/api/v1/training-activities/{activity_id}/streams", json=streams, headers=headers)
+
+
+async def test_metrics_are_stored_with_the_streams(session, async_client: AsyncClient, auth_headers, activity_id):
+    response = await upload(async_client, auth_headers, activity_id)
+    assert response.status_code == 200
+
+    zone_seconds, pace, stress, version = await stored_metrics(session, activity_id)
+    assert zone_seconds == [0, 0, 1800, 0, 1799]
+    assert pace == pytest.approx(300, abs=0.1)
+    assert stress == pytest.approx((157.5 / 160) ** 2 * 100, abs=0.5)
+    assert version == METRICS_VERSION
+
+
+async def test_new_thresholds_recompute_metrics(session, async_client: AsyncClient, auth_headers, activity_id):
+    await upload(async_client, auth_headers, activity_id)
+
+    thresholds = {"threshold_heartrate": 150, "threshold_pace": 300}
+    response = await async_client.put("/api/v1/users/me/thresholds", json=thresholds, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json() == thresholds
+    session.expire_all()
+    zone_seconds, _, stress, _ = await stored_metrics(session, activity_id)
+    assert zone_seconds == [0, 0, 0, 0, 3599]
+    assert stress == pytest.approx(100, abs=0.1)  # an hour at threshold pace
+
+    invalid = {"threshold_heartrate": 20}
+    invalid = await async_client.put("/api/v1/users/me/thresholds", json=invalid, headers=auth_headers)
+    assert invalid.status_code == 422
+
+
+async def test_cli_backfills_outdated_metrics(session, async_client: AsyncClient, auth_headers, activity_id, env_vars):
+    from tenflow.cli import compute_metrics
+
+    await upload(async_client, auth_headers, activity_id)
+    statement = update(TrainingActivity).where(TrainingActivity.id == activity_id)
+    await session.execute(statement.values(metrics_version=None, zone_seconds=None))
+    await session.commit()
+
+    assert await compute_metrics() >= 1
+    assert await compute_metrics() == 0
+
+    session.expire_all()
+    zone_seconds, _, _, version = await stored_metrics(session, activity_id)
+    assert zone_seconds == [0, 0, 1800, 0, 1799]
+    assert version == METRICS_VERSION
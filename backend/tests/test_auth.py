@@ -0,0 +1,57 @@
+import pytest
+from httpx import AsyncClient
+from uuid import uuid4
+
+from tenflow.core import security
+from tenflow.models import User
+
+
+@pytest.fixture
+async def test_user(session):
+    user = User(
+        email=f"testuser-{uuid4().hex[:8]}@example.com",
+        full_name="Test User",
+        hashed_password=security.get_password_hash("testpassword"),
+        is_active=True,
+    )
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+async def test_login_success(async_client: AsyncClient, test_user):
+    response = await async_client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user.email, "password": "testpassword"},
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["email"] == test_user.email
+    assert result["access_token"]
+
+    # The issued token is stored on the user and accepted by protected endpoints.
+    me = await async_client.get(
+        "/api/v1/users/me", headers={"Authorization": f"Bearer {result['access_token']}"}
+    )
+    assert me.status_code == 200
+    assert me.json()["access_token"] == result["access_token"]
+
+
+async def test_login_wrong_password(async_client: AsyncClient, test_user):
+    response = await async_client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user.email, "password": "wrong"},
+    )
+
+    assert response.status_code == 401
+
+
+async def test_login_unknown_user(async_client: AsyncClient):
+    response = await async_client.post(
+        "/api/v1/auth/login",
+        data={"username": "nobody@example.com", "password": "testpassword"},
+    )
+
+    assert response.status_code == 401
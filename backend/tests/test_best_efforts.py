@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+from datetime import UTC, datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from tenflow.models import PersonalRecord, TrainingActivity
+from tenflow.training.best_efforts import best_efforts, fastest, highest_average
+
+
+def run(seconds, speed=4.0, step=1):
+    time = np.arange(0, seconds + 1, step, dtype=float)
+    return time, time * speed
+
+
+# Sliding Window Tests
+
+def test_fastest_at_constant_speed():
+    time, distance = run(3000)
+
+    seconds, start, end = fastest(time, distance, 1000)
+
+    assert seconds == pytest.approx(250)
+    assert end - start == pytest.approx(250)
+
+
+def test_fastest_finds_the_surge():
+    time, _ = run(3600)
+    speed = np.where((time >= 1000) & (time < 1300), 5.0, 3.0)
+    distance = np.concatenate(([0.0], np.cumsum(speed[:-1])))
+
+    seconds, start, end = fastest(time, distance, 1000)
+
+    # 300 s at 5 m/s covers 1500 m, so 1 km fits inside the surge
+    assert seconds == pytest.approx(200)
+    assert 1000 <= start and end <= 1300
+
+
+def test_window_starts_are_interpolated_between_samples():
+    time, distance = run(3000, step=7)
+
+    assert fastest(time, distance, 1000)[0] == pytest.approx(250)
+
+
+def test_distance_steps_back():
+    time, distance = run(600)
+    distance[300] -= 50  # a GPS correction
+
+    seconds, _, _ = fastest(time, distance, 1000)
+
+    assert seconds >= 249
+
+
+def test_highest_average_heartrate():
+    time = np.arange(3601, dtype=float)
+    heartrate = np.where((time >= 2000) & (time < 3200), 170.0, 140.0)
+
+    average, start, end = highest_average(time, heartrate, 1200)
+
+    assert average == pytest.approx(170)
+    assert (start, end) == (2000, 3200)
+
+
+def test_efforts_longer_than_the_activity_are_skipped():
+    time, distance = run(1500)  # 6 km in 25 minutes
+    efforts = best_efforts({"time": time, "distance": distance, "heartrate": np.full(len(time), 150)})
+
+    assert set(efforts) == {"1k", "5k", "heartrate_20min"}
+    assert efforts["5k"].value == pytest.approx(1250)
+    assert efforts["heartrate_20min"].value == pytest.approx(150)
+    assert best_efforts({"distance": distance}) == {}
+
+
+def test_sweep_is_linear_in_samples():
+    # a 30-hour ultra at 1 Hz
+    time, distance = run(30 * 3600, speed=2.0)
+    efforts = best_efforts({"time": time, "distance": distance})
+
+    assert efforts["marathon"].value == pytest.approx(42195 / 2, abs=1)
+
+
+# Personal Record Tests
+
+@pytest.fixture
+async def activity_ids(session, test_user):
+    activities = [
+        TrainingActivity(
+            user=test_user,
+            name=f"Run {day}",
+            activity_type="Run",
+            actual_workout=None,
+            activity_data=None,
+            start_date=datetime(2026, 3, 2, 7, tzinfo=UTC) + timedelta(days=day),
+        )
+        for day in range(3)
+    ]
+    session.add_all(activities)
+    ids = [activity.id for activity in activities]
+    await session.commit()
+    return ids
+
+
+async def upload(client, headers, activity_id, speed, seconds=1500, heartrate=150):
+    time = list(range(seconds + 1))
+    streams = {"time": time, "distance": [t * speed for t in time], "heartrate": [heartrate] * len(time)}
+    response = await client.put(f"/api/v1/training-activities/{activity_id}/streams", json=streams, headers=headers)
+    assert response.status_code == 200
+
+
+async def records(client, headers):
+    response = await client.get("/api/v1/training-activities/records", headers=headers)
+    assert response.status_code == 200
+    return {record["effort"]: record for record in response.json()}
+
+
+async def test_records_follow_new_activities(async_client: AsyncClient, auth_headers, activity_ids):
+    slow, fast, slower = activity_ids
+    await upload(async_client, auth_headers, slow, speed=3.0, heartrate=160)
+    first = await records(async_client, auth_headers)
+    assert list(first) == ["1k", "heartrate_20min"]
+    assert first["1k"]["activity_id"] == str(slow)
+
+    await upload(async_client, auth_headers, fast, speed=4.0, heartrate=150)
+    await upload(async_client, auth_headers, slower, speed=2.5, heartrate=140)
+
+    best = await records(async_client, auth_headers)
+    assert list(best) == ["1k", "5k", "heartrate_20min"]
+    assert best["1k"]["activity_id"] == str(fast)
+    assert best["1k"]["value"] == pytest.approx(250)
+    assert best["5k"]["value"] == pytest.approx(1250)
+    assert best["heartrate_20min"]["activity_id"] == str(slow)
+    assert best["1k"]["achieved_at"].startswith("2026-03-03")
+
+
+async def test_record_falls_back_when_its_activity_gets_worse(async_client: AsyncClient, auth_headers, activity_ids):
+    first, second, _ = activity_ids
+    await upload(async_client, auth_headers, first, speed=3.0)
+    await upload(async_client, auth_headers, second, speed=4.0)
+
+    await upload(async_client, auth_headers, second, speed=2.0)
+
+    assert (await records(async_client, auth_headers))["1k"]["activity_id"] == str(first)
+
+
+async def test_deleting_the_record_activity(session, async_client: AsyncClient, auth_headers, activity_ids):
+    first, second, _ = activity_ids
+    await upload(async_client, auth_headers, first, speed=3.0)
+    await upload(async_client, auth_headers, second, speed=4.0)
+
+    await session.delete(await session.get(TrainingActivity, second))
+    await session.commit()
+
+    statement = select(PersonalRecord.effort, PersonalRecord.activity_id).where(
+        PersonalRecord.activity_id.in_(activity_ids)
+    )
+    assert dict((await session.execute(statement)).all()) == {"1k": first, "heartrate_20min": first}
+
+
+async def test_records_unauthorized(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/training-activities/records")
+    assert response.status_code == 401
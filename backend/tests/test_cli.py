@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from tenflow import cli
+
+
+def test_pool_budget_is_split_across_workers_and_engines():
+    pool_size, max_overflow = cli.split_pool_budget(80, workers=4)
+
+    # 4 workers x 2 engines x (pool_size + max_overflow) stays within the budget
+    assert (pool_size, max_overflow) == (5, 5)
+    assert 4 * cli.ENGINES_PER_WORKER * (pool_size + max_overflow) <= 80
+
+
+def test_pool_budget_too_small_for_workers():
+    with pytest.raises(ValueError, match="cannot give each of 8 workers"):
+        cli.split_pool_budget(10, workers=8)
+
+
+def test_workers_default_to_cpus(monkeypatch):
+    monkeypatch.setattr(cli.settings, "WEB_CONCURRENCY", 0)
+    monkeypatch.setattr(cli, "available_cpus", lambda: 6)
+    assert cli.default_workers() == 6
+
+    monkeypatch.setattr(cli.settings, "WEB_CONCURRENCY", 3)
+    assert cli.default_workers() == 3
+
+
+def test_serve_runs_uvicorn_with_fast_stack(monkeypatch):
+    import uvicorn
+
+    calls = []
+    monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: calls.append((app, kwargs)))
+    # serve writes these to os.environ; setenv first, so monkeypatch restores (or removes) them afterwards
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "")
+    monkeypatch.setenv("DATABASE_MAX_OVERFLOW", "")
+
+    cli.main(["serve", "--workers", "2", "--connection-budget", "20"])
+
+    app, kwargs = calls[0]
+    assert app == "tenflow.main:create_app"
+    assert kwargs["factory"] is True
+    assert kwargs["workers"] == 2
+    assert (kwargs["loop"], kwargs["http"]) == ("uvloop", "httptools")
+    assert (os.environ["DATABASE_POOL_SIZE"], os.environ["DATABASE_MAX_OVERFLOW"]) == ("2", "3")
+
+
+def test_prune_tombstones_defaults_to_retention():
+    args = cli.parse_args(["prune-tombstones"])
+    assert args.days == cli.settings.SYNC_TOMBSTONE_RETENTION_DAYS
+
+
+def test_compute_metrics_only_outdated_by_default():
+    assert cli.parse_args(["compute-metrics"]).all is False
+    assert cli.parse_args(["compute-metrics", "--all"]).all is True
@@ -0,0 +1,154 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from tenflow.core import compression
+from tenflow.core.compression import CompressionMiddleware, negotiate
+
+BIG_JSON = {"weeks": [{"week": i, "description": "Warm up 15 minutes, main set, cool down"} for i in range(200)]}
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/big")
+    def big():
+        return BIG_JSON
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse("x" * 5000, media_type="application/octet-stream")
+
+    @app.get("/fast", dependencies=[Depends(compression.compression(gzip=1))])
+    def fast():
+        return BIG_JSON
+
+    @app.get("/off", dependencies=[Depends(compression.compression(enabled=False))])
+    def off():
+        return BIG_JSON
+
+    @app.get("/etag")
+    def etag():
+        return PlainTextResponse("y" * 5000, headers={"ETag": '"abc"'})
+
+    @app.get("/stream")
+    def stream():
+        async def lines():
+            for i in range(3):
+                yield f'{{"line": {i}}}\n'
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://localhost") as client:
+        yield client
+
+
+def test_negotiate_prefers_zstd_then_brotli_then_gzip():
+    assert negotiate("gzip, br, zstd") == "zstd"
+    assert negotiate("gzip, br") == "br"
+    assert negotiate("gzip") == "gzip"
+    assert negotiate("br;q=0.5, gzip;q=0.9") == "gzip"
+    assert negotiate("*") == "zstd"
+    assert negotiate("identity") is None
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("") is None
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+async def test_large_json_is_compressed(client, encoding):
+    response = await client.get("/big", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == BIG_JSON
+
+
+async def test_small_and_unlisted_responses_are_not_compressed(client):
+    for path in ("/small", "/text"):
+        response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers, path
+
+    response = await client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+async def test_per_route_level(client, monkeypatch):
+    monkeypatch.setattr(compression.settings, "COMPRESSION_GZIP_LEVEL", 9)
+    off = await client.get("/off", headers={"Accept-Encoding": "gzip"})
+    default = await client.get("/big", headers={"Accept-Encoding": "gzip"})
+    fast = await client.get("/fast", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in off.headers
+    body = off.content
+    assert int(default.headers["content-length"]) == len(compression.compress("gzip", 9, body))
+    assert int(fast.headers["content-length"]) == len(compression.compress("gzip", 1, body))
+    assert fast.json() == BIG_JSON
+
+
+async def test_strong_etag_is_weakened(client):
+    response = await client.get("/etag", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"abc"'
+
+
+async def test_streaming_response_is_compressed_per_chunk(app):
+    chunks = []
+    finished = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            headers = dict(message["headers"])
+            assert headers[b"content-encoding"] == b"gzip"
+            assert b"content-length" not in headers
+        elif message["type"] == "http.response.body":
+            chunks.append(message["body"])
+            if not message.get("more_body"):
+                finished.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"accept-encoding", b"gzip")],
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+    await app(scope, receive, send)
+
+    # each chunk is flushed, so it can be decoded as soon as it arrives
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(chunks[0]) == b'{"line": 0}\n'
+    assert gzip.decompress(b"".join(chunks)) == b'{"line": 0}\n{"line": 1}\n{"line": 2}\n'
@@ -0,0 +1,234 @@
+import asyncio
+import pytest
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+
+from tenflow.core.cache import dashboard_cache
+from tenflow.models import ComplianceScore, PrescribedWorkout, TrainingActivity, TrainingPlan
+
+# a Wednesday, so the week runs Monday 2026-03-02 to Sunday 2026-03-08
+TODAY = date(2026, 3, 4)
+WEEK_START = date(2026, 3, 2)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    dashboard_cache.clear()
+    yield
+    dashboard_cache.clear()
+
+
+def make_plan(user, name, is_active=True):
+    return TrainingPlan(
+        user=user,
+        goal="Marathon",
+        plan_name=name,
+        start_date=WEEK_START,
+        end_date=WEEK_START + timedelta(weeks=12),
+        duration_weeks=12,
+        fitness_level="intermediate",
+        weekly_distance_base=Decimal("40.0"),
+        weekly_distance_peak=Decimal("70.0"),
+        training_days_per_week=5,
+        plan_data={"weeks": []},
+        is_active=is_active,
+    )
+
+
+@pytest.fixture
+async def dashboard_data(session, test_user):
+    """An active and an inactive plan, workouts in and around this week, activities and compliance."""
+    plan = make_plan(test_user, "Current Plan")
+    old_plan = make_plan(test_user, "Old Plan", is_active=False)
+    workouts = [
+        PrescribedWorkout(
+            user=test_user,
+            training_plan=plan,
+            workout_date=workout_date,
+            workout_time="morning",
+            workout_type="easy",
+            distance=Decimal("10.0"),
+            duration_minutes=60,
+            intensity_zone="z2",
+            rpe_target=3,
+            workout_description="Easy run",
+            is_completed=completed,
+        )
+        for workout_date, completed in [
+            (WEEK_START - timedelta(days=1), True),  # last week
+            (WEEK_START, True),
+            (TODAY, False),
+            (WEEK_START + timedelta(days=6), False),
+            (WEEK_START + timedelta(days=7), False),  # next week
+        ]
+    ]
+    activities = [
+        TrainingActivity(
+            user=test_user,
+            name=f"Run {i}",
+            activity_type="run",
+            actual_workout=None,
+            activity_data=None,
+            start_date=datetime(2026, 3, 1, 7, tzinfo=UTC) + timedelta(days=i),
+            prescribed_workout=workouts[1],
+        )
+        for i in range(3)
+    ]
+    scores = [
+        ComplianceScore(user=test_user, week_start=WEEK_START - timedelta(weeks=weeks), overall_compliance=Decimal("0.9"))
+        for weeks in range(6)
+    ]
+    session.add_all([plan, old_plan, *workouts, *activities, *scores])
+    created = {"plan": str(plan.id), "activities": [str(a.id) for a in activities]}
+    await session.commit()
+    return created
+
+
+@pytest.fixture
+async def small_read_only_pool(session, monkeypatch):
+    """A read-only pool of two connections that gives up quickly when exhausted."""
+    import tenflow.database as db
+    from tenflow.config import settings
+
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(settings, "DATABASE_POOL_TIMEOUT", 2)
+
+    async def reset():
+        if db.read_only_engine:
+            await db.read_only_engine.dispose()
+        db.read_only_engine = None
+        db.ReadOnlySession = None
+
+    await reset()
+    yield
+    await reset()
+
+
+# Dashboard Tests
+
+async def test_dashboard_returns_all_pieces(async_client: AsyncClient, auth_headers, dashboard_data, query_budget):
+    # the auth lookup and one statement for everything else
+    with query_budget(2):
+        response = await async_client.get(
+            "/api/v1/dashboard/", params={"today": str(TODAY), "recent": 2}, headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["user"]["full_name"] == "Test User"
+    assert result["active_plan"]["id"] == dashboard_data["plan"]
+    assert [w["workout_date"] for w in result["week_workouts"]] == ["2026-03-02", "2026-03-04", "2026-03-08"]
+    assert result["week"] == {
+        "week_start": "2026-03-02",
+        "workouts_prescribed": 3,
+        "workouts_completed": 1,
+        "distance_prescribed": "30.0",
+        "distance_completed": "10.0",
+    }
+    # most recent first
+    assert [a["id"] for a in result["recent_activities"]] == dashboard_data["activities"][:0:-1]
+    assert [c["week_start"] for c in result["compliance"]] == [
+        str(WEEK_START - timedelta(weeks=weeks)) for weeks in range(4)
+    ]
+
+
+async def test_dashboard_without_plan(async_client: AsyncClient, auth_headers):
+    response = await async_client.get("/api/v1/dashboard/", headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["active_plan"] is None
+    assert result["week_workouts"] == []
+    assert result["week"]["workouts_prescribed"] == 0
+
+
+async def test_dashboard_matches_the_stored_rows(async_client: AsyncClient, auth_headers, dashboard_data, session):
+    from sqlalchemy import select
+    from tenflow.models import ComplianceScoreRead, PrescribedWorkoutRead, TrainingActivityRead, TrainingPlanRead
+
+    response = await async_client.get("/api/v1/dashboard/", params={"today": str(TODAY)}, headers=auth_headers)
+    result = response.json()
+
+    def rendered(schema, rows):
+        return [schema.model_validate(row, from_attributes=True).model_dump(mode="json") for row in rows]
+
+    plan = await session.get(TrainingPlan, dashboard_data["plan"])
+    assert result["active_plan"] == rendered(TrainingPlanRead, [plan])[0]
+    workouts = (await session.execute(select(PrescribedWorkout).order_by(PrescribedWorkout.workout_date))).scalars()
+    assert result["week_workouts"] == rendered(PrescribedWorkoutRead, workouts)[1:4]
+    activities = (await session.execute(select(TrainingActivity).order_by(TrainingActivity.start_date.desc()))).scalars()
+    assert result["recent_activities"] == rendered(TrainingActivityRead, activities)
+    scores = (await session.execute(select(ComplianceScore).order_by(ComplianceScore.week_start.desc()))).scalars()
+    assert result["compliance"] == rendered(ComplianceScoreRead, scores)[:4]
+
+
+async def test_concurrent_dashboards_fit_in_a_small_pool(
+    async_client: AsyncClient, auth_headers, dashboard_data, small_read_only_pool
+):
+    # more requests than connections, each with its own parameters so none is served from the cache
+    responses = await asyncio.gather(*(
+        async_client.get("/api/v1/dashboard/", params={"today": str(TODAY), "recent": recent}, headers=auth_headers)
+        for recent in range(1, 7)
+    ))
+
+    assert [response.status_code for response in responses] == [200] * 6
+    assert [len(response.json()["recent_activities"]) for response in responses] == [1, 2, 3, 3, 3, 3]
+
+
+async def test_dashboard_unauthorized(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/dashboard/")
+    assert response.status_code == 401
+
+
+# Cache Tests
+
+async def test_dashboard_is_cached_per_user(async_client: AsyncClient, auth_headers, dashboard_data, query_budget):
+    params = {"today": str(TODAY)}
+    first = await async_client.get("/api/v1/dashboard/", params=params, headers=auth_headers)
+    assert first.headers["cache-control"].startswith("private, max-age=")
+
+    # only the auth lookup
+    with query_budget(1):
+        second = await async_client.get("/api/v1/dashboard/", params=params, headers=auth_headers)
+    assert second.content == first.content
+
+    # other parameters are not served from the entry
+    with query_budget(2):
+        await async_client.get("/api/v1/dashboard/", params={"today": str(TODAY), "recent": 1}, headers=auth_headers)
+
+
+async def test_plan_writes_invalidate_the_cache(async_client: AsyncClient, auth_headers, dashboard_data):
+    params = {"today": str(TODAY)}
+    await async_client.get("/api/v1/dashboard/", params=params, headers=auth_headers)
+
+    response = await async_client.put(
+        "/api/v1/training-plans/", json={"id": dashboard_data["plan"], "plan_name": "Renamed"}, headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    result = (await async_client.get("/api/v1/dashboard/", params=params, headers=auth_headers)).json()
+    assert result["active_plan"]["plan_name"] == "Renamed"
+
+
+def test_cache_expires_and_evicts(monkeypatch):
+    from tenflow.core import cache
+
+    clock = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: clock[0])
+    users = cache.UserCache(maxsize=2)
+
+    users.set("a", 1, "body-a", ttl=10)
+    assert users.get("a", 1) == "body-a"
+    assert users.get("a", 2) is None
+    clock[0] += 10
+    assert users.get("a", 1) is None
+
+    users.set("a", 1, "body-a", ttl=10)
+    users.set("b", 1, "body-b", ttl=10)
+    users.get("a", 1)
+    users.set("c", 1, "body-c", ttl=10)
+    # least recently used goes first
+    assert users.get("b", 1) is None
+    assert len(users) == 2
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from tenflow.core.sampling_profiler import SamplingProfiler
+
+
+@pytest.fixture
+async def superuser_headers(session, make_user, headers_for):
+    user = make_user(is_superuser=True)
+    session.add(user)
+    headers = headers_for(user.id)
+    await session.commit()
+    return headers
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_captures_busy_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.002, include_tasks=False)
+    profiler.start()
+    time.sleep(0.1)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    assert profiler.sample_count > 0
+    collapsed = profiler.collapsed()
+    assert any(line.startswith("thread:busy;") and "busy_loop" in line for line in collapsed.splitlines())
+
+    speedscope = profiler.speedscope()
+    profile = speedscope["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"]) == len(profiler.samples)
+    assert all(index < len(speedscope["shared"]["frames"]) for stack in profile["samples"] for index in stack)
+
+
+async def test_profile_endpoint_returns_collapsed_stacks(async_client: AsyncClient, superuser_headers):
+    response = await async_client.get(
+        "/api/v1/debug/profile?seconds=0.1&interval_ms=5", headers=superuser_headers
+    )
+
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    # The request handler itself is suspended in asyncio.sleep while sampling.
+    assert "task;" in response.text
+    assert "profile (tenflow/api/v1/endpoints/debug.py" in response.text
+
+
+async def test_profile_endpoint_speedscope(async_client: AsyncClient, superuser_headers):
+    response = await async_client.get(
+        "/api/v1/debug/profile?seconds=0.05&format=speedscope", headers=superuser_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["profiles"][0]["unit"] == "seconds"
+
+
+async def test_profile_endpoint_requires_superuser(async_client: AsyncClient, auth_headers):
+    response = await async_client.get("/api/v1/debug/profile?seconds=0.05", headers=auth_headers)
+
+    assert response.status_code == 400
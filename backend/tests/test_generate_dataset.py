@@ -0,0 +1,71 @@
+import importlib.util
+import pytest
+from datetime import date
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "generate_dataset.py"
+ANCHOR = date(2026, 1, 5)
+
+
+@pytest.fixture(scope="module")
+def generator():
+    spec = importlib.util.spec_from_file_location("generate_dataset", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def hashed_password(generator):
+    return generator.password_hash("password", 0)
+
+
+# Determinism Tests
+
+def test_same_arguments_same_rows(generator, hashed_password):
+    first = generator.generate_batch(0, 0, 5, ANCHOR, hashed_password)
+    second = generator.generate_batch(0, 0, 5, ANCHOR, hashed_password)
+
+    assert first.rows == second.rows
+    assert len(first.rows["users"]) == 5
+    assert first.rows["prescribed_workouts"]
+
+
+def test_rows_do_not_depend_on_batching(generator, hashed_password):
+    whole = generator.generate_batch(0, 0, 5, ANCHOR, hashed_password)
+    parts = [generator.generate_batch(0, first, count, ANCHOR, hashed_password) for first, count in [(0, 2), (2, 3)]]
+
+    for table, rows in whole.rows.items():
+        assert [row for part in parts for row in part.rows[table]] == rows
+
+
+def test_appended_users_are_new(generator, hashed_password):
+    existing = generator.generate_batch(0, 0, 5, ANCHOR, hashed_password)
+    # an offset that isn't a multiple of any batch size
+    appended = generator.generate_batch(0, 5, 3, ANCHOR, hashed_password)
+
+    ids = [row[0] for row in existing.rows["users"] + appended.rows["users"]]
+    assert len(set(ids)) == len(ids)
+
+
+def test_other_seed_other_rows(generator, hashed_password):
+    assert (
+        generator.generate_batch(0, 0, 2, ANCHOR, hashed_password).rows
+        != generator.generate_batch(1, 0, 2, ANCHOR, hashed_password).rows
+    )
+
+
+def test_rows_are_not_updated_before_they_are_created(generator, hashed_password):
+    batch = generator.generate_batch(0, 0, 5, ANCHOR, hashed_password)
+
+    for table, columns in generator.TABLES.items():
+        created, updated = columns.index("created_at"), columns.index("updated_at")
+        assert all(row[updated] >= row[created] for row in batch.rows[table]), table
+
+
+def test_password_hash_is_stable(generator, hashed_password):
+    from tenflow.core.security import verify_password
+
+    assert generator.password_hash("password", 0) == hashed_password
+    assert generator.password_hash("password", 1) != hashed_password
+    assert verify_password("password", hashed_password)
@@ -0,0 +1,99 @@
+import pytest
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from uuid import uuid4
+
+from tenflow.core import ids
+from tenflow.core.ids import uuid7, uuid7_time
+from tenflow.models import TrainingPlan
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freezes the clock ids.uuid7 reads at the returned millisecond, which tests can move."""
+    now = {"ms": 1_760_000_000_000}
+    monkeypatch.setattr(ids.time, "time_ns", lambda: now["ms"] * 1_000_000)
+    monkeypatch.setattr(ids, "_last_ms", 0)
+    monkeypatch.setattr(ids, "_last_tail", 0)
+    return now
+
+
+# UUIDv7 Tests
+
+def test_layout(clock):
+    key = uuid7()
+
+    assert key.version == 7
+    assert key.variant == "specified in RFC 4122"
+    assert key.int >> 80 == clock["ms"]
+    assert uuid7_time(key) == datetime.fromtimestamp(clock["ms"] / 1000, UTC)
+
+
+def test_ordered_within_a_millisecond(clock):
+    keys = [uuid7() for _ in range(1000)]
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert {key.int >> 80 for key in keys} == {clock["ms"]}
+
+
+def test_ordered_when_the_clock_steps_back(clock):
+    first = uuid7()
+    clock["ms"] -= 5000
+
+    second = uuid7()
+
+    assert second > first
+    assert second.version == 7
+
+
+def test_counter_overflow_moves_to_the_next_millisecond(clock, monkeypatch):
+    first = uuid7()
+    monkeypatch.setattr(ids, "_last_tail", (1 << 74) - 1)
+
+    second = uuid7()
+
+    assert second > first
+    assert second.int >> 80 == clock["ms"] + 1
+
+
+def test_sorts_by_time():
+    keys = [uuid7() for _ in range(100)]
+
+    assert keys == sorted(keys)
+    assert keys == sorted(keys, key=str)
+
+
+def test_time_of_other_versions():
+    assert uuid7_time(uuid4()) is None
+
+
+# Primary Key Tests
+
+async def test_new_rows_get_uuid7_alongside_uuid4_keys(session, make_user):
+    user_id = uuid4()
+    user = make_user("keys", id=user_id)
+    plans = [
+        TrainingPlan(
+            user=user,
+            goal="10K",
+            plan_name=f"Plan {number}",
+            start_date=date(2026, 3, 2),
+            end_date=date(2026, 3, 30),
+            duration_weeks=4,
+            fitness_level="beginner",
+            weekly_distance_base=Decimal("20.0"),
+            weekly_distance_peak=Decimal("30.0"),
+            training_days_per_week=3,
+            plan_data=None,
+        )
+        for number in range(3)
+    ]
+    session.add_all(plans)
+    plan_ids = [plan.id for plan in plans]
+    await session.commit()
+
+    assert {plan_id.version for plan_id in plan_ids} == {7}
+    statement = select(TrainingPlan.plan_name).where(TrainingPlan.user_id == user_id).order_by(TrainingPlan.id)
+    assert list((await session.execute(statement)).scalars()) == ["Plan 0", "Plan 1", "Plan 2"]
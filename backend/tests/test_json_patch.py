@@ -0,0 +1,217 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select
+from uuid import uuid4
+
+from tenflow.core.json_patch import parse_patch, parse_pointer
+from tenflow.models import PrescribedWorkout, TrainingPlan
+
+PATCH = "application/json-patch+json"
+DOCUMENT = {"weeks": [{"week": 1, "distance": 50}, {"week": 2, "distance": 55}], "notes": {"a/b": 1, "m~n": 2}}
+
+
+# Patch Parsing Tests
+
+def test_pointers():
+    assert parse_pointer("") == ()
+    assert parse_pointer("/weeks/0/distance") == ("weeks", "0", "distance")
+    assert parse_pointer("/notes/a~1b") == ("notes", "a/b")
+    assert parse_pointer("/notes/m~0n") == ("notes", "m~n")
+
+
+@pytest.mark.parametrize(
+    "patch",
+    [
+        [{"op": "merge", "path": "/a"}],
+        [{"op": "add", "path": "/a"}],
+        [{"op": "add", "path": "a", "value": 1}],
+        [{"op": "copy", "path": "/a"}],
+        [{"op": "move", "from": "/a", "path": "/a/b"}],
+        [{"op": "remove", "path": ""}],
+    ],
+)
+def test_malformed_patches(patch):
+    with pytest.raises(ValueError):
+        parse_patch(patch)
+
+
+# Plan Data Patch Tests
+
+@pytest.fixture
+async def plan(session, test_user):
+    """A plan with DOCUMENT as its plan_data and one workout; returns their ids."""
+    training_plan = TrainingPlan(
+        user=test_user,
+        goal="Marathon",
+        plan_name="Patch Plan",
+        start_date=date(2026, 3, 2),
+        end_date=date(2026, 3, 2) + timedelta(weeks=16),
+        duration_weeks=16,
+        fitness_level="intermediate",
+        weekly_distance_base=Decimal("50.0"),
+        weekly_distance_peak=Decimal("80.0"),
+        training_days_per_week=5,
+        plan_data=DOCUMENT,
+    )
+    workout = PrescribedWorkout(
+        user=test_user,
+        training_plan=training_plan,
+        workout_date=date(2026, 3, 2),
+        workout_time="morning",
+        workout_type="easy",
+        distance=Decimal("8.0"),
+        duration_minutes=None,
+        intensity_zone=None,
+        rpe_target=None,
+        workout_description=None,
+    )
+    session.add_all([training_plan, workout])
+    ids = {"plan": training_plan.id, "workout": workout.id}
+    await session.commit()
+    return ids
+
+
+async def plan_data(session, plan_id):
+    session.expire_all()
+    return (await session.execute(select(TrainingPlan.plan_data).where(TrainingPlan.id == plan_id))).scalar_one()
+
+
+def patch_plan(async_client, plan, patch, headers):
+    return async_client.patch(
+        f"/api/v1/training-plans/{plan['plan']}/plan-data",
+        json=patch,
+        headers={**headers, "Content-Type": PATCH},
+    )
+
+
+@pytest.mark.parametrize(
+    "patch, expected",
+    [
+        (
+            [{"op": "replace", "path": "/weeks/1/distance", "value": 60}],
+            {**DOCUMENT, "weeks": [{"week": 1, "distance": 50}, {"week": 2, "distance": 60}]},
+        ),
+        (
+            [{"op": "add", "path": "/weeks/-", "value": {"week": 3}}],
+            {**DOCUMENT, "weeks": [*DOCUMENT["weeks"], {"week": 3}]},
+        ),
+        (
+            [{"op": "add", "path": "/weeks/0", "value": {"week": 0}}],
+            {**DOCUMENT, "weeks": [{"week": 0}, *DOCUMENT["weeks"]]},
+        ),
+        ([{"op": "add", "path": "/goal", "value": None}], {**DOCUMENT, "goal": None}),
+        ([{"op": "add", "path": "/notes/a~1b", "value": [1, 2]}], {**DOCUMENT, "notes": {"a/b": [1, 2], "m~n": 2}}),
+        ([{"op": "remove", "path": "/weeks/0"}], {**DOCUMENT, "weeks": [{"week": 2, "distance": 55}]}),
+        (
+            [{"op": "move", "from": "/notes/m~0n", "path": "/moved"}],
+            {**DOCUMENT, "notes": {"a/b": 1}, "moved": 2},
+        ),
+        (
+            [{"op": "move", "from": "/weeks/0", "path": "/weeks/-"}],
+            {**DOCUMENT, "weeks": [{"week": 2, "distance": 55}, {"week": 1, "distance": 50}]},
+        ),
+        ([{"op": "copy", "from": "/weeks/0", "path": "/first"}], {**DOCUMENT, "first": {"week": 1, "distance": 50}}),
+        (
+            [
+                {"op": "test", "path": "/weeks/0/distance", "value": 50},
+                {"op": "replace", "path": "/weeks/0/distance", "value": 52},
+            ],
+            {**DOCUMENT, "weeks": [{"week": 1, "distance": 52}, {"week": 2, "distance": 55}]},
+        ),
+        ([{"op": "replace", "path": "", "value": {"weeks": []}}], {"weeks": []}),
+    ],
+)
+async def test_patch_plan_data(session, async_client: AsyncClient, auth_headers, plan, patch, expected):
+    response = await patch_plan(async_client, plan, patch, auth_headers)
+
+    assert response.status_code == 204
+    assert response.headers["ETag"]
+    assert await plan_data(session, plan["plan"]) == expected
+
+
+@pytest.mark.parametrize(
+    "patch",
+    [
+        [{"op": "test", "path": "/weeks/0/distance", "value": 51}],
+        [{"op": "replace", "path": "/missing", "value": 1}],
+        [{"op": "remove", "path": "/weeks/5"}],
+        [{"op": "remove", "path": "/weeks/-1"}],
+        [{"op": "add", "path": "/weeks/3", "value": {}}],
+        [{"op": "add", "path": "/missing/key", "value": 1}],
+        [{"op": "add", "path": "/weeks/0/distance/x", "value": 1}],
+        [{"op": "move", "from": "/missing", "path": "/x"}],
+        # the first operation applies on its own, but the patch applies as a whole or not at all
+        [{"op": "remove", "path": "/notes"}, {"op": "remove", "path": "/notes/a~1b"}],
+    ],
+)
+async def test_patch_that_does_not_apply(session, async_client: AsyncClient, auth_headers, plan, patch):
+    response = await patch_plan(async_client, plan, patch, auth_headers)
+
+    assert response.status_code == 409
+    assert f"operation {len(patch) - 1}" in response.json()["detail"]
+    assert await plan_data(session, plan["plan"]) == DOCUMENT
+
+
+async def test_patch_if_match(session, async_client: AsyncClient, auth_headers, plan):
+    read = await async_client.get(f"/api/v1/training-plans/{plan['plan']}", headers=auth_headers)
+    etag = read.headers["ETag"]
+    patch = [{"op": "replace", "path": "/notes", "value": {}}]
+
+    first = await patch_plan(async_client, plan, patch, {**auth_headers, "If-Match": etag})
+    second = await patch_plan(async_client, plan, patch, {**auth_headers, "If-Match": etag})
+
+    assert first.status_code == 204
+    assert first.headers["ETag"] != etag
+    assert second.status_code == 412
+    again = await async_client.get(f"/api/v1/training-plans/{plan['plan']}", headers=auth_headers)
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+
+async def test_patch_malformed(async_client: AsyncClient, auth_headers, plan):
+    response = await patch_plan(async_client, plan, [{"op": "add", "path": "weeks"}], auth_headers)
+    assert response.status_code == 422
+
+
+async def test_patch_other_users_plan(session, async_client: AsyncClient, plan, make_user, headers_for):
+    other = make_user("other")
+    session.add(other)
+    headers = headers_for(other.id)
+    await session.commit()
+
+    response = await patch_plan(async_client, plan, [{"op": "remove", "path": "/notes"}], headers)
+
+    assert response.status_code == 403
+    assert await plan_data(session, plan["plan"]) == DOCUMENT
+
+
+async def test_patch_plan_not_found(async_client: AsyncClient, auth_headers):
+    response = await patch_plan(async_client, {"plan": uuid4()}, [], auth_headers)
+    assert response.status_code == 404
+
+
+# Workout Data Patch Tests
+
+async def test_patch_workout_data(session, async_client: AsyncClient, auth_headers, plan):
+    url = f"/api/v1/prescribed-workouts/{plan['workout']}/workout-data"
+    headers = {**auth_headers, "Content-Type": PATCH}
+
+    created = await async_client.patch(url, json=[{"op": "add", "path": "", "value": {"laps": []}}], headers=headers)
+    appended = await async_client.patch(
+        url, json=[{"op": "add", "path": "/laps/-", "value": {"km": 1, "pace": 300}}], headers=headers
+    )
+
+    assert created.status_code == 204 and appended.status_code == 204
+    session.expire_all()
+    statement = select(PrescribedWorkout.workout_data).where(PrescribedWorkout.id == plan["workout"])
+    assert (await session.execute(statement)).scalar_one() == {"laps": [{"km": 1, "pace": 300}]}
+
+
+async def test_patch_missing_workout_data(async_client: AsyncClient, auth_headers, plan):
+    response = await async_client.patch(
+        f"/api/v1/prescribed-workouts/{plan['workout']}/workout-data",
+        json=[{"op": "add", "path": "/laps", "value": []}],
+        headers={**auth_headers, "Content-Type": PATCH},
+    )
+    assert response.status_code == 409
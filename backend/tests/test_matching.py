@@ -0,0 +1,216 @@
+import pytest
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select
+from uuid import uuid4
+
+from tenflow.models import PrescribedWorkout, TrainingActivity, TrainingPlan
+from tenflow.training import matching
+from tenflow.training.matching import ActivityRecord, WorkoutIndex, WorkoutSlot, match
+
+MONDAY = date(2026, 3, 2)
+
+
+def slot(day, time="morning", workout_type="easy", distance=10.0):
+    return WorkoutSlot(uuid4(), MONDAY + timedelta(days=day), time, workout_type, distance)
+
+
+def record(day, hour=7, activity_type="Run", distance=10.0, workout_type=None):
+    start = datetime.combine(MONDAY + timedelta(days=day), datetime.min.time()) + timedelta(hours=hour)
+    return ActivityRecord(uuid4(), start, activity_type, distance, workout_type)
+
+
+def pairs(result):
+    return {(m.activity_id, m.workout_id) for m in result.matched}
+
+
+# Matching Engine Tests
+
+def test_matches_by_time_of_day_and_distance():
+    morning, afternoon = slot(0, "morning", "easy", 8.0), slot(0, "afternoon", "tempo", 12.0)
+    early, late = record(0, hour=6, distance=8.2), record(0, hour=18, distance=11.5)
+
+    result = match([late, early], [afternoon, morning])
+
+    assert pairs(result) == {(early.id, morning.id), (late.id, afternoon.id)}
+    assert result.unmatched == []
+
+
+def test_day_late_activity_matches_when_nothing_closer():
+    workout = slot(2)
+    activity = record(3)
+
+    result = match([activity], [workout])
+
+    assert pairs(result) == {(activity.id, workout.id)}
+    assert 0.5 <= result.matched[0].score < 1
+
+
+def test_unmatched_activities_are_reported():
+    workouts = [slot(0, workout_type="easy"), slot(4)]
+    ride = record(0, activity_type="Ride")
+    far_off = record(2, hour=18, distance=3.0)  # two days from any workout
+    short = record(5, hour=18, distance=2.0)  # a day late, wrong time of day and a fifth of the distance
+
+    result = match([ride, far_off, short], workouts)
+
+    assert result.matched == []
+    assert result.unmatched == [ride.id, far_off.id, short.id]
+
+
+def test_cross_training_types():
+    ride_workout = slot(0, workout_type="ride", distance=30.0)
+    ride = record(0, activity_type="VirtualRide", distance=28.0)
+    run = record(0, hour=8, distance=30.0)
+
+    result = match([ride, run], [ride_workout])
+
+    assert pairs(result) == {(ride.id, ride_workout.id)}
+    assert result.unmatched == [run.id]
+
+
+def test_each_workout_takes_one_activity():
+    workout = slot(1, distance=10.0)
+    close, further = record(1, distance=9.8), record(1, hour=9, distance=6.0)
+
+    result = match([further, close], [workout])
+
+    assert pairs(result) == {(close.id, workout.id)}
+    assert result.unmatched == [further.id]
+
+
+def test_recorded_workout_type_breaks_ties():
+    easy, recovery = slot(0, workout_type="easy", distance=6.0), slot(0, workout_type="recovery", distance=6.0)
+    activity = record(0, distance=6.0, workout_type="recovery")
+
+    assert pairs(match([activity], [easy, recovery])) == {(activity.id, recovery.id)}
+
+
+def test_index_returns_workouts_within_tolerance():
+    workouts = [slot(day) for day in range(10)]
+    index = WorkoutIndex(reversed(workouts))
+
+    assert index.candidates(MONDAY + timedelta(days=5)) == workouts[4:7]
+    assert index.candidates(MONDAY - timedelta(days=1)) == workouts[:1]
+    assert index.candidates(MONDAY + timedelta(days=20)) == []
+
+
+def test_backfill_scores_only_nearby_workouts(monkeypatch):
+    days = 3000
+    workouts = [slot(day, distance=5 + day % 10) for day in range(days)]
+    activities = [record(day, distance=5 + day % 10) for day in range(days)]
+    calls = 0
+    score = matching.score
+
+    def counting_score(activity, workout):
+        nonlocal calls
+        calls += 1
+        return score(activity, workout)
+
+    monkeypatch.setattr(matching, "score", counting_score)
+    result = match(activities, workouts)
+
+    same_day = {(activity.id, workout.id) for activity, workout in zip(activities, workouts, strict=True)}
+    assert pairs(result) == same_day
+    # each activity is compared with the workouts a day either side, not with all of them
+    assert calls <= 3 * days
+
+
+# Match Endpoint Tests
+
+@pytest.fixture
+async def imported(session, test_user):
+    """A week of prescriptions and freshly imported, unmatched activities."""
+    plan = TrainingPlan(
+        user=test_user,
+        goal="10K",
+        plan_name="Matching Plan",
+        start_date=MONDAY,
+        end_date=MONDAY + timedelta(weeks=4),
+        duration_weeks=4,
+        fitness_level="beginner",
+        weekly_distance_base=Decimal("20.0"),
+        weekly_distance_peak=Decimal("30.0"),
+        training_days_per_week=3,
+        plan_data={"weeks": []},
+    )
+    workouts = {
+        name: PrescribedWorkout(
+            user=test_user,
+            training_plan=plan,
+            workout_date=MONDAY + timedelta(days=day),
+            workout_time=time,
+            workout_type=name,
+            distance=Decimal(distance),
+            duration_minutes=None,
+            intensity_zone=None,
+            rpe_target=None,
+            workout_description=None,
+        )
+        for name, day, time, distance in [("easy", 0, "morning", "6.0"), ("tempo", 2, "afternoon", "8.0")]
+    }
+
+    def activity(name, start, activity_type="Run", distance="6.0", start_local=None):
+        return TrainingActivity(
+            user=test_user,
+            name=name,
+            activity_type=activity_type,
+            actual_workout=None,
+            activity_data={"start_date_local": start_local} if start_local else None,
+            start_date=start,
+            distance=Decimal(distance),
+        )
+
+    activities = {
+        "easy": activity("Easy", datetime(2026, 3, 2, 6, 30, tzinfo=UTC), distance="6.2"),
+        # Thursday 01:30 in UTC, but Wednesday evening where the runner (UTC-6) was
+        "tempo": activity(
+            "Tempo", datetime(2026, 3, 5, 1, 30, tzinfo=UTC), distance="7.9", start_local="2026-03-04T19:30:00Z"
+        ),
+        "swim": activity("Swim", datetime(2026, 3, 3, 7, tzinfo=UTC), activity_type="Swim", distance="1.5"),
+    }
+    session.add_all([plan, *workouts.values(), *activities.values()])
+    ids = {
+        "workouts": {name: workout.id for name, workout in workouts.items()},
+        "activities": {name: activity.id for name, activity in activities.items()},
+    }
+    await session.commit()
+    return ids
+
+
+async def test_match_endpoint(session, async_client: AsyncClient, auth_headers, imported):
+    activities, workouts = imported["activities"], imported["workouts"]
+
+    response = await async_client.post("/api/v1/training-activities/match", headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert {(m["activity_id"], m["workout_id"]) for m in result["matched"]} == {
+        (str(activities["easy"]), str(workouts["easy"])),
+        (str(activities["tempo"]), str(workouts["tempo"])),
+    }
+    assert result["unmatched"] == [str(activities["swim"])]
+
+    completed = await session.execute(select(PrescribedWorkout.id).where(PrescribedWorkout.is_completed.is_(True)))
+    assert set(completed.scalars()) == set(workouts.values())
+    linked = await session.execute(
+        select(TrainingActivity.prescribed_workout_id).where(TrainingActivity.id == activities["easy"])
+    )
+    assert linked.scalar_one() == workouts["easy"]
+
+    unmatched = await async_client.get("/api/v1/training-activities/unmatched", headers=auth_headers)
+    assert [a["id"] for a in unmatched.json()] == [str(activities["swim"])]
+
+
+async def test_matching_again_leaves_matched_activities_alone(async_client: AsyncClient, auth_headers, imported):
+    await async_client.post("/api/v1/training-activities/match", headers=auth_headers)
+
+    response = await async_client.post("/api/v1/training-activities/match", headers=auth_headers)
+
+    assert response.json() == {"matched": [], "unmatched": [str(imported["activities"]["swim"])]}
+
+
+async def test_match_unauthorized(async_client: AsyncClient):
+    response = await async_client.post("/api/v1/training-activities/match")
+    assert response.status_code == 401
@@ -0,0 +1,66 @@
+import os
+from httpx import AsyncClient
+
+from tenflow.core.metrics import Histogram, db_queries_total, http_request_queries
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_latency_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.1, route="/a")
+    histogram.observe(5.0, route="/a")
+
+    rendered = histogram.render()
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 2' in rendered
+    assert 'test_latency_seconds_bucket{route="/a",le="1"} 2' in rendered
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in rendered
+    assert 'test_latency_seconds_count{route="/a"} 3' in rendered
+
+
+async def test_metrics_endpoint_exposes_route_latency(async_client: AsyncClient):
+    await async_client.get("/health")
+
+    response = await async_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE tenflow_http_request_duration_seconds histogram" in body
+    assert 'tenflow_http_request_duration_seconds_count{method="GET",route="/health"}' in body
+    assert 'tenflow_http_requests_total{method="GET",route="/health",status="200"}' in body
+    assert "tenflow_http_requests_in_flight" in body
+
+
+async def test_metrics_report_queries_and_pool_stats(async_client: AsyncClient, auth_headers):
+    labels = {"method": "GET", "route": "/api/v1/training-plans/"}
+    queries_before = db_queries_total.value(engine="read_only") + db_queries_total.value(engine="primary")
+    observed_before = http_request_queries.count(**labels)
+
+    response = await async_client.get("/api/v1/training-plans/", headers=auth_headers)
+    assert response.status_code == 200
+
+    # The auth lookup and the listing itself both hit the database.
+    queries_after = db_queries_total.value(engine="read_only") + db_queries_total.value(engine="primary")
+    assert queries_after - queries_before >= 2
+    assert http_request_queries.count(**labels) == observed_before + 1
+
+    body = (await async_client.get("/metrics")).text
+    assert 'tenflow_http_request_queries_count{method="GET",route="/api/v1/training-plans/"}' in body
+    assert 'tenflow_http_request_rows_sum{method="GET",route="/api/v1/training-plans/"}' in body
+    assert 'tenflow_db_pool_checked_out{engine="primary"}' in body
+    assert 'tenflow_db_pool_overflow{engine="read_only"}' in body
+    assert 'tenflow_db_pool_checkouts_total{engine="read_only"}' in body
+
+
+async def test_worker_health_reports_this_process(async_client: AsyncClient, auth_headers):
+    await async_client.get("/api/v1/users/me", headers=auth_headers)
+
+    response = await async_client.get("/health/worker")
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["status"] == "healthy"
+    assert result["pid"] == os.getpid()
+    assert result["requests_served"] >= 1
+    assert result["requests_in_flight"] >= 1  # this request
+    assert "read_only" in result["db_pools"]
@@ -0,0 +1,127 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from uuid import UUID
+
+from tenflow.models import TrainingPlan
+
+START = date(2026, 3, 2)
+
+
+def make_plan(user, name, goal_race, surface, phases, race_date):
+    return TrainingPlan(
+        user=user,
+        goal=goal_race,
+        plan_name=name,
+        start_date=START,
+        end_date=race_date,
+        duration_weeks=12,
+        fitness_level="intermediate",
+        weekly_distance_base=Decimal("40.0"),
+        weekly_distance_peak=Decimal("60.0"),
+        training_days_per_week=4,
+        plan_data={
+            "goal_race": goal_race,
+            "race_date": race_date.isoformat(),
+            "surface": surface,
+            "phases": phases,
+            "weeks": [{"week": 1, "phase": phases[0], "surface": "other"}],
+        },
+    )
+
+
+@pytest.fixture
+async def users(session, make_user, headers_for):
+    """A runner with four plans (one without plan_data), another with one, and an admin; returns ids and headers."""
+    runner, other, admin = make_user("runner"), make_user("other"), make_user("admin", is_superuser=True)
+    plans = {
+        "boston": make_plan(runner, "Boston", "Marathon", "road", ["base", "build", "taper"], date(2026, 4, 20)),
+        "ultra": make_plan(runner, "Ultra", "50K", "trail", ["base", "build"], date(2026, 6, 6)),
+        "ten_k": make_plan(runner, "10K", "10K", "road", ["speed"], date(2026, 5, 1)),
+        "other": make_plan(other, "Other", "Marathon", "road", ["base", "taper"], date(2026, 5, 10)),
+        "blank": make_plan(runner, "Blank", "Marathon", "road", ["base"], date(2026, 5, 10)),
+    }
+    plans["blank"].plan_data = None
+    session.add_all([runner, other, admin, *plans.values()])
+    ids = {
+        "runner": runner.id,
+        "other": other.id,
+        "plans": {name: plan.id for name, plan in plans.items()},
+        "headers": {
+            name: headers_for(user.id)
+            for name, user in [("runner", runner), ("other", other), ("admin", admin)]
+        },
+    }
+    await session.commit()
+    return ids
+
+
+async def search(async_client, users, who, **params):
+    response = await async_client.get("/api/v1/training-plans/search", params=params, headers=users["headers"][who])
+    assert response.status_code == 200, response.text
+    names = {plan_id: name for name, plan_id in users["plans"].items()}
+    return {names[UUID(plan["id"])] for plan in response.json()}
+
+
+# Plan Search Tests
+
+async def test_search_own_plans(async_client: AsyncClient, users):
+    assert await search(async_client, users, "runner", goal_race="Marathon") == {"boston"}
+    assert await search(async_client, users, "runner", surface="road") == {"boston", "ten_k"}
+    assert await search(async_client, users, "runner", phase="build") == {"boston", "ultra"}
+    assert await search(async_client, users, "runner", surface="road", phase="taper") == {"boston"}
+    # week-level attributes don't count
+    assert await search(async_client, users, "runner", surface="other") == set()
+
+
+async def test_search_race_dates(async_client: AsyncClient, users):
+    assert await search(async_client, users, "runner", race_from="2026-05-01") == {"ultra", "ten_k"}
+    assert await search(async_client, users, "runner", race_from="2026-04-01", race_to="2026-05-01") == {
+        "boston",
+        "ten_k",
+    }
+
+
+async def test_admin_searches_everyone(async_client: AsyncClient, users):
+    assert await search(async_client, users, "admin", goal_race="Marathon") == {"boston", "other"}
+    assert await search(async_client, users, "admin", goal_race="Marathon", user_id=str(users["other"])) == {
+        "other"
+    }
+
+
+async def test_search_needs_a_filter(async_client: AsyncClient, users):
+    response = await async_client.get("/api/v1/training-plans/search", headers=users["headers"]["runner"])
+    assert response.status_code == 400
+
+
+async def test_search_other_users_plans(async_client: AsyncClient, users):
+    response = await async_client.get(
+        "/api/v1/training-plans/search",
+        params={"goal_race": "Marathon", "user_id": str(users["other"])},
+        headers=users["headers"]["runner"],
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        (("Marathon", None, None, None, None), "ix_training_plans_plan_attributes"),
+        ((None, "trail", "build", None, None), "ix_training_plans_plan_attributes"),
+        ((None, None, None, date(2026, 5, 1), date(2026, 6, 1)), "ix_training_plans_race_date"),
+    ],
+)
+async def test_filters_use_indexes(session, users, filters, index):
+    from tenflow.api.v1.endpoints.training_plans import plan_data_filters
+
+    statement = select(TrainingPlan.id).where(*plan_data_filters(*filters))
+    sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    # a handful of rows would be scanned anyway; the question is whether the index can serve the filter
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join((await session.execute(text(f"EXPLAIN {sql}"))).scalars())
+    await session.rollback()
+
+    assert index in plan
@@ -0,0 +1,148 @@
+import json
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+
+from tenflow.models import PrescribedWorkout, TrainingPlan
+
+START = date(2026, 1, 5)
+ZONES = ["z1", "z2", "z3", "z4", "z5"]
+
+
+def make_plan(user, weeks):
+    return TrainingPlan(
+        user=user,
+        goal="Ultra",
+        plan_name="40-Week Ultra Plan",
+        start_date=START,
+        end_date=START + timedelta(weeks=weeks),
+        duration_weeks=weeks,
+        fitness_level="advanced",
+        weekly_distance_base=Decimal("60.0"),
+        weekly_distance_peak=Decimal("120.0"),
+        training_days_per_week=7,
+        plan_data={"weeks": []},
+    )
+
+
+def make_workouts(user, plan, days):
+    # one workout a day, cycling through the zones; every third one completed
+    return [
+        PrescribedWorkout(
+            user=user,
+            training_plan=plan,
+            workout_date=START + timedelta(days=day),
+            workout_time="morning",
+            workout_type="run",
+            distance=Decimal("10.0"),
+            duration_minutes=60,
+            intensity_zone=ZONES[day % 5],
+            rpe_target=4,
+            workout_description=f"Day {day}",
+            is_completed=day % 3 == 0,
+        )
+        for day in range(days)
+    ]
+
+
+@pytest.fixture
+async def test_user(session, make_user):
+    """A user with one workout a day for 40 weeks, and another user with their own workouts."""
+    user = make_user("calendar")
+    plan = make_plan(user, 40)
+    other = make_user("other")
+    other_plan = make_plan(other, 4)
+    session.add_all([user, plan, *make_workouts(user, plan, 280)])
+    session.add_all([other, other_plan, *make_workouts(other, other_plan, 28)])
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+async def get_workouts(client, headers, **params):
+    return await client.get("/api/v1/prescribed-workouts/", params=params, headers=headers)
+
+
+# Range Query Tests
+
+async def test_date_range_is_inclusive_and_ordered(async_client: AsyncClient, auth_headers, query_budget):
+    window = {"from": str(START + timedelta(days=7)), "to": str(START + timedelta(days=13))}
+    with query_budget(2):
+        response = await get_workouts(async_client, auth_headers, **window)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    workouts = response.json()
+    assert [w["workout_date"] for w in workouts] == [str(START + timedelta(days=day)) for day in range(7, 14)]
+
+
+async def test_only_the_current_users_workouts(async_client: AsyncClient, test_user, auth_headers):
+    user_id = str(test_user.id)
+    window = {"from": str(START), "to": str(START + timedelta(days=27))}
+    response = await get_workouts(async_client, auth_headers, **window)
+
+    workouts = response.json()
+    assert len(workouts) == 28
+    assert {w["user_id"] for w in workouts} == {user_id}
+
+
+async def test_filters(async_client: AsyncClient, auth_headers):
+    window = {"from": str(START), "to": str(START + timedelta(days=29))}
+
+    zones = (await get_workouts(async_client, auth_headers, intensity_zone=["z4", "z5"], **window)).json()
+    assert len(zones) == 12
+    assert {w["intensity_zone"] for w in zones} == {"z4", "z5"}
+
+    completed = (await get_workouts(async_client, auth_headers, is_completed=True, **window)).json()
+    assert len(completed) == 10
+    assert all(w["is_completed"] for w in completed)
+
+    both = (await get_workouts(async_client, auth_headers, intensity_zone="z1", is_completed=False, **window)).json()
+    assert [w["workout_description"] for w in both] == ["Day 5", "Day 10", "Day 20", "Day 25"]
+
+
+async def test_empty_and_invalid_ranges(async_client: AsyncClient, auth_headers):
+    empty = await get_workouts(async_client, auth_headers, **{"from": "2030-01-01", "to": "2030-12-31"})
+    assert empty.status_code == 200
+    assert empty.json() == []
+
+    backwards = {"from": str(START), "to": str(START - timedelta(days=1))}
+    backwards = await get_workouts(async_client, auth_headers, **backwards)
+    assert backwards.status_code == 400
+
+    missing = await get_workouts(async_client, auth_headers, **{"from": str(START)})
+    assert missing.status_code == 422
+
+    zone = await get_workouts(async_client, auth_headers, intensity_zone="z9", **{"from": str(START), "to": str(START)})
+    assert zone.status_code == 422
+
+
+async def test_unauthorized(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/prescribed-workouts/", params={"from": str(START), "to": str(START)})
+    assert response.status_code == 401
+
+
+# Streaming Tests
+
+async def test_ndjson(async_client: AsyncClient, auth_headers):
+    headers = {**auth_headers, "Accept": "application/x-ndjson"}
+    response = await get_workouts(async_client, headers, **{"from": str(START), "to": str(START + timedelta(days=2))})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["workout_description"] for line in lines] == ["Day 0", "Day 1", "Day 2"]
+
+
+async def test_large_range_is_streamed_in_chunks(session, test_user, monkeypatch):
+    from tenflow.api.v1.endpoints import prescribed_workouts
+
+    monkeypatch.setattr(prescribed_workouts, "CHUNK_ROWS", 50)
+    statement = prescribed_workouts.workouts_in_range(test_user.id, START, START + timedelta(weeks=40), None, None)
+    chunks = [chunk async for chunk in prescribed_workouts._stream_chunks(statement, ndjson=False)]
+
+    # '[', six chunks of up to 50 rows, ']'
+    assert len(chunks) == 8
+    workouts = json.loads(b"".join(chunks))
+    assert len(workouts) == 280
+    assert workouts[-1]["workout_description"] == "Day 279"
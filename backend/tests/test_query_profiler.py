@@ -0,0 +1,49 @@
+import logging
+
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from tenflow.core import query_profiler
+from tenflow.core.query_profiler import QueryProfile, QueryRecord, capture_queries
+
+
+def test_repeated_statements_flags_n_plus_one():
+    profile = QueryProfile()
+    for _ in range(6):
+        profile.records.append(QueryRecord("SELECT * FROM users WHERE id = $1", 0.001, 1, "primary"))
+    profile.records.append(QueryRecord("SELECT count(*) FROM training_plans", 0.002, 1, "primary"))
+
+    assert profile.repeated_statements(5) == [("SELECT * FROM users WHERE id = $1", 6)]
+    assert profile.count == 7
+    assert profile.rows == 7
+
+
+async def test_capture_queries_records_duration_and_rows(session):
+    with capture_queries() as profile:
+        await session.execute(text("SELECT generate_series(1, 3)"))
+
+    assert profile.count == 1
+    record = profile.records[0]
+    assert record.rows == 3
+    assert record.duration >= 0
+    assert record.engine == "primary"
+
+
+async def test_slow_queries_are_logged(session, monkeypatch, caplog):
+    monkeypatch.setattr(query_profiler.settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    # alembic's fileConfig() disables loggers that exist when migrations run
+    monkeypatch.setattr(query_profiler.logger, "disabled", False)
+
+    with caplog.at_level(logging.WARNING, logger="tenflow.core.query_profiler"):
+        await session.execute(text("SELECT 1"))
+
+    assert any("Slow query" in message for message in caplog.messages)
+
+
+async def test_profile_headers(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(query_profiler.settings, "QUERY_PROFILE_HEADERS", True)
+
+    response = await async_client.get("/health")
+
+    assert response.headers[query_profiler.QUERY_COUNT_HEADER] == "0"
+    assert float(response.headers[query_profiler.QUERY_TIME_HEADER]) == 0
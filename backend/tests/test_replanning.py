@@ -0,0 +1,266 @@
+import pytest
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select
+from uuid import UUID, uuid4
+
+from tenflow.models import PrescribedWorkout, SyncTombstone, TrainingActivity, TrainingPlan, User
+from tenflow.training.replanning import PlanChanges, WorkoutSpec, _apply, adapt_targets, rebuild_week
+
+MONDAY = date(2026, 3, 2)
+# (day, workout type, km) per week: 20, 20, 22 km, then an 18 km taper
+WEEKS = [
+    [(0, "easy", "5.0"), (2, "tempo", "6.0"), (5, "long", "9.0")],
+    [(0, "easy", "5.0"), (2, "tempo", "6.0"), (5, "long", "9.0")],
+    [(0, "easy", "5.5"), (2, "tempo", "6.6"), (5, "long", "9.9")],
+    [(0, "easy", "4.5"), (2, "tempo", "5.4"), (5, "long", "8.1")],
+]
+
+
+def spec(day, workout_type="easy", distance="5.0"):
+    return WorkoutSpec(uuid4(), MONDAY + timedelta(days=day), workout_type, Decimal(distance))
+
+
+def total(workouts):
+    return float(sum(workout.distance for workout in workouts))
+
+
+# Load Adaptation Tests
+
+def test_on_plan_week_keeps_targets():
+    assert adapt_targets([20, 22, 18], 20, 19) == [20, 22, 18]
+
+
+def test_missed_load_ramps_back_up():
+    targets = adapt_targets([20, 22, 18], 20, 16)
+
+    assert targets[:2] == pytest.approx([17.6, 19.36])
+    assert targets[2] == 18  # caught up: the taper is left alone
+
+
+def test_missed_load_ramps_from_a_floor():
+    targets = adapt_targets([30, 32, 34, 36, 38, 40], 30, 2)
+
+    assert targets[:2] == pytest.approx([8.25, 9.075])  # from a quarter of the week, not from 2 km
+    assert all(target > 0 for target in targets)
+
+
+def test_nothing_recorded_keeps_targets():
+    assert adapt_targets([30, 32, 34, 36, 38, 40], 30, 0) == [30, 32, 34, 36, 38, 40]
+
+
+def test_overrun_comes_off_the_next_week():
+    assert adapt_targets([20, 22], 20, 30) == [15, 22]
+    assert adapt_targets([20, 22], 20, 60) == [14, 22]  # at most 30% of the week
+
+
+def test_rebuild_scales_to_target():
+    week = [spec(0, "easy", "5.0"), spec(2, "tempo", "6.0"), spec(5, "long", "9.0")]
+
+    rebuilt = rebuild_week(week, 17.6, [])
+
+    assert [w.distance for w in rebuilt] == [Decimal("4.4"), Decimal("5.3"), Decimal("7.9")]
+    assert [w.id for w in rebuilt] == [w.id for w in week]
+
+
+def test_rebuild_drops_easy_runs_first():
+    week = [spec(0, "easy", "4.0"), spec(1, "recovery", "3.0"), spec(2, "tempo", "6.0"), spec(5, "long", "9.0")]
+
+    rebuilt = rebuild_week(week, 7.0, [])
+
+    assert [w.workout_type for w in rebuilt] == ["tempo", "long"]
+    assert total(rebuilt) == pytest.approx(7.0, abs=0.1)
+
+
+def test_rebuild_keeps_key_sessions():
+    week = [spec(2, "intervals", "8.0"), spec(5, "long", "12.0")]
+
+    assert [w.workout_type for w in rebuild_week(week, 4.0, [])] == ["intervals", "long"]
+
+
+def test_rebuild_adds_easy_runs_on_free_days():
+    week = [spec(2, "tempo", "6.0"), spec(5, "long", "9.0")]
+    free = [MONDAY + timedelta(days=3), MONDAY]
+
+    rebuilt = rebuild_week(week, 21.0, free)
+
+    added = [w for w in rebuilt if w.id is None]
+    assert [(w.workout_date, w.workout_type) for w in added] == [(MONDAY, "easy")]
+    assert total(rebuilt) == pytest.approx(21.0, abs=0.1)
+
+
+# Replan Endpoint Tests
+
+@pytest.fixture
+async def plan(session, test_user):
+    """A four week plan; returns its id, its owner's and its workout ids by (week, workout type)."""
+    training_plan = TrainingPlan(
+        user=test_user,
+        goal="10K",
+        plan_name="Replanning Plan",
+        start_date=MONDAY,
+        end_date=MONDAY + timedelta(weeks=4, days=-1),
+        duration_weeks=4,
+        fitness_level="beginner",
+        weekly_distance_base=Decimal("20.0"),
+        weekly_distance_peak=Decimal("22.0"),
+        training_days_per_week=3,
+        plan_data={"weeks": []},
+    )
+    workouts = {
+        (week, workout_type): PrescribedWorkout(
+            user=test_user,
+            training_plan=training_plan,
+            workout_date=MONDAY + timedelta(weeks=week, days=day),
+            workout_time="morning",
+            workout_type=workout_type,
+            distance=Decimal(distance),
+            duration_minutes=None,
+            intensity_zone=None,
+            rpe_target=None,
+            workout_description=None,
+        )
+        for week, days in enumerate(WEEKS)
+        for day, workout_type, distance in days
+    }
+    session.add_all([training_plan, *workouts.values()])
+    ids = {
+        "user": test_user.id,
+        "plan": training_plan.id,
+        "workouts": {key: workout.id for key, workout in workouts.items()},
+    }
+    await session.commit()
+    return ids
+
+
+async def run_first_week(session, plan, km):
+    session.add(
+        TrainingActivity(
+            user=await session.get(User, plan["user"]),
+            name="Run",
+            activity_type="Run",
+            actual_workout=None,
+            activity_data=None,
+            start_date=datetime(2026, 3, 4, 7, tzinfo=UTC),
+            distance=Decimal(km),
+        )
+    )
+    await session.commit()
+
+
+async def distances(session, plan_id):
+    statement = select(PrescribedWorkout).where(PrescribedWorkout.training_plan_id == plan_id)
+    return {
+        (workout.workout_date, workout.workout_type): (workout.distance, workout.updated_at)
+        for workout in (await session.execute(statement)).scalars()
+    }
+
+
+def replan_url(plan):
+    return f"/api/v1/training-plans/{plan['plan']}/replan?today=2026-03-09"
+
+
+async def test_missed_week_rebuilds_only_affected_weeks(session, async_client: AsyncClient, auth_headers, plan):
+    await run_first_week(session, plan, "16.0")
+    before = await distances(session, plan["plan"])
+
+    response = await async_client.post(replan_url(plan), headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["weeks"] == [1, 2]
+    assert result["inserted"] == [] and result["deleted"] == []
+    assert len(result["updated"]) == 6
+
+    session.expire_all()
+    after = await distances(session, plan["plan"])
+    week = lambda n: [key for key in after if (key[0] - MONDAY).days // 7 == n]  # noqa: E731
+    assert [after[key][0] for key in sorted(week(1))] == [Decimal("4.4"), Decimal("5.3"), Decimal("7.9")]
+    assert [after[key][0] for key in sorted(week(2))] == [Decimal("4.8"), Decimal("5.8"), Decimal("8.7")]
+    # the past week and the taper aren't written at all
+    for key in week(0) + week(3):
+        assert after[key] == before[key]
+
+
+async def test_large_miss_drops_easy_runs(session, async_client: AsyncClient, auth_headers, plan):
+    await run_first_week(session, plan, "5.0")
+
+    response = await async_client.post(replan_url(plan), headers=auth_headers)
+
+    result = response.json()
+    assert str(plan["workouts"][(1, "easy")]) in result["deleted"]
+    session.expire_all()
+    tombstones = await session.execute(select(SyncTombstone.entity_id).where(SyncTombstone.user_id == plan["user"]))
+    assert set(tombstones.scalars()) == {UUID(workout_id) for workout_id in result["deleted"]}
+    remaining = await session.execute(
+        select(PrescribedWorkout.workout_type).where(
+            PrescribedWorkout.training_plan_id == plan["plan"],
+            PrescribedWorkout.workout_date >= MONDAY + timedelta(weeks=1),
+            PrescribedWorkout.workout_date < MONDAY + timedelta(weeks=2),
+        )
+    )
+    assert sorted(remaining.scalars()) == ["long", "tempo"]
+
+
+async def test_added_workouts_belong_to_the_plan(session, plan):
+    training_plan = await session.get(TrainingPlan, plan["plan"])
+    added = WorkoutSpec(None, MONDAY + timedelta(days=8), "easy", Decimal("3.0"))
+
+    inserted = await _apply(session, training_plan, [], PlanChanges([1], [added]))
+    await session.commit()
+
+    statement = select(PrescribedWorkout.user_id, PrescribedWorkout.training_plan_id).where(
+        PrescribedWorkout.id == inserted[0].id
+    )
+    assert tuple((await session.execute(statement)).one()) == (plan["user"], plan["plan"])
+
+
+async def test_on_plan_week_changes_nothing(session, async_client: AsyncClient, auth_headers, plan):
+    await run_first_week(session, plan, "20.0")
+
+    response = await async_client.post(replan_url(plan), headers=auth_headers)
+
+    assert response.json() == {"weeks": [], "inserted": [], "updated": [], "deleted": []}
+
+
+async def test_replanning_twice_changes_nothing(session, async_client: AsyncClient, auth_headers, plan):
+    await run_first_week(session, plan, "30.0")
+    first = await async_client.post(replan_url(plan), headers=auth_headers)
+    assert first.json()["weeks"] == [1]
+    session.expire_all()
+    before = await distances(session, plan["plan"])
+
+    response = await async_client.post(replan_url(plan), headers=auth_headers)
+
+    assert response.json() == {"weeks": [], "inserted": [], "updated": [], "deleted": []}
+    session.expire_all()
+    assert await distances(session, plan["plan"]) == before
+
+
+async def test_dry_run_changes_nothing(session, async_client: AsyncClient, auth_headers, plan):
+    await run_first_week(session, plan, "5.0")
+    before = await distances(session, plan["plan"])
+
+    response = await async_client.post(replan_url(plan) + "&dry_run=true", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["weeks"] == [1, 2, 3]
+    session.expire_all()
+    assert await distances(session, plan["plan"]) == before
+
+
+async def test_replan_other_users_plan(session, async_client: AsyncClient, plan, make_user, headers_for):
+    other = make_user("other")
+    session.add(other)
+    headers = headers_for(other.id)
+    await session.commit()
+
+    response = await async_client.post(replan_url(plan), headers=headers)
+
+    assert response.status_code == 403
+
+
+async def test_replan_not_found(async_client: AsyncClient, auth_headers):
+    response = await async_client.post(f"/api/v1/training-plans/{uuid4()}/replan", headers=auth_headers)
+    assert response.status_code == 404
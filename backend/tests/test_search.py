@@ -0,0 +1,219 @@
+import pytest
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import literal, select, text
+from sqlalchemy.dialects import postgresql
+from uuid import uuid4
+
+from tenflow.models import PrescribedWorkout, TrainingActivity, TrainingPlan
+
+MONDAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+async def history(session, make_user, headers_for):
+    """Workouts and activities for a runner and another user; returns ids by name and the runner's headers."""
+    runner, other = make_user("runner"), make_user("other")
+    plans = {}
+    for user in (runner, other):
+        plans[user.id] = TrainingPlan(
+            user=user,
+            goal="10K",
+            plan_name="Search Plan",
+            start_date=MONDAY,
+            end_date=MONDAY + timedelta(weeks=4),
+            duration_weeks=4,
+            fitness_level="intermediate",
+            weekly_distance_base=Decimal("30.0"),
+            weekly_distance_peak=Decimal("40.0"),
+            training_days_per_week=3,
+            plan_data=None,
+        )
+
+    def workout(user, day, workout_type, description):
+        return PrescribedWorkout(
+            user=user,
+            training_plan=plans[user.id],
+            workout_date=MONDAY + timedelta(days=day),
+            workout_time="morning",
+            workout_type=workout_type,
+            distance=Decimal("8.0"),
+            duration_minutes=None,
+            intensity_zone=None,
+            rpe_target=None,
+            workout_description=description,
+        )
+
+    def activity(user, day, name, activity_type="Run"):
+        return TrainingActivity(
+            user=user,
+            name=name,
+            activity_type=activity_type,
+            actual_workout=None,
+            activity_data=None,
+            start_date=datetime.combine(MONDAY + timedelta(days=day), datetime.min.time(), tzinfo=UTC),
+        )
+
+    rows = {
+        "tempo": workout(runner, 1, "tempo", "Tempo: 20 minutes at threshold pace, on the track if you can"),
+        "track": workout(runner, 3, "intervals", "Track session: 6 x 800 m with 400 m jog recoveries"),
+        "easy": workout(runner, 5, "easy", "Easy conversational running"),
+        "parkrun": activity(runner, 6, "Parkrun race"),
+        "race": activity(runner, 13, "Spring 10K race"),
+        "tempo_run": activity(runner, 1, "Tempo run"),
+        "others": workout(other, 1, "tempo", "Tempo run for someone else"),
+    }
+    session.add_all([runner, other, *plans.values(), *rows.values()])
+    ids = {name: row.id for name, row in rows.items()}
+    headers = headers_for(runner.id)
+    await session.commit()
+    return ids, headers
+
+
+async def search(async_client, history, **params):
+    ids, headers = history
+    response = await async_client.get("/api/v1/search/", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    names = {str(row_id): name for name, row_id in ids.items()}
+    return [(names[result["id"]], result) for result in response.json()]
+
+
+# Search Tests
+
+async def test_search_workouts_and_activities(async_client: AsyncClient, history):
+    results = await search(async_client, history, q="tempo")
+
+    # matched in both type and description
+    assert [name for name, _ in results] == ["tempo", "tempo_run"]
+    assert results[0][1]["kind"] == "workout"
+    assert results[0][1]["title"] == "tempo"
+    assert results[1][1]["kind"] == "activity"
+    assert results[1][1]["date"] == "2026-03-03"
+    assert all(not result["fuzzy"] for _, result in results)
+
+
+async def test_search_matches_word_forms(async_client: AsyncClient, history):
+    results = await search(async_client, history, q="races")
+
+    assert [name for name, _ in results] == ["race", "parkrun"]  # newest first among equal ranks
+    assert "<b>race</b>" in results[0][1]["headline"]
+
+
+async def test_search_descriptions(async_client: AsyncClient, history):
+    assert {name for name, _ in await search(async_client, history, q="track")} == {"tempo", "track"}
+    assert [name for name, _ in await search(async_client, history, q='"track session"')] == ["track"]
+    assert [name for name, _ in await search(async_client, history, q="track -threshold")] == ["track"]
+
+
+async def test_search_kinds(async_client: AsyncClient, history):
+    results = await search(async_client, history, q="tempo", kind="activity")
+    assert [name for name, _ in results] == ["tempo_run"]
+
+
+async def test_search_pages(async_client: AsyncClient, history):
+    first = await search(async_client, history, q="race OR tempo", limit=2)
+    second = await search(async_client, history, q="race OR tempo", limit=2, skip=2)
+
+    names = [name for name, _ in first + second]
+    assert len(names) == 4 and set(names) == {"tempo", "tempo_run", "race", "parkrun"}
+    ranks = [result["rank"] for _, result in first + second]
+    assert ranks == sorted(ranks, reverse=True)
+
+
+async def test_search_misspelling(async_client: AsyncClient, history, pg_trgm):
+    results = await search(async_client, history, q="tempoo")
+
+    assert [name for name, _ in results] == ["tempo", "tempo_run"]  # equal similarity: newest first, then by id
+    assert all(result["fuzzy"] and result["headline"] is None for _, result in results)
+    assert results[0][1]["title"] == "tempo"
+    assert results[1][1]["date"] == "2026-03-03"
+    assert [name for name, _ in await search(async_client, history, q="threshhold")] == ["tempo"]
+
+
+async def test_search_misspelling_without_trigrams(async_client: AsyncClient, history, monkeypatch):
+    from tenflow.api.v1.endpoints import search as endpoint
+
+    async def unavailable(session):
+        return False
+
+    monkeypatch.setattr(endpoint, "trigram_available", unavailable)
+
+    assert await search(async_client, history, q="tempoo") == []
+
+
+async def test_trigram_check_keeps_only_a_positive_answer(monkeypatch):
+    from tenflow.api.v1.endpoints import search as endpoint
+
+    class Session:
+        """Answers the extension query with ``row``, counting queries."""
+
+        def __init__(self, row):
+            self.row, self.queries = row, 0
+
+        async def execute(self, statement):
+            self.queries += 1
+            return self
+
+        def first(self):
+            return self.row
+
+    monkeypatch.setattr(endpoint, "_trigram_available", False)
+    missing, installed = Session(None), Session((1,))
+
+    assert not await endpoint.trigram_available(missing)
+    assert not await endpoint.trigram_available(missing)
+    assert missing.queries == 2  # asked again: it may have been installed since
+    assert await endpoint.trigram_available(installed)
+    assert await endpoint.trigram_available(installed)
+    assert installed.queries == 1
+
+
+def test_fuzzy_matches_use_trigram_operator():
+    from tenflow.api.v1.endpoints.search import _fuzzy
+    from tenflow.models import SearchKind
+
+    sql = str(_fuzzy(uuid4(), "tmepo", set(SearchKind)).compile(dialect=postgresql.dialect()))
+
+    assert sql.count("<%") == 2
+    assert "word_similarity" in sql
+
+
+async def test_search_unauthorized(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/search/", params={"q": "tempo"})
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize(
+    "model, index",
+    [
+        (PrescribedWorkout, "ix_prescribed_workouts_search_vector"),
+        (TrainingActivity, "ix_training_activities_search_vector"),
+    ],
+)
+async def test_search_uses_gin_indexes(session, history, model, index):
+    query = select(model.id).where(model.search_vector.op("@@")(text("websearch_to_tsquery('english', 'tempo')")))
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join((await session.execute(text(f"EXPLAIN {sql}"))).scalars())
+    await session.rollback()
+
+    assert index in plan
+
+
+@pytest.mark.parametrize(
+    "column, index",
+    [
+        (PrescribedWorkout.workout_description, "ix_prescribed_workouts_description_trgm"),
+        (TrainingActivity.name, "ix_training_activities_name_trgm"),
+    ],
+)
+async def test_fuzzy_search_uses_trigram_indexes(session, history, pg_trgm, column, index):
+    query = select(column.class_.id).where(literal("tempoo").op("<%")(column))
+    # named parameters: the pyformat default would escape % in the operator
+    sql = query.compile(dialect=postgresql.dialect(paramstyle="named"), compile_kwargs={"literal_binds": True})
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join((await session.execute(text(f"EXPLAIN {sql}"))).scalars())
+    await session.rollback()
+
+    assert index in plan
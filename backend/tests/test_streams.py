@@ -0,0 +1,288 @@
+import numpy as np
+import pytest
+from datetime import UTC, datetime
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from uuid import uuid4
+
+from tenflow.models import ActivityStream, TrainingActivity
+from tenflow.training.streams import decode, encode
+
+SAMPLES = 3600
+
+
+def hour_of_running():
+    seconds = np.arange(SAMPLES)
+    return {
+        "time": seconds.tolist(),
+        "distance": np.round(np.cumsum(np.full(SAMPLES, 3.2)), 1).tolist(),
+        "heartrate": (140 + 10 * np.sin(seconds / 300)).round().tolist(),
+        "altitude": np.round(120 + 15 * np.sin(seconds / 600), 1).tolist(),
+        "velocity_smooth": (3.2 + 0.3 * np.sin(seconds / 60)).tolist(),
+        "latlng": np.column_stack([47.6 + seconds * 1e-5, -122.3 + seconds * 2e-5]).round(7).tolist(),
+    }
+
+
+# Codec Tests
+
+def test_round_trip_every_codec():
+    streams = hour_of_running()
+    for channel, values in streams.items():
+        decoded = decode(encode(channel, values))
+        tolerance = 1e-5 if channel == "velocity_smooth" else 1e-9
+        np.testing.assert_allclose(decoded, values, atol=tolerance, err_msg=channel)
+
+
+def test_deltas_use_the_narrowest_integer():
+    assert encode("heartrate", [120, 121, 119, 150]).dtype == "<i1"
+    assert encode("watts", [0, 1500, 0]).dtype == "<i2"
+    assert encode("time", [0, 100_000]).dtype == "<i4"
+
+
+def test_uncompressed_float_channel_decodes_without_copying():
+    # noise doesn't compress, so it is stored raw and read straight from the row's bytes
+    stream = encode("grade_smooth", np.random.default_rng(0).normal(size=500))
+    assert stream.compression == "none"
+
+    values = decode(stream)
+
+    assert values.dtype == np.float32
+    assert not values.flags.owndata
+    assert not values.flags.writeable
+
+
+def test_smooth_channels_compress():
+    heartrate = encode("heartrate", hour_of_running()["heartrate"])
+    assert heartrate.compression == "zlib"
+    assert len(heartrate.data) < SAMPLES / 10
+
+
+def test_empty_channel():
+    assert decode(encode("latlng", [])).shape == (0, 2)
+
+
+@pytest.mark.parametrize(
+    "channel, values",
+    [("pace", [1, 2]), ("heartrate", [120, float("nan")]), ("latlng", [1.0, 2.0]), ("heartrate", [[1, 2]])],
+)
+def test_invalid_streams_are_rejected(channel, values):
+    with pytest.raises(ValueError):
+        encode(channel, values)
+
+
+# Stream Endpoint Tests
+
+@pytest.fixture
+async def activity_id(session, test_user):
+    activity = TrainingActivity(
+        user=test_user,
+        name="Morning Run",
+        activity_type="Run",
+        actual_workout=None,
+        activity_data=None,
+        start_date=datetime(2026, 3, 2, 7, tzinfo=UTC),
+    )
+    session.add(activity)
+    activity_id = activity.id
+    await session.commit()
+    return activity_id
+
+
+def streams_url(activity_id, channel=None):
+    url = f"/api/v1/training-activities/{activity_id}/streams"
+    return f"{url}/{channel}" if channel else url
+
+
+async def test_upload_and_read_one_channel(async_client: AsyncClient, auth_headers, activity_id):
+    streams = hour_of_running()
+    response = await async_client.put(streams_url(activity_id), json=streams, headers=auth_headers)
+
+    assert response.status_code == 200
+    info = {stream["channel"]: stream for stream in response.json()}
+    assert set(info) == set(streams)
+    assert info["latlng"]["dims"] == 2
+    assert info["heartrate"]["stored_bytes"] < SAMPLES
+
+    heartrate = await async_client.get(streams_url(activity_id, "heartrate"), headers=auth_headers)
+    assert heartrate.status_code == 200
+    assert heartrate.json() == {"channel": "heartrate", "length": SAMPLES, "data": streams["heartrate"]}
+
+    altitude = (await async_client.get(streams_url(activity_id, "altitude"), headers=auth_headers)).json()
+    assert altitude["data"] == streams["altitude"]
+
+
+async def test_upload_replaces_only_the_given_channels(async_client: AsyncClient, auth_headers, activity_id):
+    await async_client.put(streams_url(activity_id), json={"time": [0, 1], "watts": [200, 210]}, headers=auth_headers)
+    await async_client.put(streams_url(activity_id), json={"watts": [250, 260, 270]}, headers=auth_headers)
+
+    response = await async_client.get(streams_url(activity_id), headers=auth_headers)
+
+    assert {s["channel"]: s["length"] for s in response.json()} == {"time": 2, "watts": 3}
+
+
+async def test_binary_read(async_client: AsyncClient, auth_headers, activity_id):
+    latlng = [[47.6, -122.3], [47.6001, -122.3002]]
+    await async_client.put(streams_url(activity_id), json={"latlng": latlng}, headers=auth_headers)
+
+    headers = {**auth_headers, "Accept": "application/octet-stream"}
+    response = await async_client.get(streams_url(activity_id, "latlng"), headers=headers)
+
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-stream-shape"] == "2,2"
+    np.testing.assert_allclose(np.frombuffer(response.content, "<f8").reshape(2, 2), latlng)
+
+
+async def test_invalid_and_missing_streams(async_client: AsyncClient, auth_headers, activity_id):
+    invalid = await async_client.put(streams_url(activity_id), json={"pace": [5.0]}, headers=auth_headers)
+    assert invalid.status_code == 422
+
+    missing = await async_client.get(streams_url(activity_id, "watts"), headers=auth_headers)
+    assert missing.status_code == 404
+
+    no_activity = await async_client.put(streams_url(uuid4()), json={"time": [0]}, headers=auth_headers)
+    assert no_activity.status_code == 404
+
+
+async def test_other_users_streams(
+    session, async_client: AsyncClient, auth_headers, activity_id, make_user, headers_for
+):
+    await async_client.put(streams_url(activity_id), json={"time": [0, 1]}, headers=auth_headers)
+    other = make_user("other")
+    session.add(other)
+    other_headers = headers_for(other.id)
+    await session.commit()
+
+    write = await async_client.put(streams_url(activity_id), json={"time": [0]}, headers=other_headers)
+    assert write.status_code == 403
+    read = await async_client.get(streams_url(activity_id, "time"), headers=other_headers)
+    assert read.status_code == 404
+    listing = await async_client.get(streams_url(activity_id), headers=other_headers)
+    assert listing.json() == []
+
+
+async def test_deleting_the_activity_deletes_its_streams(session, async_client: AsyncClient, auth_headers, activity_id):
+    await async_client.put(streams_url(activity_id), json={"time": [0, 1]}, headers=auth_headers)
+
+    activity = await session.get(TrainingActivity, activity_id)
+    await session.delete(activity)
+    await session.commit()
+
+    count = await session.execute(select(func.count()).where(ActivityStream.activity_id == activity_id))
+    assert count.scalar_one() == 0
+
+
+# Downsampling Tests
+
+def test_lttb_keeps_the_shape_of_the_line():
+    from tenflow.training.downsample import lttb
+
+    x = np.arange(100_000, dtype=float)
+    y = np.sin(x / 5000)
+    y[42_000] = 10  # a spike must survive
+
+    index = lttb(x, y, 500)
+
+    assert len(index) == 500
+    assert index[0] == 0 and index[-1] == len(x) - 1
+    assert np.all(np.diff(index) > 0)
+    assert 42_000 in index
+    np.testing.assert_allclose(np.interp(x, x[index], y[index])[:40_000], y[:40_000], atol=0.01)
+
+
+def test_minmax_keeps_every_buckets_extremes():
+    from tenflow.training.downsample import minmax
+
+    y = np.random.default_rng(1).normal(size=10_001)
+    index = minmax(y, 100)
+
+    assert len(index) <= 100
+    assert np.all(np.diff(index) > 0)
+    assert y[index].max() == y.max() and y[index].min() == y.min()
+
+
+def test_short_streams_are_returned_whole():
+    from tenflow.training.downsample import downsample
+
+    np.testing.assert_array_equal(downsample(np.arange(5.0), None, "lttb", 10), np.arange(5))
+    with pytest.raises(ValueError):
+        downsample(np.zeros((20, 2)), None, "minmax", 10)
+
+
+def downsampled_url(activity_id, channel):
+    return f"{streams_url(activity_id, channel)}/downsampled"
+
+
+@pytest.fixture
+def stream_cache():
+    from tenflow.core.cache import stream_cache
+
+    stream_cache.clear()
+    yield stream_cache
+    stream_cache.clear()
+
+
+async def test_downsampled_endpoint(async_client: AsyncClient, auth_headers, activity_id, stream_cache):
+    streams = hour_of_running()
+    await async_client.put(streams_url(activity_id), json=streams, headers=auth_headers)
+
+    url = downsampled_url(activity_id, "heartrate")
+    response = await async_client.get(url, params={"points": 200}, headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["length"] == SAMPLES
+    assert len(body["index"]) == len(body["time"]) == len(body["data"]) == 200
+    assert body["time"] == [streams["time"][i] for i in body["index"]]
+    assert body["data"] == [streams["heartrate"][i] for i in body["index"]]
+
+    minmax = await async_client.get(
+        downsampled_url(activity_id, "altitude"), params={"points": 100, "method": "minmax"}, headers=auth_headers
+    )
+    altitude = minmax.json()["data"]
+    assert max(altitude) == max(streams["altitude"]) and min(altitude) == min(streams["altitude"])
+
+    route = (await async_client.get(downsampled_url(activity_id, "latlng"), headers=auth_headers)).json()
+    assert len(route["data"]) == 500 and len(route["data"][0]) == 2
+
+    url = downsampled_url(activity_id, "latlng")
+    invalid = await async_client.get(url, params={"method": "minmax"}, headers=auth_headers)
+    assert invalid.status_code == 422
+
+
+async def test_downsampled_streams_are_cached(
+    async_client: AsyncClient, auth_headers, activity_id, stream_cache, query_budget
+):
+    await async_client.put(streams_url(activity_id), json=hour_of_running(), headers=auth_headers)
+    url = downsampled_url(activity_id, "heartrate")
+    first = await async_client.get(url, headers=auth_headers)
+    assert len(stream_cache) == 1
+
+    # the user, then the stream versions; never the samples
+    with query_budget(2) as profile:
+        second = await async_client.get(url, headers=auth_headers)
+    assert second.content == first.content
+    assert all("activity_streams.data" not in record.statement for record in profile.records)
+
+    not_modified = await async_client.get(url, headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304
+
+    await async_client.put(streams_url(activity_id), json={"heartrate": [100] * 1000}, headers=auth_headers)
+    third = await async_client.get(url, headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+    assert third.status_code == 200
+    assert third.json()["data"] == [100] * 500
+    assert third.json()["time"] is None  # no longer as long as the time stream
+
+
+async def test_downsampled_streams_of_other_users(
+    session, async_client: AsyncClient, auth_headers, activity_id, stream_cache, make_user, headers_for
+):
+    await async_client.put(streams_url(activity_id), json={"time": [0, 1, 2]}, headers=auth_headers)
+    await async_client.get(downsampled_url(activity_id, "time"), headers=auth_headers)
+    other = make_user("other")
+    session.add(other)
+    other_headers = headers_for(other.id)
+    await session.commit()
+
+    response = await async_client.get(downsampled_url(activity_id, "time"), headers=other_headers)
+
+    assert response.status_code == 404
@@ -0,0 +1,207 @@
+import pytest
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from uuid import uuid4
+
+from tenflow.models import PrescribedWorkout, SyncTombstone, TrainingActivity, TrainingPlan
+
+
+@pytest.fixture
+async def training_data(session, test_user):
+    """A plan with two prescribed workouts, one of them with a recorded activity."""
+    plan = TrainingPlan(
+        user=test_user,
+        goal="Half Marathon",
+        plan_name="Sync Plan",
+        start_date=date.today(),
+        end_date=date.today() + timedelta(weeks=8),
+        duration_weeks=8,
+        fitness_level="intermediate",
+        weekly_distance_base=Decimal("30.0"),
+        weekly_distance_peak=Decimal("50.0"),
+        training_days_per_week=4,
+        plan_data={"weeks": []},
+    )
+    workouts = [
+        PrescribedWorkout(
+            user=test_user,
+            training_plan=plan,
+            workout_date=date.today() + timedelta(days=day),
+            workout_time="morning",
+            workout_type="easy",
+            distance=Decimal("8.0"),
+            duration_minutes=45,
+            intensity_zone="z2",
+            rpe_target=3,
+            workout_description="Easy run",
+        )
+        for day in range(2)
+    ]
+    activity = TrainingActivity(
+        user=test_user,
+        name="Morning Run",
+        activity_type="run",
+        actual_workout=None,
+        activity_data=None,
+        start_date=datetime.now(UTC),
+        prescribed_workout=workouts[0],
+        distance=Decimal("8.1"),
+    )
+    created = {"plan": plan.id, "workouts": [workout.id for workout in workouts], "activity": activity.id}
+    session.add_all([plan, *workouts, activity])
+    await session.commit()
+    return created
+
+
+@pytest.fixture
+def sync(env_vars):
+    # imported lazily so the endpoint's settings point at the test database
+    from tenflow.api.v1.endpoints import sync
+
+    return sync
+
+
+@pytest.fixture
+def no_margin(sync, monkeypatch):
+    # Rows created by the fixtures would otherwise fall inside the overlap window.
+    monkeypatch.setattr(sync.settings, "SYNC_WATERMARK_MARGIN_SECONDS", 0)
+
+
+def ids(items):
+    return {item["id"] for item in items}
+
+
+# Full Snapshot Tests
+
+async def test_first_sync_returns_full_snapshot(async_client: AsyncClient, auth_headers, training_data, query_budget):
+    with query_budget(6):
+        response = await async_client.get("/api/v1/sync/", headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["full"] is True
+    assert result["watermark"]
+    assert ids(result["training_plans"]["created"]) == {str(training_data["plan"])}
+    assert ids(result["prescribed_workouts"]["created"]) == {str(w) for w in training_data["workouts"]}
+    assert ids(result["training_activities"]["created"]) == {str(training_data["activity"])}
+    for entity in ("training_plans", "prescribed_workouts", "training_activities"):
+        assert result[entity]["updated"] == []
+        assert result[entity]["deleted"] == []
+
+
+async def test_expired_watermark_gets_full_snapshot(async_client: AsyncClient, auth_headers, training_data, sync):
+    expired = datetime.now(UTC) - timedelta(days=sync.settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+
+    response = await async_client.get(
+        "/api/v1/sync/", params={"since": sync.encode_watermark(expired)}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["full"] is True
+
+
+async def test_invalid_watermark(async_client: AsyncClient, auth_headers):
+    response = await async_client.get("/api/v1/sync/", params={"since": "not-a-watermark"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+async def test_sync_unauthorized(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/sync/")
+    assert response.status_code == 401
+
+
+# Incremental Sync Tests
+
+async def test_incremental_sync_returns_only_changes(
+    session, async_client: AsyncClient, auth_headers, training_data, no_margin
+):
+    first = (await async_client.get("/api/v1/sync/", headers=auth_headers)).json()
+
+    unchanged = await async_client.get("/api/v1/sync/", params={"since": first["watermark"]}, headers=auth_headers)
+    result = unchanged.json()
+    assert result["full"] is False
+    for entity in ("training_plans", "prescribed_workouts", "training_activities"):
+        assert result[entity] == {"created": [], "updated": [], "deleted": []}
+
+    # update the plan, delete one workout and mark the other completed without touching updated_at
+    plan_id, (kept_id, deleted_id) = training_data["plan"], training_data["workouts"]
+    put = await async_client.put(
+        "/api/v1/training-plans/", json={"id": str(plan_id), "plan_name": "Renamed"}, headers=auth_headers
+    )
+    assert put.status_code == 200
+    kept = await session.get(PrescribedWorkout, kept_id)
+    kept.is_completed = True
+    await session.delete(await session.get(PrescribedWorkout, deleted_id))
+    await session.commit()
+
+    response = await async_client.get("/api/v1/sync/", params={"since": first["watermark"]}, headers=auth_headers)
+    result = response.json()
+    assert result["full"] is False
+    assert [plan["plan_name"] for plan in result["training_plans"]["updated"]] == ["Renamed"]
+    assert ids(result["prescribed_workouts"]["updated"]) == {str(kept_id)}
+    assert result["prescribed_workouts"]["deleted"] == [str(deleted_id)]
+    assert result["training_activities"]["created"] == []
+
+
+async def test_deleting_a_plan_records_tombstones_for_cascaded_rows(
+    session, async_client: AsyncClient, auth_headers, training_data, no_margin
+):
+    # activities outlive the plan: they are unmatched, not deleted
+    first = (await async_client.get("/api/v1/sync/", headers=auth_headers)).json()
+
+    response = await async_client.delete(f"/api/v1/training-plans/{training_data['plan']}", headers=auth_headers)
+    assert response.status_code == 200
+
+    result = (await async_client.get("/api/v1/sync/", params={"since": first["watermark"]}, headers=auth_headers)).json()
+    assert result["training_plans"]["deleted"] == [str(training_data["plan"])]
+    assert set(result["prescribed_workouts"]["deleted"]) == {str(w) for w in training_data["workouts"]}
+    assert result["training_activities"]["deleted"] == []
+    [activity] = result["training_activities"]["updated"]
+    assert activity["id"] == str(training_data["activity"])
+    assert activity["prescribed_workout_id"] is None
+
+
+async def test_created_rows_are_reported_as_created(async_client: AsyncClient, auth_headers, no_margin):
+    first = (await async_client.get("/api/v1/sync/", headers=auth_headers)).json()
+    plan = {
+        "goal": "10K",
+        "plan_name": "New Plan",
+        "start_date": str(date.today()),
+        "end_date": str(date.today() + timedelta(weeks=6)),
+        "duration_weeks": 6,
+        "fitness_level": "beginner",
+        "weekly_distance_base": "20.0",
+        "weekly_distance_peak": "35.0",
+        "training_days_per_week": 3,
+        "plan_data": {"weeks": []},
+    }
+    created = (await async_client.post("/api/v1/training-plans/", json=plan, headers=auth_headers)).json()
+
+    result = (await async_client.get("/api/v1/sync/", params={"since": first["watermark"]}, headers=auth_headers)).json()
+    assert ids(result["training_plans"]["created"]) == {created["id"]}
+    assert result["training_plans"]["updated"] == []
+
+
+async def test_watermark_waits_for_in_flight_writes(
+    session, async_client: AsyncClient, auth_headers, sync, no_margin
+):
+    # an open write transaction could still commit rows stamped before now
+    await session.execute(text("SELECT pg_current_xact_id()"))
+    started = (await session.execute(text("SELECT now()"))).scalar_one()
+
+    response = await async_client.get("/api/v1/sync/", headers=auth_headers)
+    await session.rollback()
+
+    assert sync.decode_watermark(response.json()["watermark"]) <= started
+
+
+async def test_tombstones_are_scoped_to_the_user(session, async_client: AsyncClient, auth_headers, no_margin):
+    first = (await async_client.get("/api/v1/sync/", headers=auth_headers)).json()
+    session.add(SyncTombstone(user_id=uuid4(), entity_type="training_plans", entity_id=uuid4()))
+    await session.commit()
+
+    result = (await async_client.get("/api/v1/sync/", params={"since": first["watermark"]}, headers=auth_headers)).json()
+    assert result["training_plans"]["deleted"] == []
+    assert len((await session.execute(select(SyncTombstone))).all()) == 1
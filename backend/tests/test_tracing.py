@@ -0,0 +1,71 @@
+import pytest
+import random
+from httpx import AsyncClient
+
+from tenflow.core import tracing
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = tracing.InMemorySpanExporter()
+    monkeypatch.setattr(tracing, "_exporter", exporter)
+    monkeypatch.setattr(tracing, "_configured", True)
+    return exporter
+
+
+def test_parse_traceparent():
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert tracing.parse_traceparent(f"00-{trace_id}-00f067aa0ba902b7-01") == (trace_id, "00f067aa0ba902b7", True)
+    assert tracing.parse_traceparent(f"00-{trace_id}-00f067aa0ba902b7-00")[2] is False
+    assert tracing.parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert tracing.parse_traceparent("garbage") is None
+    assert tracing.parse_traceparent(None) is None
+
+
+def test_ids_do_not_follow_the_random_module():
+    # processes restored from one memory snapshot share the random module's state
+    random.seed(0)
+    first = tracing._new_trace_id(), tracing._new_span_id()
+    random.seed(0)
+    second = tracing._new_trace_id(), tracing._new_span_id()
+
+    assert first != second
+    assert [len(key) for key in first] == [32, 16]
+
+
+def test_span_is_noop_outside_a_trace():
+    with tracing.span("anything") as current:
+        assert current is None
+
+
+async def test_request_trace_covers_auth_db_and_serialization(
+    async_client: AsyncClient, auth_headers, exporter
+):
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    headers = {**auth_headers, "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+
+    response = await async_client.get("/api/v1/training-plans/", headers=headers)
+
+    assert response.status_code == 200
+    returned = tracing.parse_traceparent(response.headers["traceparent"])
+    assert returned[0] == trace_id
+
+    spans = {span.name: span for span in exporter.spans}
+    root = spans["GET /api/v1/training-plans/"]
+    assert root.parent_id == "00f067aa0ba902b7"
+    assert root.span_id == returned[1]
+    assert root.attributes["http.status_code"] == 200
+    for name in ("auth.jwt_decode", "auth.load_user", "db.session", "db.pool.checkout", "db.query", "http.serialize"):
+        assert name in spans, name
+        assert spans[name].trace_id == trace_id
+    assert spans["auth.jwt_decode"].parent_id == root.span_id
+
+
+async def test_unsampled_requests_are_not_recorded(async_client: AsyncClient, exporter):
+    headers = {"traceparent": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00"}
+
+    response = await async_client.get("/health", headers=headers)
+
+    assert response.status_code == 200
+    assert "traceparent" not in response.headers
+    assert exporter.spans == []
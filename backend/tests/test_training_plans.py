@@ -86,18 +86,19 @@ async def created_training_plan(session, test_user):
 # Create Training Plan Tests
 
 async def test_create_training_plan_success(
-    async_client: AsyncClient, auth_headers, sample_training_plan_data
+    async_client: AsyncClient, auth_headers, sample_training_plan_data, query_budget
 ):
     """Test successful creation of a training plan."""
     # Remove user_id from data as it should be set from the authenticated user
     data = sample_training_plan_data.copy()
     del data["user_id"]
     
-    response = await async_client.post(
-        "/api/v1/training-plans/",
-        json=data,
-        headers=auth_headers
-    )
+    with query_budget(6):
+        response = await async_client.post(
+            "/api/v1/training-plans/",
+            json=data,
+            headers=auth_headers
+        )
     
     assert response.status_code == 200
     result = response.json()
@@ -153,13 +154,14 @@ async def test_create_training_plan_invalid_data(
 # Read Training Plans Tests
 
 async def test_read_training_plans_success(
-    async_client: AsyncClient, auth_headers, created_training_plan
+    async_client: AsyncClient, auth_headers, created_training_plan, query_budget
 ):
     """Test successful retrieval of training plans."""
-    response = await async_client.get(
-        "/api/v1/training-plans/",
-        headers=auth_headers
-    )
+    with query_budget(3):
+        response = await async_client.get(
+            "/api/v1/training-plans/",
+            headers=auth_headers
+        )
     
     assert response.status_code == 200
     result = response.json()
@@ -215,13 +217,14 @@ async def test_read_training_plans_unauthorized(
 # Read Single Training Plan Tests
 
 async def test_read_training_plan_success(
-    async_client: AsyncClient, auth_headers, created_training_plan
+    async_client: AsyncClient, auth_headers, created_training_plan, query_budget
 ):
     """Test successful retrieval of a specific training plan."""
-    response = await async_client.get(
-        f"/api/v1/training-plans/{created_training_plan.id}",
-        headers=auth_headers
-    )
+    with query_budget(3):
+        response = await async_client.get(
+            f"/api/v1/training-plans/{created_training_plan.id}",
+            headers=auth_headers
+        )
     
     assert response.status_code == 200
     result = response.json()
@@ -290,7 +293,7 @@ async def test_read_training_plan_forbidden(
 # Update Training Plan Tests
 
 async def test_update_training_plan_success(
-    async_client: AsyncClient, auth_headers, created_training_plan
+    async_client: AsyncClient, auth_headers, created_training_plan, query_budget
 ):
     """Test successful update of a training plan."""
     update_data = {
@@ -300,11 +303,12 @@ async def test_update_training_plan_success(
         "id": str(created_training_plan.id)
     }
     
-    response = await async_client.put(
-        f"/api/v1/training-plans/",
-        json=update_data,
-        headers=auth_headers
-    )
+    with query_budget(5):
+        response = await async_client.put(
+            f"/api/v1/training-plans/",
+            json=update_data,
+            headers=auth_headers
+        )
     
     assert response.status_code == 200
     result = response.json()
@@ -372,13 +376,14 @@ async def test_update_training_plan_unauthorized(
 # Delete Training Plan Tests
 
 async def test_delete_training_plan_success(
-    async_client: AsyncClient, auth_headers, created_training_plan
+    async_client: AsyncClient, auth_headers, created_training_plan, query_budget
 ):
     """Test successful deletion of a training plan."""
-    response = await async_client.delete(
-        f"/api/v1/training-plans/{created_training_plan.id}",
-        headers=auth_headers
-    )
+    with query_budget(5):
+        response = await async_client.delete(
+            f"/api/v1/training-plans/{created_training_plan.id}",
+            headers=auth_headers
+        )
     
     assert response.status_code == 200
     result = response.json()
@@ -421,13 +426,14 @@ async def test_delete_training_plan_unauthorized(
 # Training Plan Stats Tests
 
 async def test_get_training_plan_count(
-    async_client: AsyncClient, auth_headers, created_training_plan
+    async_client: AsyncClient, auth_headers, created_training_plan, query_budget
 ):
     """Test getting the count of training plans."""
-    response = await async_client.get(
-        "/api/v1/training-plans/stats/count",
-        headers=auth_headers
-    )
+    with query_budget(3):
+        response = await async_client.get(
+            "/api/v1/training-plans/stats/count",
+            headers=auth_headers
+        )
     
     assert response.status_code == 200
     result = response.json()
@@ -457,4 +463,93 @@ async def test_get_training_plan_count_unauthorized(
 ):
     """Test getting training plan count without authentication."""
     response = await async_client.get("/api/v1/training-plans/stats/count")
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+
+# Conditional Request Tests
+
+async def test_read_training_plan_not_modified(
+    async_client: AsyncClient, auth_headers, created_training_plan, query_budget
+):
+    """Test that a matching If-None-Match gets a 304 without loading the plan."""
+    url = f"/api/v1/training-plans/{created_training_plan.id}"
+    response = await async_client.get(url, headers=auth_headers)
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    with query_budget(2) as profile:
+        response = await async_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    assert not any("plan_data" in query.statement for query in profile.records)
+
+
+async def test_read_training_plan_modified_after_update(
+    async_client: AsyncClient, auth_headers, created_training_plan
+):
+    """Test that an update invalidates the previous ETag."""
+    url = f"/api/v1/training-plans/{created_training_plan.id}"
+    etag = (await async_client.get(url, headers=auth_headers)).headers["etag"]
+
+    await async_client.put(
+        "/api/v1/training-plans/",
+        json={"goal": "New Goal", "id": str(created_training_plan.id)},
+        headers=auth_headers,
+    )
+    response = await async_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["goal"] == "New Goal"
+    assert response.headers["etag"] != etag
+
+
+async def test_read_training_plans_not_modified(
+    async_client: AsyncClient, auth_headers, sample_training_plan_data, created_training_plan, query_budget
+):
+    """Test that the list ETag covers the page and is answered with 304 while it is unchanged."""
+    url = "/api/v1/training-plans/"
+    etag = (await async_client.get(url, headers=auth_headers)).headers["etag"]
+
+    with query_budget(2) as profile:
+        response = await async_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert not any("plan_data" in query.statement for query in profile.records)
+
+    # A different page has a different tag
+    response = await async_client.get(url, params={"limit": 1}, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+
+    # Adding a plan changes the page
+    await async_client.post(url, json=sample_training_plan_data, headers=auth_headers)
+    response = await async_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+async def test_update_training_plan_if_match(
+    async_client: AsyncClient, auth_headers, created_training_plan
+):
+    """Test optimistic concurrency: an update with a stale If-Match is rejected."""
+    url = f"/api/v1/training-plans/{created_training_plan.id}"
+    etag = (await async_client.get(url, headers=auth_headers)).headers["etag"]
+
+    first = await async_client.put(
+        "/api/v1/training-plans/",
+        json={"goal": "First Writer", "id": str(created_training_plan.id)},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert first.status_code == 200
+    assert first.headers["etag"] != etag
+
+    second = await async_client.put(
+        "/api/v1/training-plans/",
+        json={"goal": "Second Writer", "id": str(created_training_plan.id)},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert second.status_code == 412
+    assert second.headers["etag"] == first.headers["etag"]
+
+    response = await async_client.get(url, headers=auth_headers)
+    assert response.json()["goal"] == "First Writer"
@@ -0,0 +1,145 @@
+import pytest
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import or_, select, text
+from sqlalchemy.dialects import postgresql
+
+from tenflow.models import TrainingPlan, User
+
+SIGNUP = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+async def people(session, make_user, headers_for):
+    """An admin and five users who signed up a day apart; returns emails by id and auth headers."""
+    def signed_up(full_name, email, days, **fields):
+        return make_user(email=email, full_name=full_name, created_at=SIGNUP + timedelta(days=days), **fields)
+
+    users = [
+        signed_up("Admin", "admin@example.com", 0, is_superuser=True),
+        signed_up("Ann Smith", "ann@example.com", 1),
+        signed_up("Bob Smithson", "bob@example.com", 2, is_active=False),
+        signed_up("Cat Jones", "cat_100%@example.org", 3),
+        signed_up("Dan Brown", "dan.smith@example.org", 4),
+        signed_up(None, "eve@example.net", 5),
+    ]
+    session.add_all(users)
+    emails = {str(user.id): user.email for user in users}
+    headers = {user.email: headers_for(user.id) for user in users[:2]}
+    await session.commit()
+    return emails, headers
+
+
+async def list_users(async_client, people, **params):
+    emails, headers = people
+    response = await async_client.get("/api/v1/users/", params=params, headers=headers["admin@example.com"])
+    assert response.status_code == 200, response.text
+    page = response.json()
+    return [emails[user["id"]] for user in page["users"]], page["next_cursor"]
+
+
+# User Listing Tests
+
+async def test_pages_newest_first(async_client: AsyncClient, people):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page, cursor = await list_users(async_client, people, **params)
+        seen += page
+        if cursor is None:
+            break
+
+    assert seen == [
+        "eve@example.net",
+        "dan.smith@example.org",
+        "cat_100%@example.org",
+        "bob@example.com",
+        "ann@example.com",
+        "admin@example.com",
+    ]
+
+
+async def test_pages_hold_when_users_sign_up(session, async_client: AsyncClient, people, make_user):
+    first, cursor = await list_users(async_client, people, limit=3)
+    session.add(make_user(email="fay@example.com", created_at=SIGNUP + timedelta(days=6)))
+    await session.commit()
+
+    second, _ = await list_users(async_client, people, limit=3, cursor=cursor)
+
+    assert first + second == [
+        "eve@example.net",
+        "dan.smith@example.org",
+        "cat_100%@example.org",
+        "bob@example.com",
+        "ann@example.com",
+        "admin@example.com",
+    ]
+
+
+async def test_search_email_and_name(async_client: AsyncClient, people):
+    found, _ = await list_users(async_client, people, q="smith")
+    assert found == ["dan.smith@example.org", "bob@example.com", "ann@example.com"]
+
+    found, _ = await list_users(async_client, people, q="SMITH", is_active=True)
+    assert found == ["dan.smith@example.org", "ann@example.com"]
+
+
+async def test_search_is_literal(async_client: AsyncClient, people):
+    assert (await list_users(async_client, people, q="_100%"))[0] == ["cat_100%@example.org"]
+    assert (await list_users(async_client, people, q="a_n"))[0] == []
+
+
+async def test_listing_is_for_superusers(async_client: AsyncClient, people):
+    _, headers = people
+    response = await async_client.get("/api/v1/users/", headers=headers["ann@example.com"])
+    assert response.status_code == 400
+
+
+async def test_invalid_cursor(async_client: AsyncClient, people):
+    _, headers = people
+    response = await async_client.get(
+        "/api/v1/users/", params={"cursor": "not-a-cursor"}, headers=headers["admin@example.com"]
+    )
+    assert response.status_code == 400
+
+
+async def test_read_user_by_id_with_plans(session, async_client: AsyncClient, people):
+    emails, headers = people
+    ann_id = next(user_id for user_id, email in emails.items() if email == "ann@example.com")
+    ann = await session.get(User, ann_id)
+    session.add(
+        TrainingPlan(
+            user=ann,
+            goal="10K",
+            plan_name="Ann's Plan",
+            start_date=date(2026, 3, 2),
+            end_date=date(2026, 3, 30),
+            duration_weeks=4,
+            fitness_level="beginner",
+            weekly_distance_base=Decimal("20.0"),
+            weekly_distance_peak=Decimal("30.0"),
+            training_days_per_week=3,
+            plan_data=None,
+        )
+    )
+    await session.commit()
+
+    response = await async_client.get(f"/api/v1/users/{ann_id}", headers=headers["admin@example.com"])
+
+    assert response.status_code == 200
+    assert [plan["plan_name"] for plan in response.json()["training_plans"]] == ["Ann's Plan"]
+
+
+async def test_search_uses_trigram_indexes(session, people, pg_trgm):
+    from tenflow.api.v1.endpoints.users import _contains
+
+    pattern = _contains("smith")
+    query = select(User.id).where(or_(User.email.ilike(pattern), User.full_name.ilike(pattern)))
+    sql = query.compile(dialect=postgresql.dialect(paramstyle="named"), compile_kwargs={"literal_binds": True})
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join((await session.execute(text(f"EXPLAIN {sql}"))).scalars())
+    await session.rollback()
+
+    assert "ix_users_email_trgm" in plan
+    assert "ix_users_full_name_trgm" in plan
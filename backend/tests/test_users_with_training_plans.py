@@ -76,13 +76,14 @@ async def auth_headers_for_user_with_plans(test_user_with_training_plans_id):
 
 
 async def test_get_user_me_includes_training_plans(
-    async_client: AsyncClient, auth_headers_for_user_with_plans
+    async_client: AsyncClient, auth_headers_for_user_with_plans, query_budget
 ):
     """Test that GET /users/me returns the user with their training plans."""
-    response = await async_client.get(
-        "/api/v1/users/me",
-        headers=auth_headers_for_user_with_plans
-    )
+    with query_budget(2):
+        response = await async_client.get(
+            "/api/v1/users/me",
+            headers=auth_headers_for_user_with_plans
+        )
     
     assert response.status_code == 200
     result = response.json()
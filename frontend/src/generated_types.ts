@@ -33,7 +33,10 @@ export interface paths {
         };
         /**
          * Read Users
-         * @description Retrieve users.
+         * @description List users, newest first (superusers only).
+         *
+         *     Pages follow each other by keyset on (created_at, id), so every page costs
+         *     the same however deep it is, and users signing up meanwhile don't shift them.
          */
         get: operations["read_users_api_v1_users__get"];
         put?: never;
@@ -379,6 +382,13 @@ export interface components {
             /** Password */
             password: string;
         };
+        /** UserPage */
+        UserPage: {
+            /** Users */
+            users: components["schemas"]["UserSummary"][];
+            /** Next Cursor */
+            next_cursor?: string | null;
+        };
         /** UserRead */
         UserRead: {
             /** Email */
@@ -413,6 +423,27 @@ export interface components {
              */
             training_plans: components["schemas"]["TrainingPlanRead"][];
         };
+        /** UserSummary */
+        UserSummary: {
+            /**
+             * Id
+             * Format: uuid
+             */
+            id: string;
+            /** Email */
+            email: string;
+            /** Full Name */
+            full_name?: string | null;
+            /** Is Active */
+            is_active: boolean;
+            /** Is Superuser */
+            is_superuser: boolean;
+            /**
+             * Created At
+             * Format: date-time
+             */
+            created_at: string;
+        };
         /** UserUpdate */
         UserUpdate: {
             /** Email */
@@ -480,7 +511,11 @@ export interface operations {
     read_users_api_v1_users__get: {
         parameters: {
             query?: {
-                skip?: number;
+                /** @description part of the email or full name */
+                q?: string | null;
+                is_active?: boolean | null;
+                /** @description next_cursor of the previous page */
+                cursor?: string | null;
                 limit?: number;
             };
             header?: never;
@@ -495,7 +530,7 @@ export interface operations {
                     [name: string]: unknown;
                 };
                 content: {
-                    "application/json": components["schemas"]["UserRead"][];
+                    "application/json": components["schemas"]["UserPage"];
                 };
             };
             /** @description Validation Error */